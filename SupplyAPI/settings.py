@@ -41,8 +41,31 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.BasicAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# List endpoints page with ?cursor= / ?page_size=, see api.pagination.KeysetPagination.
+# Turn API_PAGINATE_BY_DEFAULT on once every client follows the `next` links.
+API_PAGINATE_BY_DEFAULT = os.getenv('API_PAGINATE_BY_DEFAULT', 'False').lower() in ['true', '1', 't']
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', 50))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 500))
+
+# Rows per server-side cursor fetch and per serialized chunk for ?stream=1, see api.streaming.
+API_STREAM_CHUNK_SIZE = int(os.getenv('API_STREAM_CHUNK_SIZE', 500))
+
+# Render nested *_details objects when a request has no ?expand= parameter.
+# Turn it off to make flat rows (related objects as pks) the default payload.
+API_EXPAND_NESTED_BY_DEFAULT = os.getenv('API_EXPAND_NESTED_BY_DEFAULT', 'True').lower() in ['true', '1', 't']
+
 SIMPLE_JWT = { 
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
@@ -55,17 +78,40 @@ SIMPLE_JWT = {
     'AUTH_COOKIE_SAMESITE': 'Strict', 
 }
 
+# Seconds between incremental syncs of the in-memory token blacklist with the database.
+TOKEN_BLACKLIST_SYNC_INTERVAL = int(os.getenv('TOKEN_BLACKLIST_SYNC_INTERVAL', '5'))
+
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOWED_ORIGINS = [
-    "http://localhost:5173", "https://supply-management-system.netlify.app", "https://jhay-lhord.github.io/login-system-v2/"
+    "http://localhost:5173", "https://supply-management-system.netlify.app", "https://jhay-lhord.github.io"
 ]
 
 CSRF_TRUSTED_ORIGINS = [
-    "http://localhost:5173", "https://supply-management-system.netlify.app", "https://jhay-lhord.github.io/login-system-v2/"
+    "http://localhost:5173", "https://supply-management-system.netlify.app", "https://jhay-lhord.github.io"
 ]
 
 AUTH_USER_MODEL = 'api.CustomUser'
 
+# Cache of authenticated users and their roles, keyed by the token user_id.
+# 'local' keeps a per-process LRU, 'shared' stores entries in the USER_CACHE_ALIAS cache
+# so every gunicorn worker sees the same invalidations.
+USER_CACHE_BACKEND = os.getenv('USER_CACHE_BACKEND', 'local')
+USER_CACHE_ALIAS = os.getenv('USER_CACHE_ALIAS', 'default')
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', '300'))
+USER_CACHE_MAX_SIZE = int(os.getenv('USER_CACHE_MAX_SIZE', '1024'))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+if os.getenv('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    }
+
 EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
@@ -73,6 +119,25 @@ EMAIL_PORT = os.getenv('EMAIL_PORT')
 EMAIL_USE_TLS = True
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 
+# Outbound emails are queued in the OutboundEmail table and sent by `manage.py run_outbox_worker`.
+# Transports: api.outbox.ResendTransport, SMTPTransport, FileTransport, MemoryTransport
+EMAIL_OUTBOX_TRANSPORT = os.getenv('EMAIL_OUTBOX_TRANSPORT', 'api.outbox.ResendTransport')
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '5'))
+EMAIL_OUTBOX_RETRY_DELAY = int(os.getenv('EMAIL_OUTBOX_RETRY_DELAY', '30'))
+# Seconds a worker has to send a claimed batch before another worker may claim it again.
+EMAIL_OUTBOX_CLAIM_TIMEOUT = int(os.getenv('EMAIL_OUTBOX_CLAIM_TIMEOUT', '300'))
+EMAIL_OUTBOX_FILE_PATH = os.getenv('EMAIL_OUTBOX_FILE_PATH', os.path.join(BASE_DIR, 'outbox'))
+
+# RecentActivity retention, see api/activity_partitions.py. Months older than ACTIVITY_RETENTION_MONTHS are
+# archived to ACTIVITY_ARCHIVE_DIR (gzipped JSON lines, empty to drop them without a copy) and removed.
+ACTIVITY_RETENTION_MONTHS = int(os.getenv('ACTIVITY_RETENTION_MONTHS', '6'))
+ACTIVITY_ARCHIVE_DIR = os.getenv('ACTIVITY_ARCHIVE_DIR', os.path.join(BASE_DIR, 'archive'))
+# Monthly partitions created ahead of time on Postgres.
+ACTIVITY_PARTITIONS_AHEAD = int(os.getenv('ACTIVITY_PARTITIONS_AHEAD', '2'))
+
+# Largest attachment SendFileView accepts, in bytes (Resend allows 40MB per email after encoding).
+EMAIL_ATTACHMENT_MAX_SIZE = int(os.getenv('EMAIL_ATTACHMENT_MAX_SIZE', str(25 * 1024 * 1024)))
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -88,6 +153,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'api.middleware.AuthenticatedUserMiddleware',
+    'api.middleware.ActivityBufferMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -148,12 +214,60 @@ elif ENVIRONMENT == 'test':
             'PORT': os.getenv('TEST_PORT'),
         }
     }
+    # A second local database for the replica routing tests (ReplicaRoutingTests in api/tests.py). It gets a
+    # test database and schema of its own; the tests route reads to it with DATABASE_REPLICAS=['replica'].
+    if os.getenv('DB_TEST_REPLICA_NAME'):
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'NAME': os.getenv('DB_TEST_REPLICA_NAME'),
+            'HOST': os.getenv('DB_TEST_REPLICA_HOST', os.getenv('TEST_HOST')),
+            'PORT': os.getenv('DB_TEST_REPLICA_PORT', os.getenv('TEST_PORT')),
+        }
 
 else:
     database_url = os.getenv('DB_RENDER_URL')
 
     DATABASES['default'] = dj_database_url.parse(database_url)
 
+# Read replicas, see api/db_router.py: DB_REPLICA_URLS is a comma separated list of database URLs. The reads of
+# GET requests go to one of them, unless the user wrote something in the last DB_REPLICA_STICKY_SECONDS seconds
+# (remembered in the DB_REPLICA_CACHE_ALIAS cache, which should be shared by all workers, e.g. REDIS_URL).
+for index, replica_url in enumerate(filter(None, os.getenv('DB_REPLICA_URLS', '').split(',')), start=1):
+    DATABASES[f'replica_{index}'] = dj_database_url.parse(replica_url.strip())
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica_')]
+for alias in DATABASE_REPLICAS:
+    # Tests read the rows they have just written, so test runs point the replicas at the test database.
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['api.db_router.PrimaryReplicaRouter']
+DB_REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', '10'))
+DB_REPLICA_CACHE_ALIAS = os.getenv('DB_REPLICA_CACHE_ALIAS', 'default')
+
+# Connection reuse, for every database above. DB_CONN_MAX_AGE is how long a thread keeps its connection, in
+# seconds (0 closes it after each request, 'none' never does); DB_CONN_HEALTH_CHECKS pings a kept connection
+# before a request uses it. With DB_POOL=True the threads of a worker share up to DB_POOL_MAX_SIZE connections
+# of an in-process pool instead (api/db_pool): a request borrows one and gives it back when it ends, waiting up to
+# DB_POOL_TIMEOUT seconds when all are busy. Pooled connections idle for DB_POOL_CHECK_IDLE seconds are pinged
+# before reuse (when health checks are on) and replaced after DB_POOL_MAX_LIFETIME seconds.
+DB_CONN_MAX_AGE = os.getenv('DB_CONN_MAX_AGE', '60')
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', 'True').lower() in ['true', '1', 't']
+DB_POOL = os.getenv('DB_POOL', 'False').lower() in ['true', '1', 't']
+
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = None if DB_CONN_MAX_AGE.lower() == 'none' else int(DB_CONN_MAX_AGE)
+    database['CONN_HEALTH_CHECKS'] = DB_CONN_HEALTH_CHECKS
+    if DB_POOL and database.get('ENGINE') == 'django.db.backends.postgresql':
+        database['ENGINE'] = 'api.db_pool'
+        # The pool keeps the connections; a thread must give its connection back after each request.
+        database['CONN_MAX_AGE'] = 0
+        database['POOL'] = {
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+            'CHECK_IDLE': int(os.getenv('DB_POOL_CHECK_IDLE', '30')),
+            'MAX_LIFETIME': int(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+        }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -0,0 +1,156 @@
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from .auth import get_user_role
+from .models import AbstractOfQuotation, Item, PurchaseRequest, RecentActivity, RequestForQoutation
+
+logger = logging.getLogger(__name__)
+
+_buffer = ContextVar('activity_buffer', default=None)
+
+# Label stored with each activity; only the object's own columns, so building it runs no query.
+ACTIVITY_LABELS = {
+    PurchaseRequest: 'PR {0.pr_no} — {0.office}',
+    Item: 'Item {0.item_no} — {0.item_description}',
+    RequestForQoutation: 'RFQ {0.rfq_no} — {0.supplier_name}',
+    AbstractOfQuotation: 'AOQ {0.aoq_no} — PR {0.purchase_request_id}',
+}
+
+
+def get_activity_label(instance):
+    label_format = ACTIVITY_LABELS.get(type(instance))
+    label = label_format.format(instance) if label_format else f'{instance._meta.verbose_name} {instance.pk}'
+    return label[:RecentActivity._meta.get_field('object_label').max_length]
+
+
+def resolve_content_objects(activities):
+    """
+    Load the objects the activities point at with one in_bulk per content type.
+    Returns {(content_type_id, object_id): object}; deleted objects are missing.
+    """
+    object_ids = defaultdict(set)
+    content_types = {}
+    for activity in activities:
+        object_ids[activity.content_type_id].add(activity.object_id)
+        content_types[activity.content_type_id] = activity.content_type
+
+    objects = {}
+    for content_type_id, ids in object_ids.items():
+        model = content_types[content_type_id].model_class()
+        if model is None:
+            continue
+        for pk, content_object in model._base_manager.in_bulk(ids).items():
+            objects[(content_type_id, str(pk))] = content_object
+    return objects
+
+
+class ActivityBuffer:
+    """
+    RecentActivity records waiting to be written with one bulk_create.
+
+    Repeated saves of the same object by the same user collapse into one record, so a
+    create followed by updates stays a single 'Added' and two updates become one 'Updated'.
+    The record keeps the label of the last save.
+    """
+
+    def __init__(self):
+        self.records = {}
+
+    def add(self, user, activity_type, content_type, object_id, object_label=''):
+        key = (user.pk, content_type.pk, str(object_id), activity_type == 'Deleted')
+        if key in self.records:
+            activity_type = self.records[key][1]
+        self.records[key] = (user, activity_type, content_type, object_id, object_label)
+
+    def flush(self):
+        records, self.records = list(self.records.values()), {}
+        if not records:
+            return []
+
+        roles = {}
+        activities = []
+        for user, activity_type, content_type, object_id, object_label in records:
+            if user.pk not in roles:
+                roles[user.pk] = ', '.join(get_user_role(user))
+            activities.append(RecentActivity(
+                user=user,
+                user_role=roles[user.pk],
+                activity_type=activity_type,
+                content_type=content_type,
+                object_id=object_id,
+                object_label=object_label,
+            ))
+        created = RecentActivity.objects.bulk_create(activities)
+        logger.info("Recorded %s recent activities", len(created))
+        return created
+
+
+def get_buffer():
+    return _buffer.get()
+
+
+def start_buffer():
+    """Start collecting activities in the current context. Returns the buffer and the token for finish_buffer."""
+    buffer = ActivityBuffer()
+    return buffer, _buffer.set(buffer)
+
+
+def stop_buffer(token):
+    """Restore the buffer that was current before start_buffer."""
+    _buffer.reset(token)
+
+
+def write_buffer(buffer):
+    """
+    Write the collected activities in one INSERT.
+    A write error is logged rather than raised, the changes themselves are already committed.
+    """
+    try:
+        buffer.flush()
+    except Exception:
+        logger.exception("Could not record the recent activities of this request")
+
+
+def finish_buffer(buffer, token):
+    stop_buffer(token)
+    write_buffer(buffer)
+
+
+@contextmanager
+def buffer_activities():
+    """Collect the activities recorded inside the block and write them in one INSERT when it exits."""
+    buffer, token = start_buffer()
+    try:
+        yield buffer
+    finally:
+        finish_buffer(buffer, token)
+
+
+def record_activity(user, activity_type, instance):
+    """
+    Queue a RecentActivity for `instance` once the current transaction commits.
+
+    Inside buffer_activities() (every request, see ActivityBufferMiddleware) the record is kept
+    until the block exits; elsewhere it is written as soon as the transaction commits. Changes
+    rolled back, including in a savepoint, are never recorded.
+    """
+    content_type = ContentType.objects.get_for_model(instance)
+    object_id = instance.pk
+    # Built now: after a delete the object can no longer be read.
+    object_label = get_activity_label(instance)
+
+    def add_on_commit():
+        buffer = get_buffer()
+        if buffer is not None:
+            buffer.add(user, activity_type, content_type, object_id, object_label)
+            return
+        buffer = ActivityBuffer()
+        buffer.add(user, activity_type, content_type, object_id, object_label)
+        buffer.flush()
+
+    transaction.on_commit(add_on_commit)
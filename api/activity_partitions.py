@@ -0,0 +1,330 @@
+"""
+Monthly partitions and retention for RecentActivity.
+
+On Postgres, partition_activity_table() turns api_recentactivity into a table partitioned by
+RANGE ("timestamp") with one partition per month, named api_recentactivity_YYYY_MM, and a
+default partition for rows outside them. prune_activity() then removes whole months with
+DROP TABLE. Other databases keep the plain table and prune_activity() deletes the old rows in
+batches instead. In both cases the removed rows can first be archived to gzipped JSON lines.
+"""
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import date, datetime, time, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import RecentActivity
+
+logger = logging.getLogger(__name__)
+
+
+def get_table():
+    return RecentActivity._meta.db_table
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def to_datetime(month):
+    return datetime.combine(month, time(), tzinfo=dt_timezone.utc)
+
+
+def get_current_month():
+    return month_start(timezone.now().astimezone(dt_timezone.utc))
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_partition_name(month):
+    return f'{get_table()}_{month:%Y_%m}'
+
+
+def supports_partitions():
+    return connection.vendor == 'postgresql'
+
+
+def is_partitioned():
+    if not supports_partitions():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid '
+            'WHERE c.relname = %s AND pg_table_is_visible(c.oid)',
+            [get_table()],
+        )
+        return cursor.fetchone() is not None
+
+
+def get_partition_month(name):
+    match = re.match(re.escape(get_table()) + r'_(\d{4})_(\d{2})$', name)
+    return date(int(match[1]), int(match[2]), 1) if match else None
+
+
+def get_partitions():
+    """Return {month: partition name} for the monthly partitions, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent '
+            'WHERE p.relname = %s AND pg_table_is_visible(p.oid)',
+            [get_table()],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = {get_partition_month(name): name for name in names}
+    partitions.pop(None, None)
+    return dict(sorted(partitions.items()))
+
+
+def get_detached_partitions():
+    """
+    Return {month: table name} for monthly tables that are no longer attached, i.e. detached by
+    prune_activity() but not yet archived and dropped, e.g. because the run was interrupted.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_class c WHERE c.relkind = 'r' AND c.relname LIKE %s "
+            'AND pg_table_is_visible(c.oid) AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)',
+            [get_table().replace('_', r'\_') + r'\_%'],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = {get_partition_month(name): name for name in names}
+    partitions.pop(None, None)
+    return dict(sorted(partitions.items()))
+
+
+def get_default_partition():
+    return f'{get_table()}_default'
+
+
+def create_partition(cursor, month):
+    """
+    Create the partition for `month` unless it exists.
+
+    Postgres refuses CREATE TABLE ... PARTITION OF while the default partition holds rows of that
+    month, which happens when this runs late, e.g. after the scheduled job was skipped. Those rows
+    are then moved into a new table that is attached as the partition, in one transaction.
+    """
+    quote = connection.ops.quote_name
+    table, name = get_table(), get_partition_name(month)
+    timestamp = quote(RecentActivity._meta.get_field('timestamp').column)
+    start, end = to_datetime(month), to_datetime(add_months(month, 1))
+    bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+
+    default = get_default_partition()
+    cursor.execute('SELECT to_regclass(%s) IS NOT NULL, to_regclass(%s) IS NOT NULL', [name, default])
+    exists, has_default = cursor.fetchone()
+    if exists:
+        return
+    rows_in_default = False
+    if has_default:
+        cursor.execute(
+            f'SELECT EXISTS (SELECT 1 FROM {quote(default)} WHERE {timestamp} >= %s AND {timestamp} < %s)',
+            [start, end],
+        )
+        rows_in_default = cursor.fetchone()[0]
+    if not rows_in_default:
+        cursor.execute(f'CREATE TABLE {quote(name)} PARTITION OF {quote(table)} FOR VALUES {bounds}')
+        return
+
+    with transaction.atomic():
+        # Blocks inserts until the commit, so no row of the month can reach the default partition meanwhile.
+        cursor.execute(f'LOCK TABLE {quote(default)} IN SHARE ROW EXCLUSIVE MODE')
+        cursor.execute(f'CREATE TABLE {quote(name)} (LIKE {quote(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {quote(default)} '
+            f'WHERE {timestamp} >= %s AND {timestamp} < %s RETURNING *) '
+            f'INSERT INTO {quote(name)} SELECT * FROM moved',
+            [start, end],
+        )
+        moved = cursor.rowcount
+        cursor.execute(f'ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} FOR VALUES {bounds}')
+    logger.info("Moved %s rows from the default partition into %s", moved, name)
+
+
+def ensure_partitions(months_ahead=None):
+    """
+    Create the partitions for this month and the next `months_ahead` months, so new rows never
+    land in the default partition. Returns the number of months checked; 0 when the table is not partitioned.
+    """
+    if months_ahead is None:
+        months_ahead = settings.ACTIVITY_PARTITIONS_AHEAD
+    if not is_partitioned():
+        return 0
+    current_month = get_current_month()
+    with connection.cursor() as cursor:
+        for months in range(months_ahead + 1):
+            create_partition(cursor, add_months(current_month, months))
+    return months_ahead + 1
+
+
+def partition_activity_table(months_ahead=None):
+    """
+    Rebuild api_recentactivity as a monthly partitioned table and copy its rows over, in one transaction.
+
+    Postgres requires the partition key in every unique constraint, so the primary key becomes
+    (id, timestamp); ids keep coming from a sequence. Returns False if the table was already
+    partitioned or the database does not support partitions.
+    """
+    if months_ahead is None:
+        months_ahead = settings.ACTIVITY_PARTITIONS_AHEAD
+    if not supports_partitions() or is_partitioned():
+        return False
+
+    quote = connection.ops.quote_name
+    table = get_table()
+    old_table = f'{table}_unpartitioned'
+    sequence = f'{table}_id_seq'
+    timestamp = RecentActivity._meta.get_field('timestamp').column
+    user = RecentActivity._meta.get_field('user')
+    content_type = RecentActivity._meta.get_field('content_type')
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {quote(table)} IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(f'ALTER TABLE {quote(table)} RENAME TO {quote(old_table)}')
+        cursor.execute(
+            f'CREATE TABLE {quote(table)} (LIKE {quote(old_table)} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE ({quote(timestamp)})'
+        )
+        cursor.execute(f'CREATE TABLE {quote(get_default_partition())} PARTITION OF {quote(table)} DEFAULT')
+
+        cursor.execute(f'SELECT MIN({quote(timestamp)}) FROM {quote(old_table)}')
+        oldest = cursor.fetchone()[0]
+        current_month = get_current_month()
+        month = month_start(oldest.astimezone(dt_timezone.utc)) if oldest else current_month
+        while month <= add_months(current_month, months_ahead):
+            create_partition(cursor, month)
+            month = add_months(month, 1)
+
+        cursor.execute(f'INSERT INTO {quote(table)} SELECT * FROM {quote(old_table)}')
+        # Dropping the old table also drops its identity sequence, which has the name reused below.
+        cursor.execute(f'DROP TABLE {quote(old_table)}')
+        cursor.execute(f'CREATE SEQUENCE {quote(sequence)} OWNED BY {quote(table)}.id')
+        cursor.execute(f"SELECT setval('{sequence}', COALESCE((SELECT MAX(id) FROM {quote(table)}), 0) + 1, false)")
+        cursor.execute(f"ALTER TABLE {quote(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+
+        cursor.execute(f'ALTER TABLE {quote(table)} ADD PRIMARY KEY (id, {quote(timestamp)})')
+        cursor.execute(f'CREATE INDEX activity_keyset_idx ON {quote(table)} ({quote(timestamp)}, id)')
+        for field in (user, content_type):
+            related_table = field.related_model._meta.db_table
+            cursor.execute(
+                f'CREATE INDEX {quote(f"{table}_{field.column}_idx")} ON {quote(table)} ({quote(field.column)})'
+            )
+            cursor.execute(
+                f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(f"{table}_{field.column}_fk")} '
+                f'FOREIGN KEY ({quote(field.column)}) REFERENCES {quote(related_table)} '
+                f'({quote(field.target_field.column)}) DEFERRABLE INITIALLY DEFERRED'
+            )
+    logger.info("Partitioned %s by month", table)
+    return True
+
+
+def get_archive_path(archive_dir, month):
+    return os.path.join(archive_dir, f'{get_partition_name(month)}.jsonl.gz')
+
+
+def write_archive(archive_dir, month, columns, rows):
+    """Append rows to the month's gzipped JSON lines file. Each call adds a gzip member, which readers join."""
+    os.makedirs(archive_dir, exist_ok=True)
+    with gzip.open(get_archive_path(archive_dir, month), 'at', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + '\n')
+
+
+def archive_partition(name, month, archive_dir, batch_size):
+    """
+    Write the rows of a detached partition to the month's archive, reading them through a server-side
+    cursor so only `batch_size` rows are in memory at a time.
+    """
+    archived = 0
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(f'SELECT * FROM {connection.ops.quote_name(name)} ORDER BY id')
+        columns = None
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if columns is None:
+                columns = [column[0] for column in cursor.description]
+            if not rows:
+                return archived
+            write_archive(archive_dir, month, columns, rows)
+            archived += len(rows)
+
+
+def drop_partition(name, month, archive_dir, batch_size):
+    """Archive a detached partition when `archive_dir` is set, then drop it. Returns its number of rows."""
+    quote = connection.ops.quote_name
+    with transaction.atomic():
+        if archive_dir:
+            count = archive_partition(name, month, archive_dir, batch_size)
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(f'SELECT COUNT(*) FROM {quote(name)}')
+                count = cursor.fetchone()[0]
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE {quote(name)}')
+    logger.info("Dropped partition %s with %s rows", name, count)
+    return count
+
+
+def delete_rows(month, end, archive_dir, batch_size):
+    """Archive and delete the rows of one month, up to `end`, in batches of ids."""
+    columns = [field.attname for field in RecentActivity._meta.concrete_fields]
+    queryset = RecentActivity.objects.between(to_datetime(month), to_datetime(end)).order_by('id')
+    deleted = 0
+    while True:
+        rows = list(queryset.values_list(*columns)[:batch_size])
+        if not rows:
+            return deleted
+        if archive_dir:
+            write_archive(archive_dir, month, columns, rows)
+        ids = [row[0] for row in rows]
+        queryset.filter(id__in=ids).delete()
+        deleted += len(ids)
+
+
+def prune_activity(retention_months=None, archive_dir=None, batch_size=1000):
+    """
+    Remove RecentActivity rows from the months before the last `retention_months` months,
+    archiving them to `archive_dir` first when it is set. Returns the number of rows removed.
+    """
+    if retention_months is None:
+        retention_months = settings.ACTIVITY_RETENTION_MONTHS
+    current_month = get_current_month()
+    cutoff = add_months(current_month, -retention_months)
+    removed = 0
+
+    if is_partitioned():
+        ensure_partitions()
+        quote = connection.ops.quote_name
+        for month, name in get_partitions().items():
+            if month >= cutoff:
+                break
+            # DETACH takes an ACCESS EXCLUSIVE lock on the live table, so it is committed on its own, before
+            # the archiving. (DETACH ... CONCURRENTLY is not allowed while the table has a default partition.)
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f'ALTER TABLE {quote(get_table())} DETACH PARTITION {quote(name)}')
+        # Also picks up partitions a previous, interrupted run detached but did not drop.
+        for month, name in get_detached_partitions().items():
+            if month < cutoff:
+                removed += drop_partition(name, month, archive_dir, batch_size)
+
+    # Rows outside the monthly partitions (the default partition, or an unpartitioned table).
+    oldest = RecentActivity.objects.filter(timestamp__lt=to_datetime(cutoff)).order_by('timestamp').values_list(
+        'timestamp', flat=True).first()
+    if oldest is not None:
+        month = month_start(oldest.astimezone(dt_timezone.utc))
+        while month < cutoff:
+            removed += delete_rows(month, add_months(month, 1), archive_dir, batch_size)
+            month = add_months(month, 1)
+
+    logger.info("Pruned %s recent activities older than %s", removed, cutoff)
+    return removed
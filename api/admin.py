@@ -9,3 +9,6 @@ admin.site.register(Supplier)
 admin.site.register(PurchaseOrder)
 admin.site.register(DeliveredItems)
 admin.site.register(RequisitionIssueSlip)
+admin.site.register(OutboundEmail)
+admin.site.register(DailyCounter)
+admin.site.register(StatusCounter)
@@ -0,0 +1,87 @@
+"""
+Async versions of the read endpoints, served under /api/async/ next to their sync views.
+
+Under ASGI a sync DRF view holds a worker thread for the whole request. These views reuse the
+sync view's authentication, permissions, filters, serializer and pagination, but read the rows
+with the async ORM, so the event loop keeps serving other requests while a query runs.
+Under WSGI they still work, Django runs them in an event loop of their own.
+"""
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncReadView(View):
+    """
+    Serve GET for a DRF view class (`view_class`) from an async handler.
+
+    The DRF view is set up as in APIView.dispatch. Authentication, permission and throttle
+    checks run in a thread because token validation can read the blacklist from the database;
+    the response comes from the view's `aget` coroutine.
+    """
+    view_class = None
+    http_method_names = ['get', 'head', 'options']
+
+    async def get(self, request, *args, **kwargs):
+        view = self.view_class()
+        view.args, view.kwargs = args, kwargs
+        drf_request = view.initialize_request(request, *args, **kwargs)
+        view.request = drf_request
+        view.headers = view.default_response_headers
+
+        try:
+            await sync_to_async(view.initial)(drf_request, *args, **kwargs)
+            response = await self.respond(view, drf_request, *args, **kwargs)
+        except Exception as exc:
+            response = view.handle_exception(exc)
+
+        response = view.finalize_response(drf_request, response, *args, **kwargs)
+        return to_http_response(response.render())
+
+    async def respond(self, view, request, *args, **kwargs):
+        return await view.aget(request, *args, **kwargs)
+
+
+class AsyncListView(AsyncReadView):
+    """
+    Async list endpoint for a DRF ListAPIView. Supports the same filters, `?fields=`/`?expand=`
+    and keyset pages (`?cursor=`, `?page_size=`) as the sync view; `?stream=` and the columnar
+    formats stay on the sync view.
+    """
+
+    async def respond(self, view, request, *args, **kwargs):
+        # Always through filter_queryset, even without filter backends: QueryPlanMixin adds the
+        # select_related/prefetch_related plan there. Filter forms can look up related rows while
+        # validating, so it runs in a thread.
+        queryset = await sync_to_async(view.filter_queryset)(view.get_queryset())
+
+        paginator = view.paginator
+        if paginator is not None and hasattr(paginator, 'apaginate_queryset'):
+            page = await paginator.apaginate_queryset(queryset, request, view=view)
+            if page is not None:
+                return view.get_paginated_response(await self.serialize(view, page))
+
+        rows = [row async for row in queryset]
+        return Response(await self.serialize(view, rows))
+
+    async def serialize(self, view, rows):
+        # Serializer fields can still read related rows lazily, which the ORM only allows in a thread.
+        return await sync_to_async(lambda: view.get_serializer(rows, many=True).data)()
+
+
+def to_http_response(response):
+    """
+    Copy a rendered DRF Response into a plain HttpResponse, so the ASGI handler does not hop to
+    a thread to render it again.
+    """
+    http_response = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        http_response[header] = value
+    for cookie in response.cookies.values():
+        http_response.cookies[cookie.key] = cookie
+    return http_response
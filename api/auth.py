@@ -1,42 +1,189 @@
 import logging
-from django.contrib.auth.models import User
+from django.contrib.auth.models import AnonymousUser
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.exceptions import AuthenticationFailed
-from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .blacklist import is_jti_blacklisted
+from .user_cache import User, get_cached_roles, load_user
 
 logger = logging.getLogger(__name__)
 
 def is_token_blacklisted(token):
-    return BlacklistedToken.objects.filter(token__jti=token["jti"]).exists()
+    return is_jti_blacklisted(token["jti"])
 
 
+def get_user_role(user):
+    """Get the role names of the user from the instance, the user cache or their groups, in that order."""
+    if not user or not user.is_authenticated:
+        return []
+    roles = getattr(user, '_role_names', None)
+    if roles is None:
+        roles = get_cached_roles(user.pk)
+    if roles is None:
+        roles = list(user.groups.order_by('pk').values_list('name', flat=True))
+    user._role_names = roles
+    return roles
 
-class CookieJWTAuthentication(JWTAuthentication):
-    
-    def authenticate(self, request):
-        token = request.COOKIES.get('access_token')
-        
-        if not token:
-            return None  # No token found, skip this authentication class
 
+class TokenPrincipal:
+    """
+    Lightweight stand-in for the authenticated user, built from the verified token claims.
+
+    user_id, email and role are answered from the token; any other attribute loads the real
+    CustomUser (through the user cache) the first time a view dereferences it.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token, load_user):
+        self.token = token
+        self.id = self.pk = token.get('user_id')
+        self.email = token.get('email')
+        self.role = token.get('role')
+        self._role_names = [self.role] if self.role else []
+        self._load_user = load_user
+        self._user = None
+
+    @property
+    def user(self):
+        if self._user is None:
+            self._user = self._load_user()
+        return self._user
+
+    def __getattr__(self, name):
+        # Only called for attributes the principal does not define itself.
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __str__(self):
+        return self.email or str(self.pk)
+
+
+class RequestIdentity:
+    """
+    The validated token, principal and user resolved from the access token cookie of a request.
+
+    The CustomUser is loaded lazily, so requests that only need the token claims never read it.
+    """
+
+    def __init__(self, token=None, error=None):
+        self.token = token
+        self.error = error
+        self.principal = TokenPrincipal(token, self.get_user) if token is not None else None
+        self._user = None
+
+    def get_user(self):
+        """Return the CustomUser for the token, raising AuthenticationFailed if it cannot be used."""
+        if self.error:
+            raise AuthenticationFailed(self.error)
+        if self._user is None:
+            try:
+                self._user = CookieJWTAuthentication().get_user(self.token)
+            except AuthenticationFailed as e:
+                logger.warning("Token validation failed: %s", e)
+                self.error = f"Token validation failed: {str(e)}"
+                raise AuthenticationFailed(self.error)
+        return self._user
+
+    @property
+    def user(self):
+        if self.token is None:
+            return AnonymousUser()
         try:
-            validated_token = self.get_validated_token(token)
-           
+            return self.get_user()
+        except AuthenticationFailed:
+            return AnonymousUser()
+
+    @property
+    def roles(self):
+        return get_user_role(self.principal or self.user)
+
+
+def resolve_identity(request):
+    """
+    Decode and validate the access token cookie once per request.
+
+    The result is stored on the underlying HttpRequest so the middleware, DRF authentication,
+    signals and views all share the same token, principal and user.
+    """
+    http_request = getattr(request, '_request', request)
+    identity = getattr(http_request, 'identity', None)
+    if identity is not None:
+        return identity
+
+    raw_token = http_request.COOKIES.get('access_token')
+    if not raw_token:
+        identity = RequestIdentity()
+    else:
+        try:
+            validated_token = CookieJWTAuthentication().get_validated_token(raw_token)
+
             if is_token_blacklisted(validated_token):
-                print("Token is blacklisted")
                 raise AuthenticationFailed("Token is blacklisted")
-            
-            user_id = validated_token.get("user_id")
-            
-            if not user_id:
+
+            if not validated_token.get("user_id"):
                 raise AuthenticationFailed("Invalid token: user_id not found")
-            
-            user = self.get_user(validated_token)  # This should work with a validated token
-            
-            return (user, validated_token)
+
+            identity = RequestIdentity(token=validated_token)
         except AuthenticationFailed as e:
-            logger.warning(f"Token validation failed: {str(e)}")
-            raise AuthenticationFailed(f"Token validation failed: {str(e)}")
+            logger.warning("Token validation failed: %s", e)
+            identity = RequestIdentity(error=f"Token validation failed: {str(e)}")
         except Exception as e:
-            logger.error(f"Error retrieving user: {str(e)}")
-            raise AuthenticationFailed(f"Error retrieving user: {str(e)}")
+            logger.error("Error retrieving user: %s", e)
+            identity = RequestIdentity(error=f"Error retrieving user: {str(e)}")
+
+    http_request.identity = identity
+    return identity
+
+
+class CookieJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        """
+        Same checks as JWTAuthentication.get_user, but the user and roles come from the user cache.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        try:
+            user = load_user(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        return user
+
+    def authenticate(self, request):
+        if not request.COOKIES.get('access_token'):
+            return None  # No token found, skip this authentication class
+
+        identity = resolve_identity(request)
+        if identity.error:
+            raise AuthenticationFailed(identity.error)
+
+        return (identity.get_user(), identity.token)
+
+
+class CookieJWTClaimsAuthentication(CookieJWTAuthentication):
+    """
+    Authenticate from the verified token claims alone and return a TokenPrincipal.
+
+    No user row is read unless the view dereferences a field outside the claims, so role
+    changes and deactivation take effect when the access token is next refreshed.
+    """
+
+    def authenticate(self, request):
+        if not request.COOKIES.get('access_token'):
+            return None
+
+        identity = resolve_identity(request)
+        if identity.error:
+            raise AuthenticationFailed(identity.error)
+
+        return (identity.principal, identity.token)
@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBlacklistFilter:
+    """
+    In-memory copy of the blacklisted jti values.
+
+    The set is synced incrementally using the BlacklistedToken id as a watermark, so a
+    revocation check is a set lookup and the database is only read once per sync interval.
+    """
+
+    # Ids are not guaranteed to commit in order, so the whole table is reloaded now and then
+    # to pick up any row that committed behind the watermark.
+    FULL_SYNC_INTERVAL = 3600
+
+    def __init__(self, sync_interval):
+        self.sync_interval = sync_interval
+        self._expires = {}  # jti -> expires_at
+        self._watermark = 0
+        self._next_sync = 0
+        self._next_full_sync = 0
+        self._lock = threading.Lock()
+
+    def sync(self, force=False):
+        with self._lock:
+            if not force and time.monotonic() < self._next_sync:
+                return
+            if time.monotonic() >= self._next_full_sync:
+                self._expires = {}
+                self._watermark = 0
+                self._next_full_sync = time.monotonic() + self.FULL_SYNC_INTERVAL
+            rows = (
+                BlacklistedToken.objects.filter(id__gt=self._watermark)
+                .order_by('id')
+                .values_list('id', 'token__jti', 'token__expires_at')
+            )
+            for blacklist_id, jti, expires_at in rows:
+                self._expires[jti] = expires_at
+                self._watermark = blacklist_id
+
+            # Expired tokens fail validation anyway, so there is no need to remember them.
+            current_time = timezone.now()
+            for jti in [jti for jti, expires_at in self._expires.items() if expires_at < current_time]:
+                del self._expires[jti]
+
+            self._next_sync = time.monotonic() + self.sync_interval
+
+    def add(self, jti, expires_at):
+        with self._lock:
+            self._expires[jti] = expires_at
+
+    def __contains__(self, jti):
+        self.sync()
+        return jti in self._expires
+
+
+def is_jti_blacklisted(jti):
+    """
+    Check the in-memory filter first; only a hit is confirmed against the database, so an
+    entry removed in another process is never trusted blindly.
+    """
+    if jti not in token_blacklist:
+        return False
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+token_blacklist = TokenBlacklistFilter(settings.TOKEN_BLACKLIST_SYNC_INTERVAL)
+
+
+def prune_expired_tokens(batch_size=1000):
+    """
+    Delete outstanding tokens that have expired, together with their blacklist entries.
+
+    Rows are removed in batches to keep each delete statement and its locks short.
+    Returns the number of outstanding tokens deleted.
+    """
+    deleted = 0
+    current_time = timezone.now()
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lt=current_time)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+
+    logger.info("Pruned %s expired outstanding tokens", deleted)
+    return deleted
@@ -0,0 +1,89 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .renderers import ColumnarJSONRenderer, MessagePackRenderer, msgpack
+
+COLUMNAR_FORMATS = ('columnar', 'msgpack')
+
+# Serializer fields whose database value is already what the field renders.
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField, RelatedField)
+
+
+def get_columns(serializer, model):
+    """
+    Map the serializer's readable fields to model columns, as (name, attname, converter) tuples.
+
+    Nested `*_details` objects and related fields become the foreign key value, the same as a
+    collapsed `?expand=`. Fields with no single backing column (many-to-many, reverse
+    relations, method fields, dotted sources) are left out.
+    """
+    columns = []
+    for name, field in serializer.fields.items():
+        if field.write_only or field.source == '*' or '.' in field.source:
+            continue
+        if isinstance(field, (serializers.ListSerializer, ManyRelatedField)):
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+        if not model_field.concrete or model_field.many_to_many:
+            continue
+
+        passthrough = isinstance(field, (serializers.BaseSerializer, *PASSTHROUGH_FIELDS))
+        converter = None if passthrough else field.to_representation
+        columns.append((name, model_field.attname, converter))
+    return columns
+
+
+class ColumnarListMixin:
+    """
+    List view mixin for the compact formats, `?format=columnar` (JSON) and `?format=msgpack`.
+
+    Both return `{"columns": [...], "rows": [[...], ...]}` read with values_list(), so no model
+    instances or per-row serializers are built. `?fields=` and keyset pagination still apply.
+    """
+    renderer_classes = [
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        ColumnarJSONRenderer,
+        *([MessagePackRenderer] if msgpack is not None else []),
+    ]
+
+    def list(self, request, *args, **kwargs):
+        if getattr(request.accepted_renderer, 'format', None) not in COLUMNAR_FORMATS:
+            return super().list(request, *args, **kwargs)
+
+        self.included = None
+        queryset = self.filter_queryset(self.get_queryset()).select_related(None).prefetch_related(None)
+        model = queryset.model
+        columns = get_columns(self.get_serializer(), model)
+
+        names = [attname for _, attname, _ in columns]
+        lookups = list(dict.fromkeys([*names, 'pk']))
+        cursor_field = getattr(self, 'cursor_field', getattr(self.paginator, 'cursor_field', None))
+        try:
+            model._meta.get_field(cursor_field)
+            lookups = list(dict.fromkeys([*lookups, cursor_field]))
+        except (FieldDoesNotExist, TypeError):
+            pass
+        rows = queryset.values_list(*lookups, named=True)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            rows = page
+
+        positions = [lookups.index(attname) for attname in names]
+        converters = [(position, converter) for position, (_, _, converter) in zip(positions, columns)]
+        data = {
+            'columns': [name for name, _, _ in columns],
+            'rows': [
+                [row[i] if convert is None or row[i] is None else convert(row[i]) for i, convert in converters]
+                for row in rows
+            ],
+        }
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,215 @@
+"""
+In-process connection pool for the Postgres backend, enabled with DB_POOL=True.
+
+Django 5.0 opens a connection per thread and closes it after CONN_MAX_AGE seconds. With the
+pool, the backend in api/db_pool/base.py borrows a connection when a request first queries
+and hands it back when Django closes it at the end of the request, so all the threads of a
+worker share at most `MAX_SIZE` open connections. A request that finds none free waits up
+to `TIMEOUT` seconds. Pools are per process; get_pool_stats() reports the current one.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Hand out at most `max_size` connections, made by the `connect` callable given to acquire().
+
+    An idle connection is checked with `check(connection)` before it is handed out again when it
+    has been idle for `check_idle` seconds or more (None turns the checks off), and is replaced
+    once it is older than `max_lifetime` seconds. `reset(connection)` runs when it comes back
+    and returns False when the connection can not be reused.
+    """
+
+    def __init__(self, check=None, reset=None, max_size=10, timeout=10, max_lifetime=1800, check_idle=30):
+        self.check = check
+        self.reset = reset
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check_idle = check_idle
+        self.pid = os.getpid()
+
+        self._condition = threading.Condition()
+        self._idle = deque()  # (connection, created at, returned at), most recently returned last
+        self._created_at = {}  # id(connection) -> created at, for the connections in use
+        self._in_use = 0
+        self._waiting = 0
+
+        self.requests = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.timeouts = 0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.health_check_failures = 0
+
+    def acquire(self, connect):
+        """Return a pooled connection, or a new one from `connect()` while the pool has room."""
+        self._check_pid()
+        started = time.monotonic()
+        waited = False
+        with self._condition:
+            self.requests += 1
+            while not self._idle and self._in_use >= self.max_size:
+                remaining = started + self.timeout - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f'No database connection was free within {self.timeout}s ({self.max_size} in use).'
+                    )
+                waited = True
+                self._waiting += 1
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            if waited:
+                wait_time = time.monotonic() - started
+                self.waits += 1
+                self.wait_time += wait_time
+                self.max_wait_time = max(self.max_wait_time, wait_time)
+            entry = self._idle.pop() if self._idle else None
+            self._in_use += 1
+
+        # The slot is taken; checks and connecting happen outside the lock.
+        try:
+            if entry is not None:
+                connection, created_at, returned_at = entry
+                if self.is_reusable(connection, created_at, returned_at):
+                    self._created_at[id(connection)] = created_at
+                    return connection
+                self.close(connection)
+            connection = connect()
+        except BaseException:
+            self._free_slot()
+            raise
+        with self._condition:
+            self.connections_created += 1
+        self._created_at[id(connection)] = time.monotonic()
+        return connection
+
+    def release(self, connection):
+        """Take a connection back, closing it if it is broken or too old."""
+        if os.getpid() != self.pid:
+            return
+        created_at = self._created_at.pop(id(connection), None)
+        reusable = (
+            created_at is not None
+            and not connection.closed
+            and not self.is_expired(created_at)
+            and (self.reset is None or self.reset(connection))
+        )
+        if not reusable:
+            self.close(connection)
+            self._free_slot()
+            return
+        with self._condition:
+            self._in_use -= 1
+            self._idle.append((connection, created_at, time.monotonic()))
+            self._condition.notify()
+
+    def discard(self, connection):
+        """Close a connection that is in use instead of taking it back."""
+        if os.getpid() != self.pid:
+            return
+        self._created_at.pop(id(connection), None)
+        self.close(connection)
+        self._free_slot()
+
+    def is_expired(self, created_at):
+        return self.max_lifetime is not None and time.monotonic() - created_at >= self.max_lifetime
+
+    def is_reusable(self, connection, created_at, returned_at):
+        if connection.closed or self.is_expired(created_at):
+            return False
+        if self.check is None or self.check_idle is None or time.monotonic() - returned_at < self.check_idle:
+            return True
+        if self.check(connection):
+            return True
+        with self._condition:
+            self.health_check_failures += 1
+        logger.warning("Dropped a pooled database connection that failed its health check")
+        return False
+
+    def close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            logger.debug("Error closing a pooled database connection", exc_info=True)
+        with self._condition:
+            self.connections_closed += 1
+
+    def close_idle(self):
+        """Close the idle connections, e.g. before the process exits."""
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+        for connection, _, _ in idle:
+            self.close(connection)
+
+    def _free_slot(self):
+        with self._condition:
+            self._in_use -= 1
+            self._condition.notify()
+
+    def _check_pid(self):
+        # A forked worker must not use its parent's sockets; it forgets them and starts empty.
+        if os.getpid() != self.pid:
+            with self._condition:
+                self.pid = os.getpid()
+                self._idle.clear()
+                self._created_at.clear()
+                self._in_use = 0
+
+    def stats(self):
+        with self._condition:
+            return {
+                'max_size': self.max_size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'requests': self.requests,
+                'waits': self.waits,
+                'wait_time_total_ms': round(self.wait_time * 1000, 3),
+                'wait_time_avg_ms': round(self.wait_time * 1000 / self.waits, 3) if self.waits else 0.0,
+                'wait_time_max_ms': round(self.max_wait_time * 1000, 3),
+                'timeouts': self.timeouts,
+                'connections_created': self.connections_created,
+                'connections_closed': self.connections_closed,
+                'health_check_failures': self.health_check_failures,
+            }
+
+
+def get_pool(alias, create=None):
+    """Return the pool of a database alias, made by `create()` the first time it is asked for."""
+    pool = _pools.get(alias)
+    if pool is None and create is not None:
+        with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None:
+                pool = _pools[alias] = create()
+    return pool
+
+
+def get_pool_stats():
+    """Return {alias: stats} for the pools of this process."""
+    return {alias: pool.stats() for alias, pool in list(_pools.items())}
+
+
+def close_pools():
+    for pool in list(_pools.values()):
+        pool.close_idle()
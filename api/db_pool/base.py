@@ -0,0 +1,64 @@
+"""
+Postgres backend that borrows its connections from the pool in api/db_pool. Use it as
+ENGINE 'api.db_pool' with CONN_MAX_AGE 0, and the pool settings under the 'POOL' key.
+"""
+from functools import partial
+
+from django.db.backends.postgresql import base as postgresql
+
+from . import ConnectionPool, PoolTimeout, get_pool
+
+# psycopg2.extensions.TRANSACTION_STATUS_IDLE, and psycopg.pq.TransactionStatus.IDLE.
+TRANSACTION_STATUS_IDLE = 0
+
+
+class DatabaseWrapper(postgresql.DatabaseWrapper):
+
+    def create_pool(self):
+        options = self.settings_dict.get('POOL') or {}
+        return ConnectionPool(
+            check=self.check_pooled_connection,
+            reset=self.reset_pooled_connection,
+            max_size=options.get('MAX_SIZE', 10),
+            timeout=options.get('TIMEOUT', 10),
+            max_lifetime=options.get('MAX_LIFETIME', 1800),
+            check_idle=options.get('CHECK_IDLE', 30) if self.settings_dict['CONN_HEALTH_CHECKS'] else None,
+        )
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias, self.create_pool)
+        try:
+            return pool.acquire(partial(super().get_new_connection, conn_params))
+        except PoolTimeout as e:
+            raise self.Database.OperationalError(str(e)) from e
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = get_pool(self.alias)
+        if pool is None:
+            return super()._close()
+        if self.in_atomic_block:
+            # Django keeps the connection until the block exits, so it can not go back to the pool.
+            pool.discard(self.connection)
+        else:
+            pool.release(self.connection)
+
+    def check_pooled_connection(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                connection.rollback()
+        except self.Database.Error:
+            return False
+        return True
+
+    def reset_pooled_connection(self, connection):
+        """Roll back whatever the last request left open, so the next one starts clean."""
+        try:
+            if connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except self.Database.Error:
+            return False
+        return True
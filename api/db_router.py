@@ -0,0 +1,76 @@
+"""
+Send the reads of GET requests to the read replicas in settings.DATABASE_REPLICAS and everything else to 'default'.
+
+A request reads from one replica, picked when it first reads, so its rows come from a single snapshot.
+It reads from the primary instead when it is not a safe request, once it has written anything, and
+when its user wrote something in the last DB_REPLICA_STICKY_SECONDS seconds, so a user always reads
+their own writes even if the replica lags. Tokens, users and groups are always read from the primary,
+so a logout or a deactivated account takes effect at once. Management commands, the shell and
+background workers have no request and use the primary.
+"""
+import logging
+import random
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .utils import get_request_context
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Apps whose rows decide who may do what; never read them from a replica that may lag.
+PRIMARY_ONLY_APPS = {'auth', 'sessions', 'token_blacklist'}
+CACHE_KEY_PREFIX = 'api:db-primary:'
+
+
+def get_cache():
+    return caches[settings.DB_REPLICA_CACHE_ALIAS]
+
+
+def pin_to_primary(user_id):
+    """Read the user's requests from the primary for the next DB_REPLICA_STICKY_SECONDS seconds."""
+    if settings.DATABASE_REPLICAS and user_id is not None:
+        get_cache().set(f'{CACHE_KEY_PREFIX}{user_id}', True, settings.DB_REPLICA_STICKY_SECONDS)
+
+
+def is_pinned_to_primary(user_id):
+    return user_id is not None and get_cache().get(f'{CACHE_KEY_PREFIX}{user_id}') is not None
+
+
+def can_read_from_replica(method, user_id):
+    """Whether a request may read from a replica, decided when it starts."""
+    return bool(settings.DATABASE_REPLICAS) and method in SAFE_METHODS and not is_pinned_to_primary(user_id)
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        context = get_request_context()
+        if context is None or not context.read_from_replica or context.wrote:
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label in PRIMARY_ONLY_APPS or model._meta.label == settings.AUTH_USER_MODEL:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if context.replica is None:
+            context.replica = random.choice(settings.DATABASE_REPLICAS)
+        return context.replica
+
+    def db_for_write(self, model, **hints):
+        context = get_request_context()
+        if context is not None:
+            context.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -23,3 +23,15 @@ class TrackStatusFilter(filters.FilterSet):
     class Meta:
         model = TrackStatus
         fields = ['pr_no',]
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    pass
+
+
+class OutboundEmailFilter(filters.FilterSet):
+    ids = NumberInFilter(field_name='id', lookup_expr='in', required=True)
+
+    class Meta:
+        model = OutboundEmail
+        fields = ['status',]
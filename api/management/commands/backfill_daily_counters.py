@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.rollups import DAILY_METRICS, rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the DailyCounter rollup behind the daily reports from the source tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Only rebuild the last N days. Rebuilds all history by default.')
+        parser.add_argument('--metric', action='append', choices=sorted(DAILY_METRICS),
+                            help='Metric to rebuild, may be repeated. All metrics by default.')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['days'] is not None:
+            if options['days'] < 1:
+                raise CommandError('--days must be at least 1.')
+            since = timezone.localdate() - timedelta(days=options['days'] - 1)
+
+        written = rebuild_counters(options['metric'], since)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} daily counters.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.rollups import rebuild_status_counters
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the StatusCounter rollup behind the status board from the purchase request and order tables.'
+
+    def handle(self, *args, **options):
+        written = rebuild_status_counters()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} status counters.'))
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from api.resend import encode_attachment
+
+
+def legacy_encode(file):
+    """The previous pipeline: temp file round trip, full read, then one Python int per byte."""
+    temp_file_path = os.path.join(tempfile.gettempdir(), f'legacy-{os.getpid()}')
+    try:
+        with open(temp_file_path, 'wb') as temp_file:
+            for chunk in file.chunks():
+                temp_file.write(chunk)
+        with open(temp_file_path, 'rb') as f:
+            return list(f.read())
+    finally:
+        os.remove(temp_file_path)
+
+
+class Command(BaseCommand):
+    help = 'Measure peak memory and latency of encoding 1, 10 and 50 MB email attachments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 50], help='Attachment sizes in MB.')
+        parser.add_argument('--legacy', action='store_true', help='Also measure the old list(bytes) pipeline.')
+
+    def handle(self, *args, **options):
+        pipelines = [('streaming', encode_attachment)]
+        if options['legacy']:
+            pipelines.append(('legacy', legacy_encode))
+
+        self.stdout.write(f'{"pipeline":<10} {"size":>6} {"peak MB":>9} {"x size":>7} {"ms":>8}')
+        for size_mb in options['sizes']:
+            with tempfile.NamedTemporaryFile(suffix='.xlsx') as source:
+                source.write(os.urandom(size_mb * 1024 * 1024))
+                source.flush()
+
+                for name, encode in pipelines:
+                    with open(source.name, 'rb') as f:
+                        upload = File(f, name='rfq.xlsx')
+                        tracemalloc.start()
+                        started = time.perf_counter()
+                        payload = encode(upload)
+                        elapsed = time.perf_counter() - started
+                        peak = tracemalloc.get_traced_memory()[1]
+                        tracemalloc.stop()
+                        del payload
+
+                    peak_mb = peak / 1024 / 1024
+                    self.stdout.write(
+                        f'{name:<10} {size_mb:>4}MB {peak_mb:>9.1f} {peak_mb / size_mb:>7.1f} {elapsed * 1000:>8.0f}'
+                    )
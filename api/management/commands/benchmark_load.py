@@ -0,0 +1,68 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPSConnection
+from threading import local
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import CustomUser
+from api.tokens import CustomRefreshToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Send concurrent GET requests to a running server and report throughput and latency per path, '
+        'e.g. a sync endpoint and its /api/async/ version, under the WSGI and the ASGI server profile.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Paths to load, e.g. /api/purchase-request/.')
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server to load.')
+        parser.add_argument('--email', required=True, help='User whose access token is sent.')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per path.')
+        parser.add_argument('--concurrency', type=int, default=50, help='Requests in flight at once.')
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(email=options['email'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f'No user with email {options["email"]}.')
+        cookie = f'access_token={CustomRefreshToken.for_user(user).access_token}'
+        base = urlsplit(options['base_url'])
+        connection_class = HTTPSConnection if base.scheme == 'https' else HTTPConnection
+        connections = local()
+
+        def fetch(path):
+            # One keep-alive connection per client thread.
+            connection = getattr(connections, 'connection', None)
+            if connection is None:
+                connection = connections.connection = connection_class(base.netloc, timeout=60)
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path, headers={'Cookie': cookie})
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except OSError:
+                connection.close()
+                connections.connection = None
+                status = None
+            return status, time.perf_counter() - started
+
+        self.stdout.write(f'{"path":<45} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"errors":>7}')
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            for path in options['paths']:
+                list(executor.map(fetch, [path] * options['concurrency']))  # warm up connections and caches
+                started = time.perf_counter()
+                results = list(executor.map(fetch, [path] * options['requests']))
+                elapsed = time.perf_counter() - started
+
+                latencies = sorted(latency for _, latency in results)
+                errors = sum(1 for status, _ in results if status != 200)
+                p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+                self.stdout.write(
+                    f'{path:<45} {len(results) / elapsed:>8.1f} {statistics.median(latencies) * 1000:>8.1f} '
+                    f'{p95 * 1000:>8.1f} {errors:>7}'
+                )
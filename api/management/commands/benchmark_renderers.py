@@ -0,0 +1,70 @@
+import time
+from datetime import timedelta
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.models import CampusDirector, PurchaseRequest, Requesitioner
+from api.renderers import ORJSONParser, ORJSONRenderer
+from api.serializers import PurchaseRequestSerializer
+
+
+def build_purchase_requests(count):
+    """Unsaved PurchaseRequest rows with their nested objects, so no database is needed."""
+    created_at = timezone.now()
+    requisitioner = Requesitioner(
+        requisition_id='REQ-0001', name='Juan Dela Cruz', gender='Male', department='College of Engineering',
+        designation='Dean', created_at=created_at,
+    )
+    campus_director = CampusDirector(cd_id='CD-0001', name='Maria Santos', designation='Campus Director',
+                                     created_at=created_at)
+    return [
+        PurchaseRequest(
+            pr_no=f'PR-2024-{i:05d}', res_center_code='RC-101', office='Supply Office', fund_cluster='01',
+            purpose=f'Procurement of office supplies for the first semester, batch {i} — ñ', status='Approved',
+            requisitioner=requisitioner, campus_director=campus_director, mode_of_procurement='Small Value',
+            total_amount=str(1000 + i), created_at=created_at - timedelta(minutes=i), updated_at=created_at,
+        )
+        for i in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Compare DRF JSONRenderer/JSONParser with the orjson pair on a PurchaseRequestSerializer payload.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Number of purchase requests.')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per measurement, the best one is kept.')
+
+    def handle(self, *args, **options):
+        data = PurchaseRequestSerializer(build_purchase_requests(options['rows']), many=True).data
+        repeat = options['repeat']
+
+        baseline = JSONRenderer().render(data)
+        rendered = ORJSONRenderer().render(data)
+        self.stdout.write(f'{options["rows"]} rows, {len(baseline) / 1024:.0f} KB, '
+                          f'identical output: {rendered == baseline}')
+
+        results = [
+            ('render', 'drf', self.best(repeat, lambda: JSONRenderer().render(data))),
+            ('render', 'orjson', self.best(repeat, lambda: ORJSONRenderer().render(data))),
+            ('parse', 'drf', self.best(repeat, lambda: self.parse(JSONParser(), baseline))),
+            ('parse', 'orjson', self.best(repeat, lambda: self.parse(ORJSONParser(), baseline))),
+        ]
+        self.stdout.write(f'{"step":<8} {"impl":<8} {"ms":>8}')
+        for step, impl, elapsed in results:
+            self.stdout.write(f'{step:<8} {impl:<8} {elapsed * 1000:>8.1f}')
+
+    def parse(self, parser, body):
+        return parser.parse(BytesIO(body), parser_context={})
+
+    def best(self, repeat, func):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
@@ -0,0 +1,221 @@
+import random
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from api.activity_partitions import is_partitioned
+from api.models import (
+    ACTIVE_PURCHASE_REQUEST_STATUSES, AbstractOfQuotation, CampusDirector, CustomUser, DeliveredItems,
+    InspectionAndAcceptance, Item, ItemQuotation, PurchaseOrder, PurchaseRequest, RecentActivity, Requesitioner,
+    RequestForQoutation, Supplier, SupplierItem, TrackStatus,
+)
+
+
+# Items, statuses and deliveries of the purchase request whose pages are checked.
+BUSY_ROWS = 100
+
+
+class Rollback(Exception):
+    pass
+
+
+def create(model, **kwargs):
+    """Insert one row without firing the activity signals."""
+    return model.objects.bulk_create([model(**kwargs)])[0]
+
+
+def get_plan_names(model, index):
+    """
+    Names that show `index` of `model` in a plan. A partitioned table's plan names the copy of the
+    index on each partition instead, which Postgres attaches to the parent index.
+    """
+    if not (model is RecentActivity and is_partitioned()):
+        return (index,)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+            'JOIN pg_class parent ON parent.oid = pg_inherits.inhparent WHERE parent.relname = %s',
+            [index],
+        )
+        return tuple(row[0] for row in cursor.fetchall())
+
+
+def get_missing_indexes(queries):
+    """The indexes named in `queries` that are not in the database, as 'table.index'."""
+    missing = []
+    with connection.cursor() as cursor:
+        for _, model, _, index in queries:
+            table = model._meta.db_table
+            if index not in connection.introspection.get_constraints(cursor, table):
+                missing.append(f'{table}.{index}')
+    return missing
+
+
+def get_hot_queries(pr_no):
+    """
+    (description, model, queryset, index) for the queries behind the busiest endpoints; the plan must
+    use the composite index written for the query, not just any index on its filter column.
+    """
+    week_ago = timezone.now() - timedelta(days=7)
+    queries = [
+        # A closed status, so the partial index on active PRs cannot stand in for (status, created_at).
+        ('daily report: PRs by status since a week ago', PurchaseRequest,
+         PurchaseRequest.objects.filter(status='Completed', created_at__gte=week_ago)
+         .annotate(day=TruncDate('created_at')).values('day').annotate(total=Count('pr_no')),
+         'pr_status_created_idx'),
+        ('PR list page', PurchaseRequest,
+         PurchaseRequest.objects.order_by('-created_at', '-pk')[:50],
+         'pr_keyset_idx'),
+        ('latest status of a PR (update_status_on_save)', TrackStatus,
+         TrackStatus.objects.filter(pr_no=pr_no).order_by('-updated_at')[:1],
+         'trackstatus_pr_updated_idx'),
+        ('TrackStatusFilter page', TrackStatus,
+         TrackStatus.objects.filter(pr_no=pr_no).order_by('-updated_at', '-pk')[:50],
+         'trackstatus_pr_updated_idx'),
+        ('ItemsFilter page', Item,
+         Item.objects.filter(purchase_request=pr_no).order_by('-created_at', '-pk')[:50],
+         'item_pr_created_idx'),
+        ('DeliveredItemsFilter page', DeliveredItems,
+         DeliveredItems.objects.filter(purchase_request=pr_no).order_by('-created_at', '-pk')[:50],
+         'delivered_pr_created_idx'),
+        ('recent activity page', RecentActivity,
+         RecentActivity.objects.filter(timestamp__gte=week_ago).order_by('-timestamp', '-pk')[:50],
+         'activity_keyset_idx'),
+    ]
+    if connection.vendor == 'postgresql':
+        # SQLite only matches a partial index when the query repeats its WHERE clause as literals,
+        # and Django sends the IN list as parameters.
+        queries.append((
+            'active PRs, newest first', PurchaseRequest,
+            PurchaseRequest.objects.filter(status__in=ACTIVE_PURCHASE_REQUEST_STATUSES).order_by('-created_at')[:50],
+            'pr_active_created_idx',
+        ))
+    return queries
+
+
+def seed(rows):
+    """
+    Insert `rows` purchase requests spread over a year, with items, status history and deliveries.
+    Return the pk of the one with BUSY_ROWS items, statuses and deliveries.
+    """
+    statuses = list(PurchaseRequest.STATUS_DESCRIPTIONS)
+    # Like production after a few years: most requests are closed, a small share is in progress.
+    weights = [1 if status in ACTIVE_PURCHASE_REQUEST_STATUSES else 30 for status in statuses]
+    current_time = timezone.now()
+    requisitioner = create(
+        Requesitioner, requisition_id='PLAN-REQ', name='Plan Check', gender='-', department='-', designation='-')
+    campus_director = create(CampusDirector, cd_id='PLAN-CD', name='Plan Check', designation='-')
+
+    purchase_requests = PurchaseRequest.objects.bulk_create([
+        PurchaseRequest(
+            pr_no=f'PLAN-PR-{i:06d}', office=f'Office {i % 20}', purpose='-',
+            status=random.choices(statuses, weights)[0],
+            requisitioner=requisitioner, campus_director=campus_director, mode_of_procurement='-',
+            total_amount=random.randint(1, 100000),
+        ) for i in range(rows)
+    ], batch_size=1000)
+    # auto_now_add ignores the value passed to the constructor, so spread the dates afterwards.
+    for purchase_request in purchase_requests:
+        purchase_request.created_at = current_time - timedelta(minutes=random.randint(0, 525600))
+    PurchaseRequest.objects.bulk_update(purchase_requests, ['created_at'], batch_size=1000)
+
+    # The pages are checked for one busy request; with only a few rows the planner rightly prefers the
+    # foreign key index and a sort, which says nothing about the composite index. The rows are shuffled
+    # because in production a request's items and statuses are added over weeks, between other requests'.
+    busy = rows // 2
+    items = [
+        Item(purchase_request=purchase_request, item_no=f'PLAN-IT-{i:06d}-{n}', stock_property_no='-', unit='-',
+             item_description='-', quantity=1, unit_cost=1, total_cost=1)
+        for i, purchase_request in enumerate(purchase_requests) for n in range(BUSY_ROWS if i == busy else 3)
+    ]
+    random.shuffle(items)
+    Item.objects.bulk_create(items, batch_size=1000)
+    track_statuses = [
+        TrackStatus(pr_no=purchase_request, status=statuses[n % len(statuses)], description='-')
+        for i, purchase_request in enumerate(purchase_requests) for n in range(BUSY_ROWS if i == busy else 3)
+    ]
+    random.shuffle(track_statuses)
+    TrackStatus.objects.bulk_create(track_statuses, batch_size=1000)
+
+    first = purchase_requests[0]
+    rfq = create(RequestForQoutation, rfq_no='PLAN-RFQ', supplier_name='-', supplier_address='-',
+                 purchase_request=first)
+    aoq = create(AbstractOfQuotation, aoq_no='PLAN-AOQ', purchase_request=first)
+    supplier = create(Supplier, supplier_no='PLAN-S', aoq=aoq, rfq=rfq)
+    item_quotation = create(ItemQuotation, item_quotation_no='PLAN-IQ', purchase_request=first, rfq=rfq,
+                            item=Item.objects.filter(purchase_request=first).first(), unit_price=1, brand_model='-')
+    supplier_item = create(SupplierItem, supplier_item_no='PLAN-SI', supplier=supplier, rfq=rfq,
+                           item_quotation=item_quotation, item_quantity=1, item_cost=1)
+    purchase_order = create(PurchaseOrder, po_no='PLAN-PO', total_amount=1, purchase_request=first,
+                            request_for_quotation=rfq, abstract_of_quotation=aoq, supplier=supplier)
+    inspection = create(InspectionAndAcceptance, inspection_no='PLAN-IN', purchase_request=first,
+                        purchase_order=purchase_order)
+    delivered_items = [
+        DeliveredItems(purchase_request=purchase_request, inspection=inspection, supplier_item=supplier_item,
+                       quantity_delivered=1)
+        for i, purchase_request in enumerate(purchase_requests) for _ in range(BUSY_ROWS if i == busy else 3)
+    ]
+    random.shuffle(delivered_items)
+    DeliveredItems.objects.bulk_create(delivered_items, batch_size=1000)
+
+    user = create(CustomUser, email='plan-check@localhost', employee_id='PLAN-CHECK', first_name='Plan',
+                  last_name='Check')
+    content_type = ContentType.objects.get_for_model(PurchaseRequest)
+    activities = RecentActivity.objects.bulk_create([
+        RecentActivity(user=user, user_role='-', activity_type='CREATE', content_type=content_type,
+                       object_id=purchase_request.pk)
+        for purchase_request in purchase_requests
+    ], batch_size=1000)
+    for activity, purchase_request in zip(activities, purchase_requests):
+        activity.timestamp = purchase_request.created_at
+    RecentActivity.objects.bulk_update(activities, ['timestamp'], batch_size=1000)
+    return purchase_requests[busy].pk
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway dataset, EXPLAIN the hot list and report queries, and fail if one of them does not '
+        'use its index. Everything runs in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Purchase requests to seed.')
+
+    def handle(self, *args, **options):
+        failures = []
+        try:
+            with transaction.atomic():
+                pr_no = seed(options['rows'])
+                with connection.cursor() as cursor:
+                    if connection.vendor == 'postgresql':
+                        cursor.execute('ANALYZE')
+                        # Only ask whether an index can serve the query, not whether it wins on this data.
+                        cursor.execute('SET LOCAL enable_seqscan = off')
+                        cursor.execute('SET LOCAL enable_sort = off')
+                    elif connection.vendor == 'sqlite':
+                        cursor.execute('ANALYZE')
+
+                queries = get_hot_queries(pr_no)
+                for index in get_missing_indexes(queries):
+                    failures.append(index)
+                    self.stdout.write(self.style.ERROR(f'FAIL  index {index} does not exist'))
+
+                for description, model, queryset, index in queries:
+                    plan = queryset.explain()
+                    if any(name in plan for name in get_plan_names(model, index)):
+                        self.stdout.write(self.style.SUCCESS(f'ok    {description}: {index}'))
+                    else:
+                        failures.append(description)
+                        self.stdout.write(self.style.ERROR(f'FAIL  {description}: expected {index}'))
+                        self.stdout.write(f'      {plan}'.replace('\n', '\n      '))
+                raise Rollback
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f'{len(failures)} indexes are missing or not used by their query.')
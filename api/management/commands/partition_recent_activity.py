@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from api.activity_partitions import ensure_partitions, partition_activity_table, supports_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Partition the RecentActivity table by month on Postgres (once) and create the partitions for the '
+        'coming months. Safe to run on every deploy; other databases keep the plain table.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=None, help='Future months to create partitions for.')
+
+    def handle(self, *args, **options):
+        if not supports_partitions():
+            self.stdout.write('This database has no declarative partitioning, RecentActivity stays one table.')
+            return
+        if partition_activity_table(options['months_ahead']):
+            self.stdout.write(self.style.SUCCESS('Partitioned RecentActivity by month.'))
+        months = ensure_partitions(options['months_ahead'])
+        self.stdout.write(self.style.SUCCESS(f'Partitions in place for the next {months} months.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.blacklist import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding JWT tokens and their blacklist entries. Run it from a scheduler (cron).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per statement.')
+
+    def handle(self, *args, **options):
+        deleted = prune_expired_tokens(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} expired tokens.'))
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.activity_partitions import prune_activity
+
+
+class Command(BaseCommand):
+    help = (
+        'Archive and remove RecentActivity months older than the retention period: whole partitions are '
+        'dropped on Postgres, rows are deleted in batches elsewhere. Run it from a scheduler (cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-months', type=int, default=settings.ACTIVITY_RETENTION_MONTHS,
+                            help='Months to keep, not counting the current one.')
+        parser.add_argument('--archive-dir', default=settings.ACTIVITY_ARCHIVE_DIR,
+                            help='Where the removed months are written as gzipped JSON lines.')
+        parser.add_argument('--no-archive', action='store_true', help='Remove old months without archiving them.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows read or deleted per statement.')
+
+    def handle(self, *args, **options):
+        archive_dir = None if options['no_archive'] else options['archive_dir'] or None
+        removed = prune_activity(options['retention_months'], archive_dir, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} recent activities.'))
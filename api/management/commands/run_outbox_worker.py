@@ -0,0 +1,48 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.outbox import get_transport, process_outbox
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued emails from the outbox. Runs until interrupted unless --once is given.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Emails claimed and sent per batch.')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to sleep when the outbox is empty.')
+        parser.add_argument('--once', action='store_true', help='Drain the outbox once and exit.')
+
+    def handle(self, *args, **options):
+        transport = get_transport()
+        total_sent = total_failed = 0
+        started = time.monotonic()
+        self.stdout.write(f'Outbox worker started with {transport.__class__.__name__}.')
+
+        try:
+            while True:
+                batch_started = time.monotonic()
+                sent, failed = process_outbox(batch_size=options['batch_size'], transport=transport)
+                total_sent += sent
+                total_failed += failed
+
+                if sent or failed:
+                    elapsed = time.monotonic() - batch_started
+                    logger.info("Outbox batch: %s sent, %s failed in %.2fs (%.1f emails/s)",
+                                sent, failed, elapsed, (sent + failed) / elapsed if elapsed else 0)
+                    continue
+
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Outbox worker stopped: {total_sent} sent, {total_failed} failed in {elapsed:.1f}s '
+            f'({total_sent / elapsed if elapsed else 0:.1f} emails/s).'
+        ))
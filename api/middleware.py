@@ -1,63 +1,133 @@
-import jwt
 import logging
-from django.conf import settings
-from django.contrib.auth.models import AnonymousUser
-from rest_framework_simplejwt.authentication import JWTAuthentication
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.utils.functional import SimpleLazyObject
-from django.contrib.auth import get_user_model
-from .utils import set_current_user, get_current_user
+from .activity import finish_buffer, start_buffer, stop_buffer, write_buffer
+from .auth import resolve_identity
+from .db_router import can_read_from_replica, pin_to_primary
+from .utils import RequestContext, reset_request_context, set_request_context
 
 logger = logging.getLogger(__name__)
 
-User = get_user_model()
+REQUEST_ID_HEADER = 'X-Request-ID'
+# Request ids accepted from the client (a proxy or the frontend); anything else gets a new one.
+VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
 
-def get_user_role(user):
-    """Get the role of the user from their group."""
-    if user.is_authenticated:
-        roles = user.groups.values_list('name', flat=True)  # Get all group names as a list
-        return roles
-    return []
 
 def get_user_from_token(request):
-    token = request.COOKIES.get("access_token")
-    if token:
-        try:
-            decoded_data = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-            user_id = decoded_data.get("user_id")
-            logger.info(f"Decoded user_id: {user_id} from token")
-            
-            if user_id:
-                user = User.objects.get(id=user_id)
-                logger.info(f"Authenticated user: {user}")
-                return user
-        except jwt.ExpiredSignatureError:
-            logger.warning("JWT token has expired.")
-        except jwt.DecodeError:
-            logger.error("Failed to decode JWT token.")
-        except User.DoesNotExist:
-            logger.warning(f"User with ID {user_id} does not exist.")
-        except Exception as e:
-            logger.error(f"An unexpected error occurred: {str(e)}")
-    else:
-        logger.info("No JWT token found in cookies.")
-    
-    return AnonymousUser()
+    """
+    Return a lazy user for the request; the CustomUser is only loaded when something reads it.
+    """
+    identity = resolve_identity(request)
+    if identity.token is None and identity.error is None:
+        logger.debug("No JWT token found in cookies.")
+    return SimpleLazyObject(lambda: identity.user)
+
+
+def get_token_user_id(request):
+    """Return the user_id claim of the request's valid access token, without loading the user."""
+    identity = getattr(request, 'identity', None)
+    if identity is None or identity.token is None or identity.error:
+        return None
+    return identity.token.get('user_id')
+
 
 class AuthenticatedUserMiddleware:
+    """
+    Start the RequestContext of the request (see api.utils) and reset it once the response is built,
+    also when resolving the user fails. Works in both sync (WSGI) and async (ASGI) stacks.
+
+    The request id is taken from X-Request-ID when the client sends a valid one and returned in
+    the same header. The middleware also decides whether the request reads from a replica, and
+    keeps the user on the primary for a while after a request of theirs wrote (see api.db_router).
+    """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
-        
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self.start_context(request)
+        try:
+            self.authenticate(request)
+            response = self.get_response(request)
+        finally:
+            self.end_context(request, token)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        token = self.start_context(request)
+        try:
+            # Token validation can read the blacklist from the database.
+            await sync_to_async(self.authenticate)(request)
+            response = await self.get_response(request)
+        finally:
+            self.end_context(request, token)
+        return self.process_response(request, response)
+
+    def start_context(self, request):
+        request_id = request.headers.get(REQUEST_ID_HEADER, '')
+        request.request_context = RequestContext(request_id=request_id if VALID_REQUEST_ID.match(request_id) else None)
+        return set_request_context(request.request_context)
+
+    def authenticate(self, request):
         logger.debug("Processing request through AuthenticatedUserMiddleware.")
+        context = request.request_context
         try:
-            user = get_user_from_token(request)
-            logger.debug(f"User extracted from token: {user}")
-            set_current_user(user)
-            request.user = SimpleLazyObject(lambda: user)
-            roles = get_user_role(user)
-            logger.debug(f"Roles for user {user}: {roles}")
+            identity = resolve_identity(request)
+            context.user = request.user = get_user_from_token(request)
+            context.roles = lambda: identity.roles
+            context.read_from_replica = can_read_from_replica(request.method, get_token_user_id(request))
         except Exception as e:
-            logger.error(f"Unexpected error in middleware: {e}")
-        response = self.get_response(request)
-        logger.debug(f'Processed response in AuthenticatedUserMiddleware: {response}')
+            logger.error("Unexpected error in middleware: %s", e)
+
+    def end_context(self, request, token):
+        context = request.request_context
+        if context.wrote:
+            try:
+                pin_to_primary(get_token_user_id(request))
+            except Exception as e:
+                logger.error("Could not keep the user on the primary database: %s", e)
+        logger.debug("Request %s %s took %.1fms", context.request_id, request.path, context.elapsed * 1000)
+        reset_request_context(token)
+
+    def process_response(self, request, response):
+        response[REQUEST_ID_HEADER] = request.request_context.request_id
         return response
+
+
+class ActivityBufferMiddleware:
+    """
+    Write the RecentActivity records of a request with one INSERT after the response is built,
+    instead of one per saved object.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        buffer, token = start_buffer()
+        try:
+            return self.get_response(request)
+        finally:
+            finish_buffer(buffer, token)
+
+    async def __acall__(self, request):
+        buffer, token = start_buffer()
+        try:
+            return await self.get_response(request)
+        finally:
+            stop_buffer(token)
+            await sync_to_async(write_buffer)(buffer)
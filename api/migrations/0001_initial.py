@@ -0,0 +1,298 @@
+# Generated by Django 5.0.6 on 2026-10-17 18:41
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AbstractOfQuotation',
+            fields=[
+                ('aoq_no', models.CharField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BACMember',
+            fields=[
+                ('member_id', models.CharField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=200)),
+                ('designation', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Budget',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('budget_no', models.CharField(max_length=50)),
+                ('department', models.CharField(max_length=50)),
+                ('budget_allocation', models.CharField(max_length=20)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CampusDirector',
+            fields=[
+                ('cd_id', models.CharField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=150)),
+                ('designation', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Requesitioner',
+            fields=[
+                ('requisition_id', models.CharField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('gender', models.CharField(max_length=50)),
+                ('department', models.CharField(max_length=100)),
+                ('designation', models.CharField(max_length=150)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RequisitionIssueSlip',
+            fields=[
+                ('ris_no', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('res_center_code', models.CharField(max_length=10)),
+                ('division', models.CharField(max_length=50)),
+                ('office', models.CharField(max_length=50)),
+                ('is_stock_available', models.CharField(max_length=10)),
+                ('quantity', models.CharField(max_length=10)),
+                ('remarks', models.CharField(max_length=100)),
+                ('purpose', models.CharField(max_length=100)),
+                ('requested_by', models.CharField(max_length=10)),
+                ('approved_by', models.CharField(max_length=10)),
+                ('issued_by', models.CharField(max_length=10)),
+                ('recieved_by', models.CharField(max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CustomUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('is_superuser', models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status')),
+                ('first_name', models.CharField(blank=True, max_length=150, verbose_name='first name')),
+                ('last_name', models.CharField(blank=True, max_length=150, verbose_name='last name')),
+                ('is_staff', models.BooleanField(default=False, help_text='Designates whether the user can log into this admin site.', verbose_name='staff status')),
+                ('date_joined', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date joined')),
+                ('employee_id', models.CharField(max_length=100, unique=True)),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('is_active', models.BooleanField(default=False)),
+                ('otp_code', models.CharField(blank=True, max_length=10, null=True)),
+                ('otp_expiration', models.DateTimeField(blank=True, null=True)),
+                ('otp_secret', models.CharField(blank=True, max_length=32, null=True)),
+                ('groups', models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups')),
+                ('user_permissions', models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions')),
+            ],
+            options={
+                'verbose_name': 'user',
+                'verbose_name_plural': 'users',
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PurchaseRequest',
+            fields=[
+                ('pr_no', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('res_center_code', models.CharField(max_length=50, null=True)),
+                ('office', models.CharField(max_length=200)),
+                ('fund_cluster', models.CharField(blank=True, max_length=50, null=True)),
+                ('purpose', models.CharField(max_length=255)),
+                ('status', models.CharField(max_length=255)),
+                ('mode_of_procurement', models.CharField(max_length=100)),
+                ('total_amount', models.CharField(default='0', max_length=150)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, null=True)),
+                ('campus_director', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchase_requests', to='api.campusdirector')),
+                ('requisitioner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchase_requests', to='api.requesitioner')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PurchaseOrder',
+            fields=[
+                ('po_no', models.CharField(primary_key=True, serialize=False)),
+                ('status', models.CharField(default='In Progress', max_length=150)),
+                ('total_amount', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, null=True)),
+                ('abstract_of_quotation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.abstractofquotation')),
+                ('purchase_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.purchaserequest')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Item',
+            fields=[
+                ('item_no', models.CharField(primary_key=True, serialize=False)),
+                ('stock_property_no', models.CharField(max_length=20)),
+                ('unit', models.CharField(max_length=255)),
+                ('item_description', models.CharField(max_length=255)),
+                ('quantity', models.CharField(max_length=50)),
+                ('unit_cost', models.CharField(max_length=50)),
+                ('total_cost', models.CharField(max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('purchase_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='api.purchaserequest')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='InspectionAndAcceptance',
+            fields=[
+                ('inspection_no', models.CharField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('purchase_order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.purchaseorder')),
+                ('purchase_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.purchaserequest')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='abstractofquotation',
+            name='purchase_request',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.purchaserequest'),
+        ),
+        migrations.CreateModel(
+            name='RecentActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_role', models.CharField(max_length=100)),
+                ('activity_type', models.CharField(choices=[('CREATE', 'Created'), ('UPDATE', 'Updated'), ('DELETE', 'Deleted')], max_length=10)),
+                ('timestamp', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('object_id', models.CharField(max_length=100)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-timestamp'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RequestForQoutation',
+            fields=[
+                ('rfq_no', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('supplier_name', models.CharField(max_length=255)),
+                ('supplier_address', models.CharField(max_length=255)),
+                ('tin', models.CharField(blank=True, max_length=50, null=True)),
+                ('is_VAT', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('purchase_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.purchaserequest')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='request_for_quotation',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.requestforqoutation'),
+        ),
+        migrations.CreateModel(
+            name='ItemQuotation',
+            fields=[
+                ('item_quotation_no', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('unit_price', models.CharField(max_length=255)),
+                ('brand_model', models.CharField(max_length=255)),
+                ('is_low_price', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.item')),
+                ('purchase_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.purchaserequest')),
+                ('rfq', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.requestforqoutation')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Supplier',
+            fields=[
+                ('supplier_no', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('extra_character', models.CharField(max_length=2, null=True)),
+                ('is_added', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('aoq', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.abstractofquotation')),
+                ('rfq', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.requestforqoutation')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='supplier',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.supplier'),
+        ),
+        migrations.CreateModel(
+            name='Bidding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bidding_no', models.CharField(max_length=50)),
+                ('total_amount', models.CharField(max_length=50)),
+                ('purchase_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.purchaserequest')),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.supplier')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SupplierItem',
+            fields=[
+                ('supplier_item_no', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('item_quantity', models.PositiveIntegerField()),
+                ('item_cost', models.PositiveIntegerField()),
+                ('total_amount', models.CharField(default=0, max_length=150)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('item_quotation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.itemquotation')),
+                ('rfq', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.requestforqoutation')),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.supplier')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StockItems',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity_delivered', models.CharField(max_length=50, null=True)),
+                ('date_received', models.DateTimeField(auto_now_add=True)),
+                ('is_complete', models.BooleanField(default=True)),
+                ('is_partial', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, null=True)),
+                ('inspection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.inspectionandacceptance')),
+                ('supplier_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.supplieritem')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PurchaseOrderItem',
+            fields=[
+                ('po_item_no', models.CharField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('purchase_order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.purchaseorder')),
+                ('purchase_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.purchaserequest')),
+                ('supplier_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.supplieritem')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DeliveredItems',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity_delivered', models.CharField(max_length=50, null=True)),
+                ('date_received', models.DateTimeField(auto_now_add=True)),
+                ('is_complete', models.BooleanField(default=True)),
+                ('is_partial', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, null=True)),
+                ('inspection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.inspectionandacceptance')),
+                ('purchase_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.purchaserequest')),
+                ('supplier_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.supplieritem')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TrackStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=150)),
+                ('description', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('pr_no', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.purchaserequest')),
+            ],
+        ),
+    ]
@@ -0,0 +1,97 @@
+"""
+Clean the stored text of the amount, cost and quantity columns before 0003 turns them into numeric
+columns, so the varchar to numeric cast cannot fail halfway. Peso signs and thousands separators are
+stripped ("₱1,250.5" -> "1250.50") and blanks become 0, or NULL where the column allows it. Values
+that are not numbers stop the migration with the list of rows to fix by hand.
+"""
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.db import migrations
+
+CURRENCY_MARKS = ('₱', 'PHP', 'Php', 'P')
+MAX_DIGITS = 14
+
+# (model, field) -> decimal places of the numeric column, None for whole numbers.
+NUMERIC_FIELDS = {
+    ('PurchaseRequest', 'total_amount'): 2,
+    ('Item', 'quantity'): None,
+    ('Item', 'unit_cost'): 2,
+    ('Item', 'total_cost'): 2,
+    ('ItemQuotation', 'unit_price'): 2,
+    ('SupplierItem', 'total_amount'): 2,
+    ('PurchaseOrder', 'total_amount'): 2,
+    ('DeliveredItems', 'quantity_delivered'): None,
+    ('Budget', 'budget_allocation'): 2,
+}
+
+
+def parse_number(value, decimal_places):
+    """
+    Return the text the numeric column accepts for a stored value, or None for blanks.
+    Raises ValueError with the reason when the value cannot be converted.
+    """
+    text = str(value).strip()
+    for mark in CURRENCY_MARKS:
+        if text.startswith(mark):
+            text = text[len(mark):].strip()
+    text = text.replace(',', '').replace(' ', '')
+    if not text:
+        return None
+
+    try:
+        number = Decimal(text)
+    except InvalidOperation:
+        raise ValueError('not a number')
+    if not number.is_finite():
+        raise ValueError('not a number')
+
+    if decimal_places is not None:
+        number = number.quantize(Decimal(1).scaleb(-decimal_places), rounding=ROUND_HALF_UP)
+        if len(number.as_tuple().digits) > MAX_DIGITS:
+            raise ValueError(f'more than {MAX_DIGITS} digits')
+        return str(number)
+
+    if number != number.to_integral_value():
+        raise ValueError('not a whole number')
+    if number < 0:
+        raise ValueError('negative')
+    return str(int(number))
+
+
+def normalize_numeric_fields(apps, schema_editor):
+    failures = []
+    for (model_name, field_name), decimal_places in NUMERIC_FIELDS.items():
+        model = apps.get_model('api', model_name)
+        nullable = model._meta.get_field(field_name).null
+        rows = model.objects.using(schema_editor.connection.alias).exclude(**{field_name: None})
+
+        updates = []
+        for pk, value in rows.values_list('pk', field_name).iterator(chunk_size=2000):
+            try:
+                number = parse_number(value, decimal_places)
+            except ValueError as e:
+                failures.append(f'{model._meta.db_table}.{field_name} pk={pk}: {value!r} is {e}')
+                continue
+            if number is None and not nullable:
+                number = parse_number(0, decimal_places)
+            if number != value:
+                updates.append((pk, number))
+
+        for pk, number in updates:
+            rows.filter(pk=pk).update(**{field_name: number})
+
+    if failures:
+        raise ValueError(
+            f'{len(failures)} values cannot be converted to numbers, fix them and migrate again:\n' + '\n'.join(failures)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_numeric_fields, migrations.RunPython.noop),
+    ]
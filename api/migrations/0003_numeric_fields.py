@@ -0,0 +1,58 @@
+# Generated by Django 5.0.6 on 2026-10-17 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_normalize_numeric_fields'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='budget',
+            name='budget_allocation',
+            field=models.DecimalField(decimal_places=2, max_digits=14),
+        ),
+        migrations.AlterField(
+            model_name='delivereditems',
+            name='quantity_delivered',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='quantity',
+            field=models.PositiveIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='total_cost',
+            field=models.DecimalField(decimal_places=2, max_digits=14),
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='unit_cost',
+            field=models.DecimalField(decimal_places=2, max_digits=14),
+        ),
+        migrations.AlterField(
+            model_name='itemquotation',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, max_digits=14),
+        ),
+        migrations.AlterField(
+            model_name='purchaseorder',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, max_digits=14),
+        ),
+        migrations.AlterField(
+            model_name='purchaserequest',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AlterField(
+            model_name='supplieritem',
+            name='total_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.0.6 on 2026-10-17 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='customuser',
+            options={},
+        ),
+        migrations.AddIndex(
+            model_name='abstractofquotation',
+            index=models.Index(fields=['created_at', 'aoq_no'], name='aoq_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bacmember',
+            index=models.Index(fields=['created_at', 'member_id'], name='bacmember_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campusdirector',
+            index=models.Index(fields=['created_at', 'cd_id'], name='campusdirector_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['date_joined', 'id'], name='user_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='delivereditems',
+            index=models.Index(fields=['created_at', 'id'], name='delivereditems_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inspectionandacceptance',
+            index=models.Index(fields=['created_at', 'inspection_no'], name='inspection_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['created_at', 'item_no'], name='item_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='itemquotation',
+            index=models.Index(fields=['created_at', 'item_quotation_no'], name='itemquotation_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['created_at', 'po_no'], name='po_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorderitem',
+            index=models.Index(fields=['created_at', 'po_item_no'], name='poitem_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(fields=['created_at', 'pr_no'], name='pr_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recentactivity',
+            index=models.Index(fields=['timestamp', 'id'], name='activity_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requesitioner',
+            index=models.Index(fields=['created_at', 'requisition_id'], name='requisitioner_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requestforqoutation',
+            index=models.Index(fields=['created_at', 'rfq_no'], name='rfq_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requisitionissueslip',
+            index=models.Index(fields=['created_at', 'ris_no'], name='ris_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockitems',
+            index=models.Index(fields=['created_at', 'id'], name='stockitems_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplier',
+            index=models.Index(fields=['created_at', 'supplier_no'], name='supplier_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supplieritem',
+            index=models.Index(fields=['created_at', 'supplier_item_no'], name='supplieritem_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trackstatus',
+            index=models.Index(fields=['updated_at', 'id'], name='trackstatus_keyset_idx'),
+        ),
+    ]
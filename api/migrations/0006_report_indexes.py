@@ -0,0 +1,38 @@
+# Generated by Django 5.0.6 on 2026-10-17 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recentactivity',
+            name='timestamp',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AddIndex(
+            model_name='delivereditems',
+            index=models.Index(fields=['purchase_request', 'created_at', 'id'], name='delivered_pr_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['purchase_request', 'created_at', 'item_no'], name='item_pr_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(fields=['status', 'created_at'], name='pr_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(condition=models.Q(('status__in', ('Pending for Approval', 'Approved', 'Forwarded to Procurement', 'Received by the Procurement', 'Ready to Order', 'Order Placed', 'Items Delivered', 'Ready for Distribution'))), fields=['-created_at'], name='pr_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trackstatus',
+            index=models.Index(fields=['pr_no', '-updated_at', '-id'], name='trackstatus_pr_updated_idx'),
+        ),
+    ]
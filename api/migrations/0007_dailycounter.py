@@ -0,0 +1,26 @@
+# Generated by Django 5.0.6 on 2026-10-17 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_report_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=50)),
+                ('day', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailycounter',
+            constraint=models.UniqueConstraint(fields=('metric', 'day'), name='dailycounter_metric_day_uniq'),
+        ),
+    ]
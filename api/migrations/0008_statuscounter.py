@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-17 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_dailycounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50)),
+                ('status', models.CharField(max_length=255)),
+                ('office', models.CharField(blank=True, default='', max_length=200)),
+                ('count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='statuscounter',
+            constraint=models.UniqueConstraint(fields=('kind', 'office', 'status'), name='statuscounter_kind_office_uniq'),
+        ),
+    ]
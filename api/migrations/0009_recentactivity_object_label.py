@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-17 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_statuscounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recentactivity',
+            name='object_label',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
@@ -0,0 +1,33 @@
+"""
+Partition api_recentactivity by month on Postgres, see api/activity_partitions.py.
+
+Only the database changes: Django's migration state keeps describing a plain table with `id` as its
+primary key, because Django cannot express the (id, timestamp) key or the partitions. Adding or
+altering a RecentActivity column in a later migration works, Postgres applies it to every partition,
+but a unique constraint or a new primary key has to include "timestamp" and needs hand-written SQL.
+Reversing this migration leaves the table partitioned, which the earlier state also works with.
+"""
+from django.db import migrations
+
+
+def partition_recent_activity(apps, schema_editor):
+    from api.activity_partitions import partition_activity_table, supports_partitions
+
+    if supports_partitions():
+        partition_activity_table()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_recentactivity_object_label'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(partition_recent_activity, migrations.RunPython.noop),
+            ],
+            state_operations=[],
+        ),
+    ]
@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 import pyotp
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
@@ -50,6 +52,9 @@ class CustomUser(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name']
 
+    class Meta:
+        indexes = [models.Index(fields=['date_joined', 'id'], name='user_keyset_idx')]
+
     def __str__(self):
         return f'{self.first_name} {self.last_name}'
 
@@ -72,6 +77,19 @@ class CustomUser(AbstractUser):
         return False
 
     
+class RecentActivityQuerySet(models.QuerySet):
+    """
+    Always filter RecentActivity on `timestamp`, the partition key; on Postgres the query then only
+    reads the monthly partitions it needs (see api/activity_partitions.py).
+    """
+
+    def recent(self, days=7):
+        return self.filter(timestamp__gte=timezone.now() - timedelta(days=days))
+
+    def between(self, start, end):
+        return self.filter(timestamp__gte=start, timestamp__lt=end)
+
+
 class RecentActivity(models.Model):
     ACTIVITY_TYPES = (
         ('CREATE', 'Created'),
@@ -82,18 +100,36 @@ class RecentActivity(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     user_role = models.CharField(max_length=100)
     activity_type = models.CharField(max_length=10, choices=ACTIVITY_TYPES)
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    timestamp = models.DateTimeField(auto_now_add=True)
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
     object_id = models.CharField(max_length=100)
     content_object = GenericForeignKey('content_type', 'object_id')
+    # What was touched, e.g. "PR 2024-10-015 — Office of the Registrar", written with the activity.
+    object_label = models.CharField(max_length=255, blank=True, default='')
+
+    objects = RecentActivityQuerySet.as_manager()
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [models.Index(fields=['timestamp', 'id'], name='activity_keyset_idx')]
 
     def __str__(self):
         return f"{self.user} {self.get_activity_type_display()} {self.content_type}"
 
 
+# Purchase requests still being worked on; the dashboards and queues only look at these.
+ACTIVE_PURCHASE_REQUEST_STATUSES = (
+    "Pending for Approval",
+    "Approved",
+    "Forwarded to Procurement",
+    "Received by the Procurement",
+    "Ready to Order",
+    "Order Placed",
+    "Items Delivered",
+    "Ready for Distribution",
+)
+
+
 class PurchaseRequest(models.Model):
     pr_no = models.CharField(max_length=50, primary_key=True)
     res_center_code = models.CharField(max_length=50, null=True)
@@ -104,9 +140,19 @@ class PurchaseRequest(models.Model):
     requisitioner = models.ForeignKey('Requesitioner', related_name="purchase_requests", on_delete=models.CASCADE)
     campus_director = models.ForeignKey('CampusDirector', related_name="purchase_requests", on_delete=models.CASCADE)
     mode_of_procurement = models.CharField(max_length=100)
-    total_amount = models.CharField(max_length=150, default="0")
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(default=now, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'pr_no'], name='pr_keyset_idx'),
+            models.Index(fields=['status', 'created_at'], name='pr_status_created_idx'),
+            models.Index(
+                fields=['-created_at'], name='pr_active_created_idx',
+                condition=models.Q(status__in=ACTIVE_PURCHASE_REQUEST_STATUSES),
+            ),
+        ]
     
     STATUS_DESCRIPTIONS = {
     "Pending for Approval" : "The purchase request has been submitted and is awaiting review and approval by the authorized personnel or department. No further action will be taken until approval is granted.",
@@ -137,6 +183,12 @@ class TrackStatus(models.Model):
     description = models.TextField() 
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='trackstatus_keyset_idx'),
+            models.Index(fields=['pr_no', '-updated_at', '-id'], name='trackstatus_pr_updated_idx'),
+        ]
+
 
 class Item(models.Model):
     purchase_request = models.ForeignKey(PurchaseRequest, related_name="items", on_delete=models.CASCADE)
@@ -144,11 +196,17 @@ class Item(models.Model):
     stock_property_no = models.CharField(max_length=20)
     unit = models.CharField(max_length=255)
     item_description = models.CharField(max_length=255)
-    quantity = models.CharField(max_length=50)
-    unit_cost = models.CharField(max_length=50)
-    total_cost = models.CharField(max_length=50)
+    quantity = models.PositiveIntegerField()
+    unit_cost = models.DecimalField(max_digits=14, decimal_places=2)
+    total_cost = models.DecimalField(max_digits=14, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'item_no'], name='item_keyset_idx'),
+            models.Index(fields=['purchase_request', 'created_at', 'item_no'], name='item_pr_created_idx'),
+        ]
+
     def __str__(self):
         return self.item_description
 
@@ -162,6 +220,9 @@ class RequestForQoutation(models.Model):
     purchase_request = models.ForeignKey(PurchaseRequest, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'rfq_no'], name='rfq_keyset_idx')]
+
     def __str__(self):
         return f'Qoutation: {self.qoutation_no}'
 
@@ -171,11 +232,14 @@ class ItemQuotation(models.Model):
     rfq = models.ForeignKey(RequestForQoutation, on_delete=models.CASCADE)
     item = models.ForeignKey(Item, on_delete=models.CASCADE)
     # unit_quantity = models.CharField(max_length=255)
-    unit_price = models.CharField(max_length=255)
+    unit_price = models.DecimalField(max_digits=14, decimal_places=2)
     brand_model = models.CharField(max_length=255)
     is_low_price = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'item_quotation_no'], name='itemquotation_keyset_idx')]
+
     def __str__(self):
         return f'Item Quotation: {self.rfq}'
 
@@ -185,6 +249,9 @@ class AbstractOfQuotation(models.Model):
     purchase_request = models.ForeignKey(PurchaseRequest, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'aoq_no'], name='aoq_keyset_idx')]
+
     def __str__(self):
         return f'Abstract of Qoutation for {self.purchase_request} of {self.purchase_request.user}'
 
@@ -196,6 +263,9 @@ class Supplier(models.Model):
     is_added = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'supplier_no'], name='supplier_keyset_idx')]
+
     def __str__(self):
         return self.supplier_no
 
@@ -207,9 +277,12 @@ class SupplierItem(models.Model):
     item_quotation = models.ForeignKey(ItemQuotation, on_delete=models.CASCADE)
     item_quantity = models.PositiveIntegerField()
     item_cost = models.PositiveIntegerField()
-    total_amount = models.CharField(max_length=150, default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'supplier_item_no'], name='supplieritem_keyset_idx')]
+
     def __str__(self):
         return self.supplier_item_no
 
@@ -217,7 +290,7 @@ class SupplierItem(models.Model):
 class PurchaseOrder(models.Model):
     po_no = models.CharField(primary_key=True)
     status = models.CharField(max_length=150, default="In Progress")
-    total_amount = models.CharField(max_length=100)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2)
     purchase_request = models.ForeignKey(PurchaseRequest, on_delete=models.CASCADE)
     request_for_quotation = models.ForeignKey(RequestForQoutation, on_delete=models.CASCADE)
     abstract_of_quotation = models.ForeignKey(AbstractOfQuotation, on_delete=models.CASCADE)
@@ -225,6 +298,9 @@ class PurchaseOrder(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(default=now, null=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'po_no'], name='po_keyset_idx')]
+
     def __str__(self):
         return f'{self.po_no}'
 
@@ -236,6 +312,9 @@ class PurchaseOrderItem(models.Model):
     supplier_item = models.ForeignKey(SupplierItem, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'po_item_no'], name='poitem_keyset_idx')]
+
 
 class InspectionAndAcceptance(models.Model):
     inspection_no = models.CharField(primary_key=True)
@@ -243,18 +322,27 @@ class InspectionAndAcceptance(models.Model):
     purchase_order = models.ForeignKey(PurchaseOrder, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'inspection_no'], name='inspection_keyset_idx')]
+
 
 class DeliveredItems(models.Model):
     purchase_request = models.ForeignKey(PurchaseRequest, on_delete=models.CASCADE)
     inspection = models.ForeignKey(InspectionAndAcceptance, on_delete=models.CASCADE)
     supplier_item = models.ForeignKey(SupplierItem, on_delete=models.CASCADE)
-    quantity_delivered = models.CharField(max_length=50, null=True)
+    quantity_delivered = models.PositiveIntegerField(null=True)
     date_received = models.DateTimeField(auto_now_add=True)
     is_complete = models.BooleanField(default=True)
     is_partial = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(default=now, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='delivereditems_keyset_idx'),
+            models.Index(fields=['purchase_request', 'created_at', 'id'], name='delivered_pr_created_idx'),
+        ]
+
     def __str__(self):
         return f'{self.purchase_request}' 
 
@@ -268,6 +356,9 @@ class StockItems(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(default=now, null=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'id'], name='stockitems_keyset_idx')]
+
     def __str__(self):
         return f'{self.iar_no}' 
 
@@ -287,6 +378,9 @@ class RequisitionIssueSlip(models.Model):
     recieved_by = models.CharField(max_length=10)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'ris_no'], name='ris_keyset_idx')]
+
     def __str__(self):
         return f'{self.ris_no} {self.office}'
 
@@ -294,7 +388,7 @@ class RequisitionIssueSlip(models.Model):
 class Budget(models.Model):
     budget_no = models.CharField(max_length=50)
     department = models.CharField(max_length=50)
-    budget_allocation = models.CharField(max_length=20)
+    budget_allocation = models.DecimalField(max_digits=14, decimal_places=2)
 
     def __str__(self):
         return f'Budget: {self.budget_allocation}'
@@ -318,12 +412,18 @@ class Requesitioner(models.Model):
     designation = models.CharField(max_length=150)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'requisition_id'], name='requisitioner_keyset_idx')]
+
 class CampusDirector(models.Model):
     cd_id = models.CharField(primary_key=True)
     name = models.CharField(max_length=150)
     designation = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'cd_id'], name='campusdirector_keyset_idx')]
+
 
 class BACMember(models.Model):
     member_id = models.CharField(primary_key=True)
@@ -331,6 +431,93 @@ class BACMember(models.Model):
     designation = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'member_id'], name='bacmember_keyset_idx')]
+
+
+class EmailAttachment(models.Model):
+    """
+    Base64-encoded file shared by the outbox emails it is attached to, so a file sent to many
+    recipients is encoded and stored once. Removed once none of its emails is waiting to be sent.
+    """
+    filename = models.CharField(max_length=255)
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.filename
+
+
+class OutboundEmail(models.Model):
+    """
+    Email queued inside the request transaction and delivered by the outbox worker.
+    """
+    PENDING = 'PENDING'
+    SENDING = 'SENDING'
+    SENT = 'SENT'
+    FAILED = 'FAILED'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    )
+
+    recipient = models.EmailField(max_length=254)
+    subject = models.CharField(max_length=255)
+    html = models.TextField()
+    attachment = models.ForeignKey(EmailAttachment, null=True, blank=True, on_delete=models.SET_NULL,
+                                   related_name='emails')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    next_attempt_at = models.DateTimeField(default=now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx')]
+
+    def __str__(self):
+        return f'{self.subject} to {self.recipient} ({self.status})'
+
+
+class DailyCounter(models.Model):
+    """
+    Number of rows per metric and day, kept up to date by signals (see api.rollups) so the
+    dashboards read a few pre-aggregated rows instead of grouping whole tables.
+    """
+    metric = models.CharField(max_length=50)
+    day = models.DateField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['metric', 'day'], name='dailycounter_metric_day_uniq')]
+
+    def __str__(self):
+        return f'{self.metric} {self.day}: {self.count}'
+
+
+class StatusCounter(models.Model):
+    """
+    Number and total amount of purchase requests or orders per status and office, kept up to date
+    on status transitions (see api.rollups). Rows with an empty office hold the totals of all offices.
+    """
+    kind = models.CharField(max_length=50)
+    status = models.CharField(max_length=255)
+    office = models.CharField(max_length=200, blank=True, default='')
+    count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'office', 'status'], name='statuscounter_kind_office_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.status} {self.office or "all offices"}: {self.count}'
+
 
 # class RecentActivity(models.Model):
 #     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
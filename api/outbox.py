@@ -0,0 +1,233 @@
+import base64
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import EmailAttachment, OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+class BaseTransport:
+    """
+    Delivers a batch of OutboundEmail rows.
+
+    send_messages returns a list of (message, error) pairs, with error None when the message was sent.
+    """
+
+    def send(self, message):
+        raise NotImplementedError
+
+    def send_messages(self, messages):
+        results = []
+        for message in messages:
+            try:
+                self.send(message)
+                results.append((message, None))
+            except Exception as e:
+                results.append((message, e))
+        return results
+
+
+class ResendTransport(BaseTransport):
+    """
+    Sends through the Resend batch API, one HTTP call per batch. The batch API does not take
+    attachments, so emails with one are sent one call each.
+    """
+
+    def send_messages(self, messages):
+        # Imported here so the other transports work without the Resend environment variables.
+        from .resend import resend
+
+        self.resend = resend
+        plain = [message for message in messages if message.attachment is None]
+        results = super().send_messages([message for message in messages if message.attachment is not None])
+        if not plain:
+            return results
+        try:
+            resend.Batch.send([self.get_params(message) for message in plain])
+        except Exception as e:
+            return results + [(message, e) for message in plain]
+        return results + [(message, None) for message in plain]
+
+    def send(self, message):
+        self.resend.Emails.send(self.get_params(message))
+
+    def get_params(self, message):
+        from .resend import sender_domain_name
+
+        params = {
+            'from': f'supply-office@{sender_domain_name}',
+            'to': [message.recipient],
+            'subject': message.subject,
+            'html': message.html,
+        }
+        if message.attachment is not None:
+            params['attachments'] = [{'content': message.attachment.content, 'filename': message.attachment.filename}]
+        return params
+
+
+class SMTPTransport(BaseTransport):
+    """
+    Sends through Django's EMAIL_BACKEND, reusing one connection for the whole batch.
+    """
+
+    def send_messages(self, messages):
+        with get_connection() as connection:
+            self.connection = connection
+            return super().send_messages(messages)
+
+    def send(self, message):
+        email = EmailMessage(
+            message.subject, message.html, settings.EMAIL_HOST_USER, [message.recipient], connection=self.connection
+        )
+        email.content_subtype = 'html'
+        if message.attachment is not None:
+            email.attach(message.attachment.filename, base64.b64decode(message.attachment.content))
+        email.send(fail_silently=False)
+
+
+class FileTransport(BaseTransport):
+    """
+    Writes each message to EMAIL_OUTBOX_FILE_PATH instead of sending it, with its attachment
+    next to it as <id>-<filename>. For local development.
+    """
+
+    def send(self, message):
+        os.makedirs(settings.EMAIL_OUTBOX_FILE_PATH, exist_ok=True)
+        path = os.path.join(settings.EMAIL_OUTBOX_FILE_PATH, f'{message.pk}.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f'<!-- To: {message.recipient} -->\n<!-- Subject: {message.subject} -->\n{message.html}')
+        if message.attachment is not None:
+            filename = os.path.basename(message.attachment.filename)
+            path = os.path.join(settings.EMAIL_OUTBOX_FILE_PATH, f'{message.pk}-{filename}')
+            with open(path, 'wb') as f:
+                f.write(base64.b64decode(message.attachment.content))
+
+
+class MemoryTransport(BaseTransport):
+    """
+    Keeps sent messages in MemoryTransport.outbox. For tests.
+    """
+    outbox = []
+
+    def send(self, message):
+        self.outbox.append(message)
+
+
+def get_transport():
+    return import_string(settings.EMAIL_OUTBOX_TRANSPORT)()
+
+
+def enqueue_email(recipient, subject, html):
+    """
+    Queue an email for the outbox worker. The row is written in the caller's transaction,
+    so nothing is sent if the request rolls back.
+    """
+    return OutboundEmail.objects.create(recipient=recipient, subject=subject, html=html)
+
+
+def enqueue_emails(recipients, subject, html, attachment=None):
+    """
+    Queue the same email for each recipient, duplicates dropped, in one INSERT. `attachment` is an
+    (filename, base64 content) pair stored once and shared by every row.
+    """
+    if attachment is not None:
+        filename, content = attachment
+        attachment = EmailAttachment.objects.create(filename=filename, content=content)
+    return OutboundEmail.objects.bulk_create([
+        OutboundEmail(recipient=recipient, subject=subject, html=html, attachment=attachment)
+        for recipient in dict.fromkeys(recipients)
+    ])
+
+
+def get_retry_delay(attempts):
+    """Exponential backoff: EMAIL_OUTBOX_RETRY_DELAY, doubled on every failed attempt, capped at one hour."""
+    return timedelta(seconds=min(settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1), 3600))
+
+
+def claim_messages(batch_size):
+    """
+    Claim up to `batch_size` due emails for this worker and commit, so the claim is visible to the
+    other workers before anything is sent.
+
+    Rows are locked with SELECT ... FOR UPDATE SKIP LOCKED, so two workers never claim the same
+    row, then marked SENDING with the attempt counted and next_attempt_at pushed out by
+    EMAIL_OUTBOX_CLAIM_TIMEOUT. A worker that dies before recording the outcome leaves its rows
+    SENDING; they are claimed again once that time has passed.
+    """
+    with transaction.atomic():
+        current_time = timezone.now()
+        messages = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status__in=[OutboundEmail.PENDING, OutboundEmail.SENDING], next_attempt_at__lte=current_time)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        for message in messages:
+            message.status = OutboundEmail.SENDING
+            message.attempts += 1
+            message.next_attempt_at = current_time + timedelta(seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT)
+        OutboundEmail.objects.bulk_update(messages, ['status', 'attempts', 'next_attempt_at'])
+
+    # One query and one copy of each attachment, however many emails of the batch share it.
+    attachments = EmailAttachment.objects.in_bulk({message.attachment_id for message in messages} - {None})
+    for message in messages:
+        message.attachment = attachments.get(message.attachment_id)
+    return messages
+
+
+def record_results(results):
+    """Store the outcome of each claimed email; failed ones are retried with backoff or given up on."""
+    sent = failed = 0
+    current_time = timezone.now()
+    for message, error in results:
+        if error is None:
+            message.status = OutboundEmail.SENT
+            message.sent_at = current_time
+            message.last_error = ''
+            sent += 1
+            continue
+
+        failed += 1
+        message.last_error = str(error)
+        if message.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            message.status = OutboundEmail.FAILED
+            logger.error("Giving up on email %s to %s: %s", message.pk, message.recipient, error)
+        else:
+            message.status = OutboundEmail.PENDING
+            message.next_attempt_at = current_time + get_retry_delay(message.attempts)
+            logger.warning("Email %s to %s failed, attempt %s: %s", message.pk, message.recipient,
+                           message.attempts, error)
+
+    with transaction.atomic():
+        OutboundEmail.objects.bulk_update(
+            [message for message, _ in results], ['status', 'last_error', 'next_attempt_at', 'sent_at']
+        )
+        # Drop the attachments that no email is waiting for any more.
+        attachment_ids = {message.attachment_id for message, _ in results} - {None}
+        if attachment_ids:
+            EmailAttachment.objects.filter(pk__in=attachment_ids).exclude(
+                emails__status__in=[OutboundEmail.PENDING, OutboundEmail.SENDING]
+            ).delete()
+    return sent, failed
+
+
+def process_outbox(batch_size=50, transport=None):
+    """
+    Send one batch of due emails and record the outcome of each. Returns a (sent, failed) tuple.
+
+    The batch is claimed and committed first (see claim_messages) and sent outside any
+    transaction, so no row locks are held while the transport talks to the mail service.
+    Delivery is at least once: an email is sent again if its worker dies before recording it.
+    """
+    transport = transport or get_transport()
+    messages = claim_messages(batch_size)
+    if not messages:
+        return 0, 0
+    return record_results(transport.send_messages(messages))
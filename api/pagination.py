@@ -0,0 +1,142 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on (cursor_field, pk), newest first.
+
+    Each page is a single index range scan: rows are filtered to the far side of the last
+    (cursor_field, pk) pair seen instead of skipping an OFFSET, and there is no COUNT(*).
+    The pk breaks ties so rows that share a timestamp are neither skipped nor repeated.
+
+    The field defaults to `created_at`; views whose model has none set `cursor_field`.
+    Pages are served when the request has `?cursor=` or `?page_size=`, or always when
+    API_PAGINATE_BY_DEFAULT is on. `page_size` is capped at API_MAX_PAGE_SIZE.
+
+    Response: `{"next": url, "previous": url, "results": [...]}`.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    cursor_field = 'created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for async views: the page is read with the async ORM."""
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Return the queryset of the requested page plus one row, or None when the request is not paged."""
+        params = request.query_params
+        requested = self.cursor_query_param in params or self.page_size_query_param in params
+        if not (requested or settings.API_PAGINATE_BY_DEFAULT):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.field_name = getattr(view, 'cursor_field', self.cursor_field)
+        model_field = queryset.model._meta.get_field(self.field_name)
+
+        reverse, position = self.decode_cursor(request, model_field)
+        self.reverse, self.position = reverse, position
+        if position is not None:
+            value, pk = position
+            if reverse:
+                keyset = Q(**{f'{self.field_name}__gt': value}) | Q(**{self.field_name: value, 'pk__gt': pk})
+            else:
+                keyset = Q(**{f'{self.field_name}__lt': value}) | Q(**{self.field_name: value, 'pk__lt': pk})
+            queryset = queryset.filter(keyset)
+
+        if reverse:
+            queryset = queryset.order_by(self.field_name, 'pk')
+        else:
+            queryset = queryset.order_by(f'-{self.field_name}', '-pk')
+
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        self.page = rows
+        if self.reverse:
+            self.has_next, self.has_previous = self.position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, settings.API_PAGE_SIZE))
+        except (TypeError, ValueError):
+            page_size = settings.API_PAGE_SIZE
+        return max(1, min(page_size, settings.API_MAX_PAGE_SIZE))
+
+    def decode_cursor(self, request, model_field):
+        """Return (reverse, (value, pk)), with a None position for the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            direction, value, pk = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            return direction == 'p', (model_field.to_python(value), pk)
+        except (TypeError, ValueError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, direction, instance):
+        value = getattr(instance, self.field_name)
+        data = json.dumps([direction, value.isoformat() if hasattr(value, 'isoformat') else value, instance.pk])
+        cursor = urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+        url = replace_query_param(self.base_url, self.cursor_query_param, cursor)
+        return replace_query_param(url, self.page_size_query_param, self.page_size)
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        return self.encode_cursor('n', self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor('p', self.page[0])
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
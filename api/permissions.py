@@ -0,0 +1,69 @@
+from rest_framework.permissions import SAFE_METHODS, BasePermission
+
+from .auth import get_user_role
+from .models import AbstractOfQuotation, PurchaseOrder, PurchaseOrderItem
+
+# Roles allowed to create, update or delete each model. Models that are not listed here
+# can be written by any authenticated role. Admin may write everything.
+ROLE_WRITE_PERMISSIONS = {
+    PurchaseOrder: ('Supply Officer',),
+    PurchaseOrderItem: ('Supply Officer',),
+    AbstractOfQuotation: ('BAC Officer',),
+}
+
+ADMIN_ROLE = 'Admin'
+
+
+def get_request_role(request):
+    """
+    Return the role of the request, read from the verified token claims when there is one.
+    """
+    token = request.auth
+    if token is not None and hasattr(token, 'get'):
+        return token.get('role')
+    roles = get_user_role(request.user)
+    return roles[0] if roles else None
+
+
+class IsAdminRole(BasePermission):
+    """
+    Allow only users whose role claim is Admin, e.g. for operational endpoints.
+    """
+    message = 'Only an Admin may perform this action.'
+
+    def has_permission(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return False
+        return get_request_role(request) == ADMIN_ROLE
+
+
+class HasRoleClaim(BasePermission):
+    """
+    Authorize from the role claim of the access token, without loading the user.
+
+    Reads are allowed for every authenticated user. Writes need one of the roles listed for the
+    view's model in ROLE_WRITE_PERMISSIONS, or the roles set on the view as `write_roles`.
+    """
+    message = 'Your role is not allowed to perform this action.'
+
+    def has_permission(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return False
+
+        if request.method in SAFE_METHODS:
+            return True
+
+        allowed_roles = getattr(view, 'write_roles', None)
+        if allowed_roles is None:
+            allowed_roles = ROLE_WRITE_PERMISSIONS.get(self.get_model(view))
+        if allowed_roles is None:
+            return True
+
+        role = get_request_role(request)
+        return role == ADMIN_ROLE or role in allowed_roles
+
+    def get_model(self, view):
+        model = getattr(view, 'permission_model', None)
+        if model is None and getattr(view, 'queryset', None) is not None:
+            model = view.queryset.model
+        return model
@@ -0,0 +1,92 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+def _get_relation(model, source):
+    """Return the relation field for `source` on `model`, or None if it is not a relation."""
+    try:
+        field = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+    return field if field.is_relation else None
+
+
+def _walk(serializer, model, prefix, in_prefetch, select_related, prefetch_related):
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*' or '.' in field.source:
+            continue
+
+        relation = _get_relation(model, field.source)
+        if relation is None or relation.related_model is None:
+            continue
+
+        path = f'{prefix}{field.source}'
+        many = relation.many_to_many or relation.one_to_many
+
+        if isinstance(field, serializers.BaseSerializer):
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        elif isinstance(field, ManyRelatedField):
+            nested = None
+        elif isinstance(field, RelatedField):
+            # Primary keys are read from the local <field>_id column, no join needed.
+            if field.use_pk_only_optimization() and not many:
+                continue
+            nested = None
+        else:
+            continue
+
+        if many or in_prefetch:
+            prefetch_related.append(path)
+        else:
+            select_related.append(path)
+
+        if nested is not None:
+            _walk(nested, relation.related_model, f'{path}__', in_prefetch or many, select_related, prefetch_related)
+
+
+# Serializer context entries that change which fields are rendered, see api.representation.
+PLAN_CONTEXT_KEYS = ('fields', 'expand', 'include')
+
+
+@lru_cache(maxsize=512)
+def plan_related(serializer_class, model, options=()):
+    """
+    Walk the (nested) fields of a serializer and return the select_related and prefetch_related
+    paths needed to serialize `model` instances without a query per row.
+
+    Forward foreign keys are joined with select_related; reverse and many-to-many relations,
+    and anything nested below them, are prefetched. `options` are the PLAN_CONTEXT_KEYS
+    context items, so fields that are not requested or not expanded add no joins. The plan is
+    computed once per serializer class, model and options.
+    """
+    select_related, prefetch_related = [], []
+    _walk(serializer_class(context=dict(options)), model, '', False, select_related, prefetch_related)
+    return tuple(select_related), tuple(prefetch_related)
+
+
+def get_plan_options(context):
+    return tuple((key, context[key]) for key in PLAN_CONTEXT_KEYS if key in context)
+
+
+def optimize_queryset(queryset, serializer_class, context=None):
+    options = get_plan_options(context or {})
+    select_related, prefetch_related = plan_related(serializer_class, queryset.model, options)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
+
+
+class QueryPlanMixin:
+    """
+    Generic view mixin that applies the serializer's select_related/prefetch_related plan to
+    the queryset, for list and detail requests alike.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return optimize_queryset(queryset, self.get_serializer_class(), self.get_serializer_context())
@@ -0,0 +1,111 @@
+import decimal
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt, fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - without msgpack the MessagePack format is not offered
+    msgpack = None
+
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+
+class DecimalAsStringEncoder(encoders.JSONEncoder):
+    """
+    DRF's JSONEncoder, except that raw Decimals, such as the sums the report views get from the
+    database, are written as strings like DecimalField writes them, so amounts keep their digits.
+    """
+
+    def default(self, obj):
+        if isinstance(obj, decimal.Decimal):
+            return str(obj)
+        return super().default(obj)
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson.
+
+    Types orjson does not encode itself (datetimes, decimals, UUIDs, ...) go through
+    DecimalAsStringEncoder.default, and U+2028/U+2029 are escaped like DRF does, so the output
+    matches JSONRenderer with that encoder except for floats: orjson spells some exponents
+    differently (1e16 against 1e+16) and writes NaN and Infinity as null. Data orjson rejects
+    (integers over 64 bits, dict keys that are not strings), indented output (the browsable API,
+    `; indent=` in Accept), UNICODE_JSON or COMPACT_JSON turned off, or a missing orjson fall
+    back to the stdlib renderer.
+    """
+    encoder_class = DecimalAsStringEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or indent or not (api_settings.UNICODE_JSON and api_settings.COMPACT_JSON):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except TypeError:
+            # orjson.JSONEncodeError, for the cases orjson rejects and the stdlib accepts.
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class ColumnarJSONRenderer(ORJSONRenderer):
+    """
+    Compact list format, `{"columns": [...], "rows": [[...], ...]}`, built by ColumnarListMixin.
+    Selected with `Accept: application/vnd.columnar+json` or `?format=columnar`.
+    """
+    media_type = 'application/vnd.columnar+json'
+    format = 'columnar'
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """
+    MessagePack encoding of the columnar list format.
+    Selected with `Accept: application/msgpack` or `?format=msgpack`.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=DecimalAsStringEncoder().default, use_bin_type=True)
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser that decodes with orjson. Like the strict DRF parser, it rejects NaN and Infinity.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read() if stream is not None else b''
+            if encoding.lower().replace('-', '') != 'utf8':
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
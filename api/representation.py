@@ -0,0 +1,164 @@
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+from rest_framework.response import Response
+
+
+def get_sideload_alias_name(name):
+    """`pr_details` is side-loaded and expanded as `pr`, `supplier_details` as `supplier`, and so on."""
+    return name[:-len('_details')] if name.endswith('_details') else name
+
+
+def parse_list_param(value):
+    return frozenset(item.strip() for item in value.split(',') if item.strip())
+
+
+class RepresentationSerializerMixin:
+    """
+    ModelSerializer mixin that shapes and shares work across one response.
+
+    - `fields` in the context limits the root serializer to those fields.
+    - `expand` in the context lists the nested `*_details` objects to render, as dotted alias
+      paths (`po`, `po.supplier`). Nested objects that are not expanded are rendered as their pk,
+      so their serializers are never built and the query plan skips their joins.
+      Without `expand` every nested object is rendered.
+    - Nested representations are memoized per response, keyed by serializer class, field shape and pk,
+      so a parent referenced by many rows is serialized once.
+    - With `include` in the context, nested objects whose alias is listed are replaced by their pk
+      and emitted once in the `included` map of the response instead.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        sparse_fields = self.context.get('fields')
+        if sparse_fields and self._is_top_level():
+            fields = {name: field for name, field in fields.items() if name in sparse_fields}
+
+        expand = self.context.get('expand')
+        if expand is None:
+            return fields
+
+        include = self.context.get('include', ())
+        prefix = self._get_alias_path()
+        for name, field in fields.items():
+            if not (isinstance(field, serializers.BaseSerializer) and field.read_only):
+                continue
+            alias = get_sideload_alias_name(name)
+            if f'{prefix}{alias}' in expand or alias in include:
+                continue
+            many = isinstance(field, serializers.ListSerializer)
+            fields[name] = serializers.PrimaryKeyRelatedField(source=field.source, read_only=True, many=many)
+        return fields
+
+    def _is_top_level(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+    def _get_alias_path(self):
+        """Dotted alias path of this serializer from the root, e.g. `po.supplier.`."""
+        names = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                names.append(get_sideload_alias_name(node.field_name))
+            node = node.parent
+        return ''.join(f'{name}.' for name in reversed(names))
+
+    def to_representation(self, instance):
+        cache = self.context.get('representation_cache')
+        if cache is None or self.parent is None:
+            return self._build_representation(instance)
+
+        shape = getattr(self, '_representation_shape', None)
+        if shape is None:
+            shape = self._representation_shape = (
+                self.__class__, tuple((name, field.__class__) for name, field in self.fields.items())
+            )
+        key = (shape, instance.pk)
+        if key not in cache:
+            cache[key] = self._build_representation(instance)
+        return cache[key]
+
+    def _build_representation(self, instance):
+        include = self.context.get('include', ())
+        included = self.context.get('included')
+        if included is None:
+            return super().to_representation(instance)
+
+        ret = {}
+        for field in self._readable_fields:
+            try:
+                attribute = field.get_attribute(instance)
+            except SkipField:
+                continue
+
+            check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            if check_for_none is None:
+                ret[field.field_name] = None
+                continue
+
+            alias = get_sideload_alias_name(field.field_name)
+            if alias in include and isinstance(field, serializers.Serializer):
+                key = str(attribute.pk)
+                bucket = included.setdefault(alias, {})
+                if key not in bucket:
+                    bucket[key] = None  # reserve the slot so cyclic references stop here
+                    bucket[key] = field.to_representation(attribute)
+                ret[field.field_name] = attribute.pk
+            else:
+                ret[field.field_name] = field.to_representation(attribute)
+        return ret
+
+
+def expand_paths(paths):
+    """`po.supplier` also expands `po`; field names are accepted as well as aliases."""
+    expanded = set()
+    for path in paths:
+        names = [get_sideload_alias_name(name) for name in path.split('.')]
+        for i in range(1, len(names) + 1):
+            expanded.add('.'.join(names[:i]))
+    return frozenset(expanded)
+
+
+class RepresentationViewMixin:
+    """
+    Generic view mixin for per-response serializer options on GET requests.
+
+    `?fields=po_no,status` limits each row to those fields.
+    `?expand=pr,po.supplier` renders only those nested objects, the others as their pk.
+    Without it nested objects are rendered unless API_EXPAND_NESTED_BY_DEFAULT is off.
+
+    `?include=pr,supplier` returns `{"results": [...], "included": {"pr": {pk: {...}}, ...}}`
+    with each related object listed once and rows referencing it by pk.
+    """
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['representation_cache'] = {}
+        if self.request is None or self.request.method != 'GET':
+            return context
+
+        params = self.request.query_params
+        if params.get('fields'):
+            context['fields'] = parse_list_param(params['fields'])
+
+        if 'expand' in params:
+            context['expand'] = expand_paths(parse_list_param(params['expand']))
+        elif not settings.API_EXPAND_NESTED_BY_DEFAULT:
+            context['expand'] = frozenset()
+
+        if params.get('include'):
+            context['include'] = parse_list_param(params['include'])
+            context['included'] = self.included = {}
+        return context
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        included = getattr(self, 'included', None)
+        if included is not None and request.method == 'GET' and isinstance(response, Response) \
+                and response.status_code < 400:
+            if isinstance(response.data, dict) and 'results' in response.data:
+                response.data['included'] = included  # a paginated page
+            else:
+                response.data = {'results': response.data, 'included': included}
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -1,6 +1,8 @@
+import base64
 import os
 
 import resend
+from django.conf import settings
 from django.core.mail import send_mail
 from dotenv import load_dotenv
 
@@ -22,12 +24,57 @@ def send_mail_django(message, subject, email):
     send_mail(subject, message, 'settings.EMAIL_HOST_USER', [email], fail_silently=False)
     
 
+class AttachmentTooLarge(Exception):
+    pass
+
+
+def encode_attachment(file, max_size=None):
+    """
+    Base64-encode an uploaded file one chunk at a time.
+
+    Each chunk is encoded as soon as it is read, carrying over the 0-2 bytes that do not fill a
+    base64 quantum, so the raw file is never held whole. The encoded chunks are joined at the end,
+    which briefly holds about twice the encoded size (the chunks plus the joined string). No temp
+    file is written and bytes are never expanded into Python ints.
+
+    Raises AttachmentTooLarge when the file is bigger than max_size bytes.
+    """
+    if max_size and file.size and file.size > max_size:
+        raise AttachmentTooLarge(f"{file.name} is larger than {max_size} bytes.")
+
+    encoded = []
+    remainder = b''
+    size = 0
+    for chunk in file.chunks():
+        size += len(chunk)
+        if max_size and size > max_size:
+            raise AttachmentTooLarge(f"{file.name} is larger than {max_size} bytes.")
+
+        data = remainder + chunk if remainder else chunk
+        cut = len(data) - len(data) % 3
+        encoded.append(base64.b64encode(memoryview(data)[:cut]).decode('ascii'))
+        remainder = bytes(memoryview(data)[cut:])
+
+    encoded.append(base64.b64encode(remainder).decode('ascii'))
+    return ''.join(encoded)
+
+
+def build_file_params(email, html, attachment):
+    return {
+        "from": f'supply-office@{sender_domain_name}',
+        "to": [email],
+        "subject": "Your File Attachment",
+        "html": html,
+        "attachments": [attachment],
+    }
+
+
 def send_file(file, email, html):
     """
     Sends an email with a file attachment using the Resend API.
 
     Args:
-        file (InMemoryUploadedFile or file-like object): The file to be attached.
+        file (UploadedFile): The file to be attached, streamed with file.chunks().
         email (str): The recipient's email address.
 
     Returns:
@@ -36,41 +83,18 @@ def send_file(file, email, html):
     if not email or not file:
         return {"error": "Both email and file are required."}
 
-    # Save the uploaded file temporarily
-    temp_file_path = os.path.join("temp", file.name)
-    os.makedirs("temp", exist_ok=True)  # Ensure the temp directory exists
-
     try:
-        with open(temp_file_path, "wb") as temp_file:
-            for chunk in file.chunks():
-                temp_file.write(chunk)
-
-        # Prepare the file as an attachment
-        with open(temp_file_path, "rb") as f:
-            file_content = f.read()
-
         attachment = {
-            "content": list(file_content),
+            "content": encode_attachment(file, settings.EMAIL_ATTACHMENT_MAX_SIZE),
             "filename": file.name,
         }
 
-        # Prepare email parameters
-        params = {
-            "from": f'supply-office@{sender_domain_name}',
-            "to": [email],
-            "subject": "Your File Attachment",
-            "html": html,
-            "attachments": [attachment],
-        }
-
         # Send the email using Resend
-        resend.Emails.send(params)
+        resend.Emails.send(build_file_params(email, html, attachment))
 
         return {"message": "Email sent successfully."}
+    except AttachmentTooLarge as e:
+        return {"error": str(e)}
     except Exception as e:
         return {"error": f"Failed to send email: {str(e)}"}
-    finally:
-        # Clean up the temporary file
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
 
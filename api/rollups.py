@@ -0,0 +1,289 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    AbstractOfQuotation, DailyCounter, PurchaseOrder, PurchaseRequest, RequestForQoutation, StatusCounter,
+)
+
+# metric -> (model, field values a row must have to be counted). Rows are counted on the day they were created.
+DAILY_METRICS = {
+    'purchase_requests': (PurchaseRequest, {}),
+    'purchase_requests_forwarded': (PurchaseRequest, {'status': 'Forwarded to Procurement'}),
+    'purchase_orders': (PurchaseOrder, {}),
+    'quotations': (RequestForQoutation, {}),
+    'abstracts': (AbstractOfQuotation, {}),
+}
+
+# kind -> (model, path to the office, fields read before an update) for the status board.
+STATUS_COUNTERS = {
+    'purchase_request': (PurchaseRequest, 'office', ('status', 'office', 'total_amount')),
+    'purchase_order': (PurchaseOrder, 'purchase_request__office', ('status', 'total_amount', 'purchase_request_id')),
+}
+
+MIN_WINDOW_DAYS = 7
+MAX_WINDOW_DAYS = 90
+
+
+def get_metrics(model):
+    return [(metric, conditions) for metric, (metric_model, conditions) in DAILY_METRICS.items()
+            if metric_model is model]
+
+
+def get_status_counter(model):
+    for kind, (counter_model, office_path, fields) in STATUS_COUNTERS.items():
+        if counter_model is model:
+            return kind, office_path, fields
+    return None
+
+
+def get_tracked_fields(model):
+    """Fields whose change can move a row between daily metrics or status counters."""
+    fields = {field for _, conditions in get_metrics(model) for field in conditions}
+    status_counter = get_status_counter(model)
+    if status_counter:
+        fields.update(status_counter[2])
+    return sorted(fields)
+
+
+def matches(values, conditions):
+    return all(values.get(field) == value for field, value in conditions.items())
+
+
+def add_to_counter(model, lookup, **deltas):
+    """Add `deltas` to the counter row matching `lookup` with a single UPDATE, creating the row on first use."""
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another transaction created the row first.
+        model.objects.filter(**lookup).update(**updates)
+
+
+def increment_counter(metric, day, delta=1):
+    add_to_counter(DailyCounter, {'metric': metric, 'day': day}, count=delta)
+
+
+def to_decimal(value):
+    return Decimal(str(value)) if value not in (None, '') else Decimal(0)
+
+
+def get_office(office_path, values):
+    if 'office' in values:
+        return values['office'] or ''
+    # purchase_request__office on a purchase order
+    office = PurchaseRequest.objects.filter(pk=values.get('purchase_request_id')).values_list('office', flat=True)
+    return office.first() or ''
+
+
+def remember_office(instance):
+    """
+    Read the office of a purchase order before it is deleted; when its purchase request is deleted
+    in the same cascade the office is gone by the time post_delete runs.
+    """
+    status_counter = get_status_counter(type(instance))
+    if status_counter is not None and status_counter[1] != 'office':
+        instance._counted_office = get_office(status_counter[1], {
+            field: getattr(instance, field) for field in status_counter[2]
+        })
+
+
+def record_status_change(instance, previous=None, created=False, deleted=False):
+    """Move the row's count and amount between StatusCounter rows when its status, office or amount changes."""
+    status_counter = get_status_counter(type(instance))
+    if status_counter is None:
+        return
+    kind, office_path, fields = status_counter
+
+    def normalize(values):
+        return {**values, 'total_amount': to_decimal(values.get('total_amount'))}
+
+    current = normalize({field: getattr(instance, field) for field in fields})
+    if '_counted_office' in instance.__dict__:
+        current['office'] = instance._counted_office
+    if created:
+        changes = [(current, 1)]
+    elif deleted:
+        changes = [(current, -1)]
+    elif previous is not None and normalize(previous) != current:
+        changes = [(normalize(previous), -1), (current, 1)]
+    else:
+        return
+
+    for values, sign in changes:
+        office = get_office(office_path, values)
+        lookup = {'kind': kind, 'status': values.get('status') or ''}
+        for row_office in {office, ''}:
+            add_to_counter(StatusCounter, {**lookup, 'office': row_office},
+                           count=sign, total_amount=values['total_amount'] * sign)
+
+    if previous is not None and office_path == 'office' and (previous.get('office') or '') != current['office']:
+        move_purchase_orders(instance.pk, previous.get('office') or '', current['office'])
+
+
+def move_purchase_orders(pr_no, old_office, new_office):
+    """Move the per-office purchase order counters along when their purchase request changes office."""
+    rows = (
+        PurchaseOrder.objects.filter(purchase_request_id=pr_no)
+        .values('status').annotate(total=Count('pk'), amount=Sum('total_amount')).order_by()
+    )
+    for row in rows:
+        lookup = {'kind': 'purchase_order', 'status': row['status'] or ''}
+        amount = row['amount'] or Decimal(0)
+        if old_office:
+            add_to_counter(StatusCounter, {**lookup, 'office': old_office}, count=-row['total'], total_amount=-amount)
+        if new_office:
+            add_to_counter(StatusCounter, {**lookup, 'office': new_office}, count=row['total'], total_amount=amount)
+
+
+def record_change(instance, previous=None, created=False, deleted=False):
+    """
+    Update the counters for a saved or deleted row. `previous` holds the tracked field values
+    read before an update, see get_tracked_fields.
+    """
+    metrics = get_metrics(type(instance))
+    if not metrics or instance.created_at is None:
+        return
+
+    day = timezone.localdate(instance.created_at)
+    current = {field: getattr(instance, field) for field in get_tracked_fields(type(instance))}
+    for metric, conditions in metrics:
+        if created:
+            delta = int(matches(current, conditions))
+        elif deleted:
+            delta = -matches(current, conditions)
+        elif previous is not None:
+            delta = matches(current, conditions) - matches(previous, conditions)
+        else:
+            delta = 0
+        if delta:
+            increment_counter(metric, day, delta)
+
+
+def get_window(days):
+    """Return the days of the report window, newest first, for a validated window length."""
+    today = timezone.localdate()
+    return [today - timedelta(days=i) for i in range(days)]
+
+
+def parse_window_days(value, default=MIN_WINDOW_DAYS):
+    """Parse the ?days= parameter; raises ValueError outside MIN_WINDOW_DAYS..MAX_WINDOW_DAYS."""
+    if value in (None, ''):
+        return default
+    try:
+        days = int(value)
+    except ValueError:
+        raise ValueError('days must be a whole number.')
+    if not MIN_WINDOW_DAYS <= days <= MAX_WINDOW_DAYS:
+        raise ValueError(f'days must be between {MIN_WINDOW_DAYS} and {MAX_WINDOW_DAYS}.')
+    return days
+
+
+def get_daily_counter_rows(metrics, days):
+    start = timezone.localdate() - timedelta(days=days - 1)
+    return DailyCounter.objects.filter(metric__in=metrics, day__gte=start).values_list('metric', 'day', 'count')
+
+
+def collect_daily_counts(metrics, rows):
+    counts = {metric: {} for metric in metrics}
+    for metric, day, count in rows:
+        counts[metric][day] = count
+    return counts
+
+
+def get_daily_counts(metrics, days):
+    """Return {metric: {day: count}} for the last `days` days, read in one indexed query."""
+    return collect_daily_counts(metrics, get_daily_counter_rows(metrics, days))
+
+
+async def aget_daily_counts(metrics, days):
+    """get_daily_counts for async views."""
+    return collect_daily_counts(metrics, [row async for row in get_daily_counter_rows(metrics, days)])
+
+
+def rebuild_counters(metrics=None, since=None):
+    """
+    Recompute counters from the source tables, for every day or for days from `since` on.
+    Returns the number of counter rows written.
+    """
+    metrics = metrics or list(DAILY_METRICS)
+    written = 0
+    with transaction.atomic():
+        for metric in metrics:
+            model, conditions = DAILY_METRICS[metric]
+            queryset = model.objects.filter(**conditions)
+            counters = DailyCounter.objects.filter(metric=metric)
+            if since is not None:
+                queryset = queryset.filter(created_at__date__gte=since)
+                counters = counters.filter(day__gte=since)
+
+            rows = (
+                queryset.annotate(day=TruncDate('created_at'))
+                .values('day')
+                .annotate(total=Count('pk'))
+                .order_by()
+            )
+            counters.delete()
+            created = DailyCounter.objects.bulk_create(
+                [DailyCounter(metric=metric, day=row['day'], count=row['total']) for row in rows],
+                batch_size=1000,
+            )
+            written += len(created)
+    return written
+
+
+def get_status_counter_rows(kinds, office=None):
+    rows = StatusCounter.objects.filter(kind__in=kinds)
+    if office is not None:
+        rows = rows.filter(office=office)
+    return rows.values_list('kind', 'status', 'office', 'count', 'total_amount')
+
+
+def collect_status_board(kinds, rows):
+    board = {kind: [] for kind in kinds}
+    for kind, status, office, count, total_amount in rows:
+        board[kind].append((status, office, count, total_amount))
+    return board
+
+
+def get_status_board(kinds=None, office=None):
+    """
+    Return {kind: [(status, office, count, total_amount), ...]} from the StatusCounter rows, in one query.
+    Pass office='' for the all-offices totals only.
+    """
+    kinds = kinds or list(STATUS_COUNTERS)
+    return collect_status_board(kinds, get_status_counter_rows(kinds, office))
+
+
+async def aget_status_board(kinds=None, office=None):
+    """get_status_board for async views."""
+    kinds = kinds or list(STATUS_COUNTERS)
+    return collect_status_board(kinds, [row async for row in get_status_counter_rows(kinds, office)])
+
+
+def rebuild_status_counters():
+    """Recompute the StatusCounter rows from the purchase request and order tables."""
+    with transaction.atomic():
+        StatusCounter.objects.all().delete()
+        counters = []
+        for kind, (model, office_path, _) in STATUS_COUNTERS.items():
+            for group_by in ([], [office_path]):
+                rows = (
+                    model.objects.values('status', *group_by)
+                    .annotate(total=Count('pk'), amount=Sum('total_amount'))
+                    .order_by()
+                )
+                for row in rows:
+                    office = row[office_path] or '' if group_by else ''
+                    if group_by and not office:
+                        continue  # already part of the all-offices row
+                    counters.append(StatusCounter(kind=kind, status=row['status'], office=office,
+                                                  count=row['total'], total_amount=row['amount'] or 0))
+        return len(StatusCounter.objects.bulk_create(counters, batch_size=1000))
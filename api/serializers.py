@@ -4,13 +4,22 @@ from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.conf import settings
 
+from .activity import get_activity_label, resolve_content_objects
+from .auth import get_user_role
 from .groups import assign_role_and_save
 from .models import *
+from .representation import RepresentationSerializerMixin
 
 User = get_user_model()
 
 
-class CreateUserSerializer(serializers.ModelSerializer):
+class BaseModelSerializer(RepresentationSerializerMixin, serializers.ModelSerializer):
+    """
+    Base for the API model serializers, see RepresentationSerializerMixin.
+    """
+
+
+class CreateUserSerializer(BaseModelSerializer):
     employee_id = serializers.CharField(required=True)
     first_name = serializers.CharField(required=True)
     last_name = serializers.CharField(required=True)
@@ -56,7 +65,7 @@ class CreateUserSerializer(serializers.ModelSerializer):
         assign_role_and_save(user, role)
         return user
 
-class CustomUserUpdateSerializer(serializers.ModelSerializer):
+class CustomUserUpdateSerializer(BaseModelSerializer):
     class Meta:
         model = CustomUser
         fields = ['first_name', 'last_name', 'email']
@@ -92,7 +101,7 @@ class ChangePasswordSerializer(serializers.Serializer):
         return instance
 
 
-class UserListSerializer(serializers.ModelSerializer):
+class UserListSerializer(BaseModelSerializer):
     role  = serializers.SerializerMethodField()
 
     class Meta:
@@ -100,7 +109,8 @@ class UserListSerializer(serializers.ModelSerializer):
         fields = '__all__'
     def get_role(self, obj):
         # This method retrieves the group names as a comma-separated string
-        return ', '.join(obj.groups.values_list('name', flat=True))
+        # uses the groups prefetched by the view's query plan
+        return ', '.join(group.name for group in obj.groups.all())
 
 class LoginTokenObtainPairSerializer(TokenObtainPairSerializer):
 
@@ -110,29 +120,63 @@ class LoginTokenObtainPairSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
 
         # Add custom claims
-        role = user.groups.first()  # Get the user's first group (role)
-        token['role'] = role.name if role else None  # Add role to the token
+        roles = get_user_role(user)  # Get the user's roles, first one is the primary role
+        token['role'] = roles[0] if roles else None  # Add role to the token
         token['email'] = user.email  # Add email to the token
 
         return token
 
     
-class RecentActivitySerializer(serializers.ModelSerializer):
+class RecentActivityListSerializer(serializers.ListSerializer):
+    """
+    Loads the objects of activities stored without a label (rows written before labels existed)
+    with one query per content type, instead of one per row.
+    """
+
+    def to_representation(self, data):
+        activities = list(data.all() if hasattr(data, 'all') else data)
+        self.context['content_objects'] = resolve_content_objects(
+            activity for activity in activities if not activity.object_label
+        )
+        return super().to_representation(activities)
+
+
+class RecentActivitySerializer(BaseModelSerializer):
     content_type = serializers.StringRelatedField()
     user = serializers.StringRelatedField()
+    object_label = serializers.SerializerMethodField()
 
     class Meta:
         model = RecentActivity
-        fields = ['id', 'user', 'user_role', 'activity_type', 'timestamp', 'content_type', 'object_id']
+        fields = ['id', 'user', 'user_role', 'activity_type', 'timestamp', 'content_type', 'object_id', 'object_label']
+        list_serializer_class = RecentActivityListSerializer
+
+    def get_object_label(self, activity):
+        if activity.object_label:
+            return activity.object_label
+        content_objects = self.context.get('content_objects')
+        if content_objects is None:
+            content_object = activity.content_object
+        else:
+            content_object = content_objects.get((activity.content_type_id, activity.object_id))
+        return get_activity_label(content_object) if content_object is not None else None
         
 
-class TrackStatusSerializer(serializers.ModelSerializer):
+class TrackStatusSerializer(BaseModelSerializer):
     
     class Meta: 
         model = TrackStatus
         fields = '__all__'
 
 
+class OutboundEmailStatusSerializer(BaseModelSerializer):
+    """Delivery status of a queued email, without its subject and body."""
+
+    class Meta:
+        model = OutboundEmail
+        fields = ['id', 'recipient', 'status', 'attempts', 'last_error', 'created_at', 'sent_at']
+
+
 class OTPVerificationSerializer(serializers.Serializer):
     email = serializers.EmailField()
     otp_code = serializers.CharField(max_length=6)
@@ -141,7 +185,7 @@ class ResendOTPSerializer(serializers.Serializer):
     email = serializers.EmailField()
 
 
-class CampusDirectorSerializer(serializers.ModelSerializer):
+class CampusDirectorSerializer(BaseModelSerializer):
     
     class Meta: 
         model = CampusDirector
@@ -149,14 +193,14 @@ class CampusDirectorSerializer(serializers.ModelSerializer):
 
 
 
-class RequesitionerSerializer(serializers.ModelSerializer):
+class RequesitionerSerializer(BaseModelSerializer):
     
     class Meta:
         model = Requesitioner
         fields = '__all__'
 
 
-class PurchaseRequestSerializer(serializers.ModelSerializer):
+class PurchaseRequestSerializer(BaseModelSerializer):
     requisitioner = serializers.PrimaryKeyRelatedField(queryset=Requesitioner.objects.all())
     requisitioner_details = RequesitionerSerializer(source='requisitioner', read_only=True)
 
@@ -181,7 +225,16 @@ class PurchaseRequestSerializer(serializers.ModelSerializer):
             'created_at', 
             'updated_at']  
         
-class ItemSerializer(serializers.ModelSerializer):
+class PurchaseRequestTotalsSerializer(BaseModelSerializer):
+    items_total = serializers.DecimalField(max_digits=16, decimal_places=2, read_only=True)
+    item_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = PurchaseRequest
+        fields = ['pr_no', 'office', 'status', 'total_amount', 'items_total', 'item_count', 'created_at']
+
+
+class ItemSerializer(BaseModelSerializer):
     purchase_request = serializers.PrimaryKeyRelatedField(queryset=PurchaseRequest.objects.all(), write_only=True)
     pr_details = PurchaseRequestSerializer(source='purchase_request', read_only=True)
 
@@ -195,14 +248,14 @@ class ItemSerializer(serializers.ModelSerializer):
         }
         
 
-class RequestForQoutationSerializer(serializers.ModelSerializer):
+class RequestForQoutationSerializer(BaseModelSerializer):
 
     class Meta:
         model = RequestForQoutation
         fields = '__all__'
 
 
-class ItemQuotationSerializer(serializers.ModelSerializer):
+class ItemQuotationSerializer(BaseModelSerializer):
     item = serializers.PrimaryKeyRelatedField(queryset=Item.objects.all(), write_only=True)
     item_details = ItemSerializer(source='item', read_only=True)
     
@@ -215,7 +268,7 @@ class ItemQuotationSerializer(serializers.ModelSerializer):
         }
 
 
-class AbstractOfQoutationSerializer(serializers.ModelSerializer):
+class AbstractOfQoutationSerializer(BaseModelSerializer):
     purchase_request = serializers.PrimaryKeyRelatedField(queryset=PurchaseRequest.objects.all(), write_only=True)
     pr_details = PurchaseRequestSerializer(source='purchase_request', read_only=True)
 
@@ -229,14 +282,14 @@ class AbstractOfQoutationSerializer(serializers.ModelSerializer):
 
 
 
-class BACMemberSerializer(serializers.ModelSerializer):
+class BACMemberSerializer(BaseModelSerializer):
 
     class Meta:
         model = BACMember
         fields = '__all__' 
 
 
-class SupplierSerializer(serializers.ModelSerializer):
+class SupplierSerializer(BaseModelSerializer):
     aoq = serializers.PrimaryKeyRelatedField(queryset=AbstractOfQuotation.objects.all(), write_only=True)
     aoq_details = AbstractOfQoutationSerializer(source='aoq', read_only=True)
 
@@ -255,7 +308,7 @@ class SupplierSerializer(serializers.ModelSerializer):
         }
 
 
-class SupplierItemSerializer(serializers.ModelSerializer):
+class SupplierItemSerializer(BaseModelSerializer):
     supplier = serializers.PrimaryKeyRelatedField(queryset=Supplier.objects.all(), write_only=True)
     supplier_details = SupplierSerializer(source='supplier', read_only=True)
 
@@ -278,7 +331,7 @@ class SupplierItemSerializer(serializers.ModelSerializer):
             'item_quotation_details': {'read_only': True},
         }
 
-class PurchaseOrderSerializer(serializers.ModelSerializer):
+class PurchaseOrderSerializer(BaseModelSerializer):
     purchase_request = serializers.PrimaryKeyRelatedField(queryset=PurchaseRequest.objects.all(), write_only=True)
     pr_details = PurchaseRequestSerializer(source='purchase_request', read_only=True)
 
@@ -308,7 +361,7 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
             
         }
         
-class PurchaseOrderItemSerializer(serializers.ModelSerializer):
+class PurchaseOrderItemSerializer(BaseModelSerializer):
     purchase_request = serializers.PrimaryKeyRelatedField(queryset=PurchaseRequest.objects.all(), write_only=True)
     pr_details = PurchaseRequestSerializer(source='purchase_request', read_only=True)
 
@@ -331,7 +384,7 @@ class PurchaseOrderItemSerializer(serializers.ModelSerializer):
             'supplier_item_details': {'read_only': True},
         }
 
-class InspectionAndAcceptanceSerializer(serializers.ModelSerializer):
+class InspectionAndAcceptanceSerializer(BaseModelSerializer):
     purchase_request = serializers.PrimaryKeyRelatedField(queryset=PurchaseRequest.objects.all(), write_only=True)
     pr_details = PurchaseRequestSerializer(source='purchase_request', read_only=True)
 
@@ -349,7 +402,7 @@ class InspectionAndAcceptanceSerializer(serializers.ModelSerializer):
             'po_details': {'read_only':True},
         }
 
-class DeliveredItemsSerializer(serializers.ModelSerializer):
+class DeliveredItemsSerializer(BaseModelSerializer):
     purchase_request = serializers.PrimaryKeyRelatedField(queryset=PurchaseRequest.objects.all(), write_only=True)
     pr_details = PurchaseRequestSerializer(source='purchase_request', read_only=True)
 
@@ -372,7 +425,7 @@ class DeliveredItemsSerializer(serializers.ModelSerializer):
             'item_details': {'read_only':True}
         }
 
-class StockItemsSerializer(serializers.ModelSerializer):
+class StockItemsSerializer(BaseModelSerializer):
     inspection = serializers.PrimaryKeyRelatedField(queryset=InspectionAndAcceptance.objects.all(), write_only=True)
     inspection_details = InspectionAndAcceptanceSerializer(source='inspection', read_only=True)
 
@@ -392,7 +445,7 @@ class StockItemsSerializer(serializers.ModelSerializer):
 
 
 
-class RequisitionIssueSlipSerializer(serializers.ModelSerializer):
+class RequisitionIssueSlipSerializer(BaseModelSerializer):
 
     class meta:
         model = RequisitionIssueSlip
@@ -1,50 +1,36 @@
-from django.db.models.signals import post_save, post_delete
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
 from django.apps import apps
-from django.contrib.contenttypes.models import ContentType
 from .utils import get_current_user
-from .middleware import get_user_role
-from .models import RecentActivity, TrackStatus, PurchaseRequest
+from .activity import record_activity
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from .blacklist import token_blacklist
+from .models import CustomUser, TrackStatus, PurchaseRequest
+from .rollups import (
+    DAILY_METRICS, STATUS_COUNTERS, get_tracked_fields, record_change, record_status_change, remember_office,
+)
+from .user_cache import invalidate_users
 import logging
 
 logger = logging.getLogger(__name__)
 
 def create_update_activity(sender, instance, created, **kwargs):
     user = get_current_user()
-    user_role = get_user_role(user)
-    logger.info(f"create_update_activity signal triggered for {sender.__name__}. User: {user}")
     activity_type = 'Added' if created else 'Updated'
-    content_type = ContentType.objects.get_for_model(instance)
-    
-    if user:  
-        RecentActivity.objects.create(  
-            user=user,
-            user_role= user_role,
-            activity_type=activity_type,
-            content_type=content_type,
-            object_id=instance.pk,
-        )
-        logger.info(f"RecentActivity created for {activity_type} action by {user}")
+    logger.info("create_update_activity signal triggered for %s. User: %s", sender.__name__, user)
+
+    if user:
+        record_activity(user, activity_type, instance)
     else:
         logger.warning(f"No user found for {sender.__name__} {activity_type} action")
 
 def delete_activity(sender, instance, **kwargs):
     user = get_current_user()
-    user_role = get_user_role(user)
+    logger.info("delete_activity signal triggered for %s. User: %s", sender.__name__, user)
 
-    logger.info(f"delete_activity signal triggered for {sender.__name__}. User: {user}")
-
-    content_type = ContentType.objects.get_for_model(instance)
-    
     if user:
-        RecentActivity.objects.create(
-            user=user,
-            user_role=user_role,
-            activity_type='Deleted',
-            content_type=content_type,
-            object_id=instance.pk,
-        )
-        logger.info(f"RecentActivity created for DELETE action by {user}")
+        record_activity(user, 'Deleted', instance)
     else:
         logger.warning(f"No user found for {sender.__name__} DELETE action")
 
@@ -77,3 +63,71 @@ def update_status_on_save(sender, instance, **kwargs):
         description=description,
     )
 
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_users(instance.pk)
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def invalidate_cached_user_roles(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # group.user_set.clear() does not report which users are removed
+        invalidate_users(*instance.user_set.values_list('pk', flat=True))
+        return
+
+    if not action.startswith('post_'):
+        return
+
+    if not reverse:
+        # user.groups.add(...) / remove / clear
+        instance.__dict__.pop('_role_names', None)
+        invalidate_users(instance.pk)
+    elif pk_set:
+        # group.user_set.add(...) / remove
+        invalidate_users(*pk_set)
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_members(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_users(*instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_to_token_blacklist(sender, instance, **kwargs):
+    token_blacklist.add(instance.token.jti, instance.token.expires_at)
+
+
+def remember_counted_fields(sender, instance, raw=False, **kwargs):
+    # Read the stored values before an update, so a status change can move the row between counters.
+    fields = get_tracked_fields(sender)
+    if raw or instance._state.adding or not fields:
+        return
+    instance._counted_values = sender.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+def update_counters(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = instance.__dict__.pop('_counted_values', None)
+    record_change(instance, previous=previous, created=created)
+    record_status_change(instance, previous=previous, created=created)
+
+
+def remember_counted_office(sender, instance, **kwargs):
+    remember_office(instance)
+
+
+def update_counters_on_delete(sender, instance, **kwargs):
+    record_change(instance, deleted=True)
+    record_status_change(instance, deleted=True)
+
+
+counted_models = {model for model, _ in DAILY_METRICS.values()} | {model for model, _, _ in STATUS_COUNTERS.values()}
+for model in counted_models:
+    pre_save.connect(remember_counted_fields, sender=model)
+    post_save.connect(update_counters, sender=model)
+    pre_delete.connect(remember_counted_office, sender=model)
+    post_delete.connect(update_counters_on_delete, sender=model)
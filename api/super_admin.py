@@ -4,7 +4,7 @@ from dotenv import load_dotenv
 from django.contrib.auth import get_user_model
 import uuid
 import os
-from .resend import send_mail_resend
+from .outbox import enqueue_email
 from .groups import assign_role_and_save
 
 load_dotenv()
@@ -122,7 +122,7 @@ def create_super_admin_user():
         </html>
         """
         if(ENVIRONMENT == "production"):
-            send_mail_resend(email, subject, message)
+            enqueue_email(email, subject, message)
         else:
             print(f'Email : {email}')
             print(f'Password : {password}')
@@ -1,3 +1,1434 @@
-from django.test import TestCase  # noqa: F401
+import base64
+import datetime
+import decimal
+import gzip
+import importlib
+import json
+import tempfile
+import threading
+import time
+import uuid
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import msgpack
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.core import mail
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, connections, transaction
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import db_pool
+from .activity import buffer_activities, record_activity
+from .activity_partitions import (
+    add_months, create_partition, ensure_partitions, get_archive_path, get_current_month, get_default_partition,
+    get_detached_partitions, get_partition_name, get_partitions, is_partitioned, prune_activity, to_datetime,
+)
+from .auth import CookieJWTAuthentication
+from .blacklist import TokenBlacklistFilter, is_jti_blacklisted, prune_expired_tokens, token_blacklist
+from .db_pool.base import DatabaseWrapper as PooledDatabaseWrapper
+from .management.commands.check_query_plans import get_hot_queries, get_missing_indexes, get_plan_names, seed
+from .models import (
+    AbstractOfQuotation, CampusDirector, CustomUser, DailyCounter, EmailAttachment, Item, OutboundEmail, PurchaseOrder,
+    PurchaseRequest, RecentActivity, Requesitioner, RequestForQoutation, StatusCounter, Supplier,
+)
+from .outbox import BaseTransport, MemoryTransport, SMTPTransport, claim_messages, enqueue_email, process_outbox
+from .query_plan import plan_related
+from .renderers import DecimalAsStringEncoder, ORJSONRenderer
+from .resend import AttachmentTooLarge, encode_attachment
+from .rollups import rebuild_counters, rebuild_status_counters
+from .serializers import ItemSerializer, PurchaseRequestSerializer
+from .tokens import CustomRefreshToken
+from .user_cache import load_user, user_cache
+from .utils import get_current_user, get_request_context, request_context
+
+
+def create_user(email='officer@example.com', role='Supply Officer', **fields):
+    fields.setdefault('employee_id', email.split('@')[0])
+    user = CustomUser.objects.create(email, 'S3cure-pass!', first_name='Test', last_name='User', is_active=True,
+                                     **fields)
+    if role:
+        user.groups.add(Group.objects.get_or_create(name=role)[0])
+    return user
+
+
+def create_purchase_request(pr_no='PR-0001', status='Pending for Approval', office='Registrar', **fields):
+    requisitioner, _ = Requesitioner.objects.get_or_create(
+        requisition_id='REQ-1', defaults={'name': 'Ana Cruz', 'gender': 'Female', 'department': 'Registrar',
+                                          'designation': 'Clerk'},
+    )
+    campus_director, _ = CampusDirector.objects.get_or_create(
+        cd_id='CD-1', defaults={'name': 'Ben Reyes', 'designation': 'Campus Director'},
+    )
+    fields.setdefault('total_amount', decimal.Decimal('1250.50'))
+    return PurchaseRequest.objects.create(
+        pr_no=pr_no, office=office, purpose='Office supplies', status=status, requisitioner=requisitioner,
+        campus_director=campus_director, mode_of_procurement='Small Value Procurement', **fields,
+    )
+
+
+def create_item(purchase_request, item_no, quantity=2, unit_cost='10.25'):
+    unit_cost = decimal.Decimal(unit_cost)
+    return Item.objects.create(
+        purchase_request=purchase_request, item_no=item_no, stock_property_no='SP-1', unit='box',
+        item_description=f'Item {item_no}', quantity=quantity, unit_cost=unit_cost, total_cost=unit_cost * quantity,
+    )
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class APITestCase(TestCase):
+    """
+    Base of the endpoint tests: `self.client` sends the access token cookie of `self.user` once
+    login() is called. Reads stay on the test database even when a replica is configured.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def login(self, user):
+        self.user = user
+        self.client.cookies['access_token'] = str(CustomRefreshToken.for_user(user).access_token)
+
+
+class EdgeCaseSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+    ratio = serializers.FloatField()
+    at = serializers.DateTimeField()
+    day = serializers.DateField()
+    label = serializers.CharField()
+
+
+class DecimalAsStringJSONRenderer(JSONRenderer):
+    encoder_class = DecimalAsStringEncoder
+
+
+class ORJSONRendererTests(TestCase):
+
+    def assertSameAsJSONRenderer(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), DecimalAsStringJSONRenderer().render(data))
+
+    def test_model_serializers(self):
+        purchase_request = create_purchase_request(total_amount=decimal.Decimal('1234567.89'))
+        create_item(purchase_request, 'IT-1')
+        create_item(purchase_request, 'IT-2', quantity=3, unit_cost='0.10')
+
+        self.assertSameAsJSONRenderer(PurchaseRequestSerializer(purchase_request).data)
+        items = ItemSerializer(Item.objects.all(), many=True).data
+        self.assertSameAsJSONRenderer(items)
+        # Serializers already write decimals as strings, so the output is also what DRF's own encoder writes.
+        self.assertEqual(ORJSONRenderer().render(items), JSONRenderer().render(items))
+
+    def test_edge_cases(self):
+        rows = [
+            {
+                'id': uuid.UUID('12345678-1234-5678-1234-567812345678'), 'amount': decimal.Decimal('-0.5'),
+                'ratio': ratio, 'at': datetime.datetime(2024, 10, 15, 8, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+                'day': datetime.date(2024, 2, 29), 'label': 'Pañuelo   "quoted" \\ \x07 \U0001f4e6',
+            }
+            for ratio in (0.0, -0.0, 0.1, 1e-4, 1e15, 123.456)
+        ]
+        self.assertSameAsJSONRenderer(EdgeCaseSerializer(rows, many=True).data)
+
+    def test_floats_keep_their_value(self):
+        data = {'ratios': [9.5e-5, 1e16, 1.5e-7, 1.7976931348623157e308, 5e-324]}
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_raw_decimals_are_strings(self):
+        self.assertEqual(ORJSONRenderer().render({'total': decimal.Decimal('150.00'), 'zero': decimal.Decimal('0')}),
+                         b'{"total":"150.00","zero":"0"}')
+
+    def test_values_orjson_rejects_use_the_stdlib(self):
+        self.assertSameAsJSONRenderer({'big': 2 ** 70, 'raw': decimal.Decimal('1E+20'), 1: 'int key'})
+
+    def test_non_finite_floats_are_null(self):
+        for value in (float('nan'), float('inf'), float('-inf')):
+            self.assertEqual(ORJSONRenderer().render({'ratio': value}), b'{"ratio":null}')
+
+
+class ORJSONRendererSettingsTests(SimpleTestCase):
+
+    def test_indented_output_uses_the_stdlib(self):
+        data = {'a': [1, 2.5, None]}
+        context = {'indent': 2}
+        self.assertEqual(ORJSONRenderer().render(data, renderer_context=context),
+                         JSONRenderer().render(data, renderer_context=context))
+
+
+class DailyCounterTests(APITestCase):
+
+    def get_counts(self):
+        return dict(DailyCounter.objects.filter(day=timezone.localdate()).values_list('metric', 'count'))
+
+    def test_saves_and_deletes_update_the_counters(self):
+        first = create_purchase_request('PR-0001')
+        create_purchase_request('PR-0002')
+        self.assertEqual(self.get_counts(), {'purchase_requests': 2})
+
+        first.status = 'Forwarded to Procurement'
+        first.save()
+        self.assertEqual(self.get_counts(), {'purchase_requests': 2, 'purchase_requests_forwarded': 1})
+
+        first.status = 'Received by the Procurement'
+        first.save()
+        first.delete()
+        self.assertEqual(self.get_counts(), {'purchase_requests': 1, 'purchase_requests_forwarded': 0})
+
+    def test_rebuild_matches_the_live_counters(self):
+        for number in range(3):
+            create_purchase_request(f'PR-000{number}', status='Forwarded to Procurement' if number else 'Approved')
+        live = self.get_counts()
+        DailyCounter.objects.all().delete()
+        rebuild_counters()
+        self.assertEqual(self.get_counts(), live)
+
+    def test_daily_report(self):
+        create_purchase_request('PR-0001')
+        self.login(create_user())
+
+        response = self.client.get('/api/daily-report/supply', {'days': 10})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 10)
+        self.assertEqual(response.json()[0], {
+            'day': timezone.localdate().strftime('%b %d'), 'total_purchase_request': 1, 'total_purchase_order': 0,
+        })
+        self.assertEqual(self.client.get('/api/daily-report/supply', {'days': 91}).status_code, 400)
+
+
+class ColumnarFormatTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        purchase_request = create_purchase_request()
+        for number in range(3):
+            create_item(purchase_request, f'IT-{number}', quantity=number + 1)
+        self.login(create_user())
+
+    def test_columnar_rows_hold_the_serializer_values(self):
+        objects = {row['item_no']: row for row in self.client.get('/api/item/').json()}
+
+        response = self.client.get('/api/item/', {'format': 'columnar'})
+        self.assertEqual(response['Content-Type'], 'application/vnd.columnar+json')
+        data = response.json()
+        self.assertEqual(len(data['rows']), 3)
+        for row in data['rows']:
+            row = dict(zip(data['columns'], row))
+            expected = objects[row['item_no']]
+            self.assertEqual(row.pop('pr_details'), expected['pr_details']['pr_no'])
+            self.assertEqual(row, {column: expected[column] for column in row})
+
+    def test_msgpack_matches_columnar(self):
+        columnar = self.client.get('/api/item/', {'format': 'columnar'}).json()
+        response = self.client.get('/api/item/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), columnar)
+
+
+class AsyncListViewTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        for number in range(5):
+            purchase_request = create_purchase_request(f'PR-000{number}')
+            create_item(purchase_request, f'IT-{number}')
+        self.login(create_user())
+        # The first request of a run also syncs the token blacklist; keep that out of the counts.
+        self.client.get('/api/item/')
+
+    def get(self, path, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(queries)
+
+    def test_same_rows_and_queries_as_the_sync_view(self):
+        for path, params in [
+            ('purchase-request/', {}),
+            ('item/', {}),
+            ('item/', {'page_size': 2}),
+            ('purchase-request/', {'fields': 'pr_no,requisitioner_details'}),
+        ]:
+            with self.subTest(path=path, params=params):
+                data, queries = self.get(f'/api/{path}', **params)
+                async_data, async_queries = self.get(f'/api/async/{path}', **params)
+                if 'results' in data:
+                    data, async_data = data['results'], async_data['results']
+                self.assertEqual(async_data, data)
+                self.assertEqual(async_queries, queries)
+
+
+@override_settings(API_STREAM_CHUNK_SIZE=2)
+class StreamingListTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        for number in range(5):
+            purchase_request = create_purchase_request(f'PR-000{number}')
+            create_item(purchase_request, f'IT-{number}')
+        self.user = create_user()
+        self.login(self.user)
+
+    def assertSameRows(self, body, expected):
+        # Neither list orders these tables, so compare the rows in any order.
+        def key(row):
+            return json.dumps(row, sort_keys=True)
+        self.assertEqual(sorted(json.loads(body), key=key), sorted(expected, key=key))
+
+    def test_streamed_rows_match_the_list(self):
+        for path, params in [
+            ('purchase-request/', {}),
+            ('item/', {'fields': 'item_no,purchase_request', 'expand': 'purchase_request'}),
+            ('purchase-request/totals/', {'status': 'Cancelled'}),
+        ]:
+            with self.subTest(path=path, params=params):
+                expected = self.client.get(f'/api/{path}', params).json()
+                response = self.client.get(f'/api/{path}', {**params, 'stream': 1})
+                self.assertTrue(response.streaming)
+                self.assertFalse(response.is_async)
+                self.assertSameRows(b''.join(response.streaming_content), expected)
+
+    async def test_asgi_streams_with_an_async_iterator(self):
+        expected = await sync_to_async(lambda: self.client.get('/api/purchase-request/').json())()
+        client = AsyncClient()
+        client.cookies['access_token'] = self.client.cookies['access_token'].value
+
+        response = await client.get('/api/purchase-request/', {'stream': 1})
+        self.assertTrue(response.is_async)
+        self.assertSameRows(b''.join([part async for part in response.streaming_content]), expected)
+
+
+class QueryPlanTests(TestCase):
+    """
+    The report and list queries behind the busiest endpoints must be able to use the composite index
+    written for each of them; `make check-query-plans` runs the same check against a larger dataset.
+    """
+
+    def setUp(self):
+        self.pr_no = seed(1000)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            if connection.vendor == 'postgresql':
+                # Only ask whether an index can serve the query, not whether it wins on this data.
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('SET LOCAL enable_sort = off')
+
+    def test_hot_queries_use_their_indexes(self):
+        queries = get_hot_queries(self.pr_no)
+        self.assertEqual(get_missing_indexes(queries), [])
+        for description, model, queryset, index in queries:
+            with self.subTest(description):
+                plan = queryset.explain()
+                self.assertTrue(any(name in plan for name in get_plan_names(model, index)),
+                                f'expected {index} in:\n{plan}')
+
+    def test_a_dropped_index_fails_the_check(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX item_pr_created_idx')
+        queries = get_hot_queries(self.pr_no)
+
+        self.assertEqual(get_missing_indexes(queries), ['api_item.item_pr_created_idx'])
+        [(_, model, queryset, index)] = [query for query in queries if query[3] == 'item_pr_created_idx']
+        # Another index on the table still serves the query, which must not count.
+        plan = queryset.explain()
+        self.assertIn('Index Scan', plan)
+        self.assertFalse(any(name in plan for name in get_plan_names(model, index)))
+
+
+@skipUnless('replica' in settings.DATABASES, 'Set DB_TEST_REPLICA_NAME to a second database to test replica reads.')
+@override_settings(DATABASE_REPLICAS=['replica'], DB_REPLICA_STICKY_SECONDS=1)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    The replica test database is not replicated: a purchase request written to the primary is
+    missing on the replica, so the list response shows which database served the read. Not a
+    TestCase, whose transaction would keep every read on the primary.
+    """
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        caches[settings.DB_REPLICA_CACHE_ALIAS].clear()
+        create_purchase_request()
+        self.officer = create_user('officer@example.com')
+        self.other = create_user('other@example.com')
+
+    def client_for(self, user):
+        client = APIClient()
+        client.cookies['access_token'] = str(CustomRefreshToken.for_user(user).access_token)
+        return client
+
+    def read_from_primary(self, client):
+        response = client.get('/api/purchase-request/')
+        self.assertEqual(response.status_code, 200)
+        return len(response.json()) == 1
+
+    def write(self, client):
+        response = client.post('/api/requisitioner/', {
+            'requisition_id': 'REQ-2', 'name': 'Carla Diaz', 'gender': 'Female', 'department': 'Library',
+            'designation': 'Librarian',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_reads_go_to_the_replica(self):
+        self.assertFalse(self.read_from_primary(self.client_for(self.officer)))
+
+    def test_writer_reads_from_the_primary_until_the_window_ends(self):
+        officer, other = self.client_for(self.officer), self.client_for(self.other)
+        self.write(officer)
+
+        self.assertTrue(self.read_from_primary(officer))
+        self.assertFalse(self.read_from_primary(other))
+
+        time.sleep(settings.DB_REPLICA_STICKY_SECONDS + 0.1)
+        self.assertFalse(self.read_from_primary(officer))
+
+
+class FailingTransport(BaseTransport):
+
+    def send(self, message):
+        raise ConnectionError('mail service unavailable')
+
+
+@override_settings(EMAIL_OUTBOX_TRANSPORT='api.outbox.MemoryTransport', EMAIL_OUTBOX_RETRY_DELAY=30,
+                   EMAIL_OUTBOX_MAX_ATTEMPTS=3)
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        MemoryTransport.outbox = []
+
+    def test_enqueue_is_part_of_the_callers_transaction(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                enqueue_email('a@example.com', 'Rolled back', '<p>-</p>')
+                raise RuntimeError
+        message = enqueue_email('a@example.com', 'Hello', '<p>Hi</p>')
+
+        self.assertEqual(list(OutboundEmail.objects.all()), [message])
+        self.assertEqual(message.status, OutboundEmail.PENDING)
+
+    def test_send(self):
+        message = enqueue_email('a@example.com', 'Hello', '<p>Hi</p>')
+
+        self.assertEqual(process_outbox(), (1, 0))
+        self.assertEqual([sent.pk for sent in MemoryTransport.outbox], [message.pk])
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts, message.last_error), (OutboundEmail.SENT, 1, ''))
+        self.assertIsNotNone(message.sent_at)
+        self.assertEqual(process_outbox(), (0, 0))
+
+    def test_failures_are_retried_with_backoff_then_given_up(self):
+        message = enqueue_email('a@example.com', 'Hello', '<p>Hi</p>')
+
+        for attempt, delay in [(1, 30), (2, 60)]:
+            started = timezone.now()
+            self.assertEqual(process_outbox(transport=FailingTransport()), (0, 1))
+            message.refresh_from_db()
+            self.assertEqual((message.status, message.attempts), (OutboundEmail.PENDING, attempt))
+            self.assertEqual(message.last_error, 'mail service unavailable')
+            self.assertGreaterEqual(message.next_attempt_at, started + datetime.timedelta(seconds=delay))
+            self.assertEqual(process_outbox(transport=FailingTransport()), (0, 0))  # not due yet
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+
+        self.assertEqual(process_outbox(transport=FailingTransport()), (0, 1))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), (OutboundEmail.FAILED, 3))
+
+    def test_claims_left_by_a_dead_worker_are_picked_up_again(self):
+        message = enqueue_email('a@example.com', 'Hello', '<p>Hi</p>')
+        claim_messages(10)
+        self.assertEqual(process_outbox(), (0, 0))
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(process_outbox(), (1, 0))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), (OutboundEmail.SENT, 2))
+
+
+@override_settings(EMAIL_OUTBOX_TRANSPORT='api.outbox.MemoryTransport',
+                   EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', EMAIL_ATTACHMENT_MAX_SIZE=1024)
+class SendFileToSuppliersTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        MemoryTransport.outbox = []
+        self.login(create_user())
+
+    def post(self, emails, content=b'%PDF-1.4 quotation'):
+        file = SimpleUploadedFile('rfq.pdf', content, content_type='application/pdf')
+        return self.client.post('/api/send-file/suppliers/', {'file': file, 'emails': emails}, format='multipart')
+
+    def test_queues_one_email_per_supplier_with_one_attachment(self):
+        response = self.post(['a@example.com, b@example.com', 'a@example.com'])
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual([(email['recipient'], email['status']) for email in response.json()['emails']],
+                         [('a@example.com', OutboundEmail.PENDING), ('b@example.com', OutboundEmail.PENDING)])
+        attachment = EmailAttachment.objects.get()
+        self.assertEqual((attachment.filename, base64.b64decode(attachment.content)),
+                         ('rfq.pdf', b'%PDF-1.4 quotation'))
+        self.assertEqual(
+            list(OutboundEmail.objects.values_list('recipient', 'attachment', 'status')),
+            [('a@example.com', attachment.pk, OutboundEmail.PENDING),
+             ('b@example.com', attachment.pk, OutboundEmail.PENDING)],
+        )
+
+        self.assertEqual(process_outbox(), (2, 0))
+        first, second = MemoryTransport.outbox
+        self.assertIs(first.attachment, second.attachment)
+        self.assertFalse(EmailAttachment.objects.exists())
+
+    def test_status_url_reports_each_recipient(self):
+        response = self.post(['a@example.com', 'b@example.com']).json()
+        ids = [email['id'] for email in response['emails']]
+        self.assertTrue(response['status_url'].endswith(f'/api/send-file/status/?ids={ids[0]},{ids[1]}'))
+
+        class FailForB(MemoryTransport):
+            def send(self, message):
+                if message.recipient == 'b@example.com':
+                    raise ConnectionError('mailbox unavailable')
+                super().send(message)
+
+        process_outbox(transport=FailForB())
+        statuses = self.client.get(response['status_url']).json()
+
+        self.assertEqual([(email['id'], email['recipient'], email['status'], email['attempts'], email['last_error'])
+                          for email in statuses],
+                         [(ids[0], 'a@example.com', OutboundEmail.SENT, 1, ''),
+                          (ids[1], 'b@example.com', OutboundEmail.PENDING, 1, 'mailbox unavailable')])
+        self.assertEqual(self.client.get('/api/send-file/status/', {'ids': ids[1], 'status': 'SENT'}).json(), [])
+
+    def test_status_needs_ids(self):
+        self.assertEqual(self.client.get('/api/send-file/status/').status_code, 400)
+        self.assertEqual(self.client.get('/api/send-file/status/', {'ids': 'x'}).status_code, 400)
+
+    def test_smtp_transport_attaches_the_file(self):
+        self.post(['a@example.com'])
+
+        self.assertEqual(process_outbox(transport=SMTPTransport()), (1, 0))
+        self.assertEqual(mail.outbox[0].to, ['a@example.com'])
+        self.assertEqual(mail.outbox[0].attachments, [('rfq.pdf', b'%PDF-1.4 quotation', 'application/pdf')])
+
+    def test_nothing_is_queued_for_a_bad_request(self):
+        bad_requests = [(['a@example.com', 'not-an-email'], b'-'), (['a@example.com'], b'-' * 1025), ([], b'-')]
+        for emails, content in bad_requests:
+            with self.subTest(emails=emails, size=len(content)):
+                self.assertEqual(self.post(emails, content).status_code, 400)
+        self.assertFalse(OutboundEmail.objects.exists())
+        self.assertFalse(EmailAttachment.objects.exists())
+
+
+@override_settings(EMAIL_OUTBOX_TRANSPORT='api.outbox.MemoryTransport')
+class OutboxWorkerConcurrencyTests(TransactionTestCase):
+
+    def run_in_thread(self, function):
+        results = []
+
+        def target():
+            try:
+                results.append(function())
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+        return results[0]
+
+    def test_locked_rows_are_skipped(self):
+        for number in range(4):
+            enqueue_email(f'{number}@example.com', 'Hello', '<p>Hi</p>')
+
+        with transaction.atomic():
+            locked = list(OutboundEmail.objects.select_for_update().order_by('id')[:2])
+            claimed = self.run_in_thread(lambda: claim_messages(10))
+
+        self.assertEqual(len(claimed), 2)
+        self.assertFalse({message.pk for message in claimed} & {message.pk for message in locked})
+
+    def test_emails_are_sent_outside_the_claim_transaction_and_only_once(self):
+        for number in range(3):
+            enqueue_email(f'{number}@example.com', 'Hello', '<p>Hi</p>')
+        test = self
+
+        class SecondWorkerTransport(MemoryTransport):
+
+            def send_messages(self, messages):
+                # Another worker polls while this one is still sending.
+                test.assertFalse(connection.in_atomic_block)
+                test.second_worker = test.run_in_thread(process_outbox)
+                return super().send_messages(messages)
+
+        MemoryTransport.outbox = []
+        self.assertEqual(process_outbox(transport=SecondWorkerTransport()), (3, 0))
+        self.assertEqual(self.second_worker, (0, 0))
+        self.assertEqual(len(MemoryTransport.outbox), 3)
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.SENT).count(), 3)
+
+
+class RequestIdentityTests(APITestCase):
+
+    def test_token_is_validated_once_per_request(self):
+        self.login(create_user())
+        validate = CookieJWTAuthentication.get_validated_token
+
+        with mock.patch.object(CookieJWTAuthentication, 'get_validated_token', autospec=True,
+                               side_effect=validate) as get_validated_token:
+            response = self.client.get('/api/users/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_validated_token.call_count, 1)
+
+    def test_middleware_and_view_share_the_identity(self):
+        user = create_user()
+        self.login(user)
+
+        response = self.client.get('/api/users/')
+
+        request = response.wsgi_request
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((request.identity.token['user_id'], request.user.pk), (user.pk, user.pk))
+        self.assertIs(request.identity.get_user(), request.identity.get_user())
+
+    def test_bad_tokens_are_rejected(self):
+        for token in ['not-a-token', str(CustomRefreshToken.for_user(create_user('other@example.com')))]:
+            with self.subTest(token=token[:20]):
+                self.client.cookies['access_token'] = token
+                self.assertEqual(self.client.get('/api/users/').status_code, 401)
+
+    def test_inactive_users_are_rejected(self):
+        user = create_user()
+        self.login(user)
+        user.is_active = False
+        user.save()
+
+        self.assertEqual(self.client.get('/api/users/').status_code, 401)
+
+
+class UserCacheTests(TestCase):
+
+    def setUp(self):
+        self.user = create_user()
+        user_cache.delete(self.user.pk)
+
+    def test_users_are_read_once(self):
+        load_user(self.user.pk)
+
+        with self.assertNumQueries(0):
+            user = load_user(self.user.pk)
+        self.assertEqual((user.email, user._role_names), (self.user.email, ['Supply Officer']))
+
+    def test_copies_do_not_leak_changes(self):
+        load_user(self.user.pk).first_name = 'Changed'
+
+        self.assertEqual(load_user(self.user.pk).first_name, 'Test')
+
+    def test_saves_and_group_changes_drop_the_entry(self):
+        load_user(self.user.pk)
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertEqual(load_user(self.user.pk).first_name, 'Renamed')
+
+        self.user.groups.add(Group.objects.get_or_create(name='BAC Officer')[0])
+        self.assertEqual(load_user(self.user.pk)._role_names, ['Supply Officer', 'BAC Officer'])
+
+        self.user.groups.clear()
+        self.assertEqual(load_user(self.user.pk)._role_names, [])
+
+    def test_missing_users_raise(self):
+        with self.assertRaises(CustomUser.DoesNotExist):
+            load_user(self.user.pk + 1000)
+
+
+class TokenBlacklistTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user()
+        token_blacklist.sync(force=True)
+
+    def blacklist(self, jti, expires_at=None):
+        expires_at = expires_at or timezone.now() + datetime.timedelta(hours=1)
+        outstanding = OutstandingToken.objects.create(user=self.user, jti=jti, token='-', expires_at=expires_at)
+        return BlacklistedToken.objects.create(token=outstanding)
+
+    def test_revoked_access_tokens_are_rejected(self):
+        self.login(self.user)
+        self.assertEqual(self.client.get('/api/users/').status_code, 200)
+
+        self.blacklist(AccessToken(self.client.cookies['access_token'].value)['jti'])
+
+        self.assertEqual(self.client.get('/api/users/').status_code, 401)
+
+    def test_unlisted_tokens_are_checked_in_memory(self):
+        with self.assertNumQueries(0):
+            self.assertFalse(is_jti_blacklisted(uuid.uuid4().hex))
+
+    def test_sync_picks_up_rows_from_other_processes(self):
+        blacklist = TokenBlacklistFilter(sync_interval=3600)
+        self.assertNotIn('first', blacklist)
+        self.blacklist('first')
+        self.blacklist('expired', expires_at=timezone.now() - datetime.timedelta(minutes=1))
+
+        with self.assertNumQueries(0):
+            self.assertNotIn('first', blacklist)  # the next sync is not due yet
+        blacklist.sync(force=True)
+        self.assertIn('first', blacklist)
+        self.assertNotIn('expired', blacklist)
+
+    def test_prune_expired_tokens(self):
+        past = timezone.now() - datetime.timedelta(days=1)
+        for number in range(3):
+            self.blacklist(f'expired-{number}', expires_at=past)
+        OutstandingToken.objects.create(user=self.user, jti='expired-unlisted', token='-', expires_at=past)
+        self.blacklist('current')
+
+        self.assertEqual(prune_expired_tokens(batch_size=2), 4)
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['current'])
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+
+class RoleClaimTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.users = {
+            role: create_user(f'{role.lower().replace(" ", "-")}@example.com', role=role)
+            for role in ['Supply Officer', 'BAC Officer', 'Admin']
+        }
+
+    def post_as(self, role, path='/api/purchase-order/'):
+        self.login(self.users[role])
+        return self.client.post(path, {}, format='json')
+
+    def test_writes_need_a_listed_role(self):
+        self.assertEqual(self.post_as('BAC Officer').status_code, 403)
+        self.assertEqual(self.post_as('Supply Officer').status_code, 400)  # allowed, then validated
+        self.assertEqual(self.post_as('Admin').status_code, 400)
+        self.assertEqual(self.post_as('Supply Officer', '/api/abstract-of-quotation/').status_code, 403)
+
+    def test_reads_and_unlisted_models_are_open_to_every_role(self):
+        self.login(self.users['BAC Officer'])
+
+        self.assertEqual(self.client.get('/api/purchase-order/').status_code, 200)
+        response = self.client.post('/api/requisitioner/', {
+            'requisition_id': 'REQ-2', 'name': 'Carla Diaz', 'gender': 'Female', 'department': 'Library',
+            'designation': 'Librarian',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_role_comes_from_the_token_without_reading_the_user(self):
+        user = self.users['BAC Officer']
+        self.login(user)
+        user.groups.set([Group.objects.get(name='Supply Officer')])  # applies once the token is refreshed
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/purchase-order/', {}, format='json')
+
+        self.assertEqual(response.status_code, 403)
+        user_table = CustomUser._meta.db_table
+        self.assertFalse([query['sql'] for query in queries if f'FROM "{user_table}"' in query['sql']])
+
+    def test_admin_only_endpoints(self):
+        self.login(self.users['Supply Officer'])
+        self.assertEqual(self.client.get('/api/metrics/db-pool/').status_code, 403)
+
+        self.login(self.users['Admin'])
+        self.assertEqual(self.client.get('/api/metrics/db-pool/').status_code, 200)
+
+
+class AttachmentEncodingTests(SimpleTestCase):
+
+    def upload(self, content, chunk_size):
+        file = SimpleUploadedFile('rfq.pdf', content)
+        file.DEFAULT_CHUNK_SIZE = chunk_size
+        return file
+
+    def test_matches_base64_across_chunk_boundaries(self):
+        for size in [0, 1, 2, 3, 10, 64, 65]:
+            content = bytes(range(256))[:size] * 3
+            for chunk_size in [1, 2, 3, 7, 64]:
+                with self.subTest(size=len(content), chunk_size=chunk_size):
+                    encoded = encode_attachment(self.upload(content, chunk_size))
+                    self.assertEqual(encoded, base64.b64encode(content).decode('ascii'))
+
+    def test_files_over_the_limit_are_refused(self):
+        with self.assertRaises(AttachmentTooLarge):
+            encode_attachment(self.upload(b'x' * 11, 4), max_size=10)
+
+        # Without a declared size the limit is checked while reading.
+        file = self.upload(b'x' * 11, 4)
+        file.size = None
+        with self.assertRaises(AttachmentTooLarge):
+            encode_attachment(file, max_size=10)
+
+        self.assertEqual(encode_attachment(self.upload(b'x' * 10, 4), max_size=10), 'eHh4eHh4eHh4eA==')
+
+
+@override_settings(EMAIL_ATTACHMENT_MAX_SIZE=1024)
+class SendFileTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.login(create_user())
+
+    def post(self, content):
+        file = SimpleUploadedFile('rfq.pdf', content, content_type='application/pdf')
+        return self.client.post('/api/send-file/', {'file': file, 'email': 'a@example.com'}, format='multipart')
+
+    @mock.patch('api.resend.resend.Emails.send')
+    def test_sends_the_encoded_file(self, send):
+        self.assertEqual(self.post(b'%PDF-1.4 quotation').status_code, 200)
+
+        params = send.call_args.args[0]
+        self.assertEqual(params['to'], ['a@example.com'])
+        self.assertEqual(params['attachments'], [{'content': base64.b64encode(b'%PDF-1.4 quotation').decode(),
+                                                  'filename': 'rfq.pdf'}])
+
+    @mock.patch('api.resend.resend.Emails.send')
+    def test_large_files_are_refused_before_sending(self, send):
+        self.assertEqual(self.post(b'x' * 1025).status_code, 400)
+        send.assert_not_called()
+
+
+class PurchaseRequestWithItemsSerializer(serializers.ModelSerializer):
+    items = ItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = PurchaseRequest
+        fields = ['pr_no', 'requisitioner', 'items']
+
+
+class QueryPlanningTests(APITestCase):
+
+    def test_plans_follow_the_serializer_tree(self):
+        self.assertEqual(plan_related(ItemSerializer, Item), (
+            ('purchase_request', 'purchase_request__requisitioner', 'purchase_request__campus_director'), (),
+        ))
+        # Primary keys need no join; reverse relations and everything below them are prefetched.
+        self.assertEqual(plan_related(PurchaseRequestWithItemsSerializer, PurchaseRequest), ((), (
+            'items', 'items__purchase_request', 'items__purchase_request__requisitioner',
+            'items__purchase_request__campus_director',
+        )))
+
+    def test_list_queries_do_not_grow_with_the_rows(self):
+        self.login(create_user())
+        counts = []
+        for number in range(6):
+            purchase_request = create_purchase_request(f'PR-000{number}')
+            create_item(purchase_request, f'IT-{number}')
+            if number in (0, 5):
+                self.client.get('/api/item/')  # keep the blacklist sync out of the count
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get('/api/item/')
+                self.assertEqual(len(response.json()), number + 1)
+                counts.append(len(queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+
+class SideLoadingTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.login(create_user())
+        first, second = create_purchase_request('PR-0001'), create_purchase_request('PR-0002')
+        for number, purchase_request in enumerate([first, first, first, second]):
+            create_item(purchase_request, f'IT-{number}')
+
+    def test_included_parents_are_listed_once(self):
+        rows = self.client.get('/api/item/').json()
+        response = self.client.get('/api/item/', {'include': 'pr'}).json()
+
+        self.assertEqual(response['included'], {'pr': {row['pr_details']['pr_no']: row['pr_details'] for row in rows}})
+        self.assertEqual(len(response['included']['pr']), 2)
+        self.assertEqual(response['results'], [{**row, 'pr_details': row['pr_details']['pr_no']} for row in rows])
+
+    def test_included_map_is_added_to_a_page(self):
+        response = self.client.get('/api/item/', {'include': 'pr', 'page_size': 2}).json()
+
+        self.assertEqual(len(response['results']), 2)
+        self.assertTrue(response['next'])
+        self.assertEqual(set(response['included']['pr']), {row['pr_details'] for row in response['results']})
+
+    def test_nested_parents_are_serialized_once_per_response(self):
+        build = PurchaseRequestSerializer._build_representation
+        with mock.patch.object(PurchaseRequestSerializer, '_build_representation', autospec=True,
+                               side_effect=build) as build_representation:
+            rows = self.client.get('/api/item/').json()
+
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(build_representation.call_count, 2)
+
+
+class SparseFieldsetTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.login(create_user())
+        create_item(create_purchase_request('PR-0001'), 'IT-1')
+
+    def get_item(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            rows = self.client.get('/api/item/', params).json()
+        return rows[0], [query['sql'] for query in queries if 'FROM "api_item"' in query['sql']]
+
+    def test_fields_limit_each_row(self):
+        row, _ = self.get_item(fields='item_no,quantity,unknown')
+
+        self.assertEqual(row, {'item_no': 'IT-1', 'quantity': 2})
+
+    def test_expand_renders_only_the_listed_objects(self):
+        full, _ = self.get_item()
+        self.assertEqual(full['pr_details']['requisitioner_details']['requisition_id'], 'REQ-1')
+
+        row, queries = self.get_item(expand='')
+        self.assertEqual(row['pr_details'], 'PR-0001')
+        self.assertNotIn('JOIN', queries[0])
+
+        row, _ = self.get_item(expand='pr')
+        self.assertEqual(row['pr_details']['requisitioner_details'], 'REQ-1')
+
+        row, _ = self.get_item(expand='pr.requisitioner')
+        self.assertEqual(row['pr_details'], {**full['pr_details'], 'campus_director_details': 'CD-1'})
+
+    @override_settings(API_EXPAND_NESTED_BY_DEFAULT=False)
+    def test_nested_objects_can_be_off_by_default(self):
+        row, _ = self.get_item()
+
+        self.assertEqual(row['pr_details'], 'PR-0001')
+
+    def test_detail_views_take_the_same_options(self):
+        response = self.client.get('/api/purchase-request/PR-0001',
+                                   {'fields': 'pr_no,requisitioner_details', 'expand': ''})
+
+        self.assertEqual(response.json(), {'pr_no': 'PR-0001', 'requisitioner_details': 'REQ-1'})
+
+
+class KeysetPaginationTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.login(create_user())
+        for number in range(5):
+            create_purchase_request(f'PR-000{number}')
+        # Rows sharing a timestamp are ordered by pk, so none may be skipped or repeated.
+        created_at = timezone.now()
+        PurchaseRequest.objects.filter(pr_no__in=['PR-0001', 'PR-0002', 'PR-0003']).update(created_at=created_at)
+        PurchaseRequest.objects.filter(pr_no='PR-0004').update(created_at=created_at - datetime.timedelta(days=1))
+        PurchaseRequest.objects.filter(pr_no='PR-0000').update(created_at=created_at + datetime.timedelta(days=1))
+
+    def get_page(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        page = response.json()
+        return [row['pr_no'] for row in page['results']], page['next'], page['previous']
+
+    def test_pages_walk_forward_and_back(self):
+        pages = []
+        rows, next_url, previous_url = self.get_page('/api/purchase-request/', {'page_size': 2})
+        self.assertIsNone(previous_url)
+        while True:
+            pages.append((rows, previous_url))
+            if next_url is None:
+                break
+            rows, next_url, previous_url = self.get_page(next_url)
+
+        self.assertEqual([rows for rows, _ in pages],
+                         [['PR-0000', 'PR-0003'], ['PR-0002', 'PR-0001'], ['PR-0004']])
+        for (rows, _), (_, previous_url) in zip(pages, pages[1:]):
+            self.assertEqual(self.get_page(previous_url)[0], rows)
+
+    def test_pages_are_read_without_offset_or_count(self):
+        _, next_url, _ = self.get_page('/api/purchase-request/', {'page_size': 2})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.get_page(next_url)
+
+        sql = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('OFFSET', sql)
+        self.assertNotIn('COUNT(', sql)
+        self.assertIn('"created_at" <', sql)
+
+    def test_invalid_cursors_are_not_found(self):
+        response = self.client.get('/api/purchase-request/', {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(API_MAX_PAGE_SIZE=3)
+    def test_page_size_is_capped(self):
+        rows, next_url, _ = self.get_page('/api/purchase-request/', {'page_size': 100})
+
+        self.assertEqual(len(rows), 3)
+        self.assertIn('page_size=3', next_url)
+
+    def test_lists_are_paged_on_request_or_by_default(self):
+        self.assertEqual(len(self.client.get('/api/purchase-request/').json()), 5)
+
+        with self.settings(API_PAGINATE_BY_DEFAULT=True, API_PAGE_SIZE=4):
+            rows, next_url, _ = self.get_page('/api/purchase-request/')
+        self.assertEqual(len(rows), 4)
+        self.assertIsNotNone(next_url)
+
+
+def create_purchase_order(purchase_request, po_no, total_amount):
+    pr_no = purchase_request.pr_no
+    rfq = RequestForQoutation.objects.create(rfq_no=f'RFQ-{po_no}', supplier_name='Acme', supplier_address='Main St',
+                                             purchase_request=purchase_request)
+    aoq = AbstractOfQuotation.objects.create(aoq_no=f'AOQ-{po_no}', purchase_request_id=pr_no)
+    supplier = Supplier.objects.create(supplier_no=f'S-{po_no}', aoq=aoq, rfq=rfq)
+    return PurchaseOrder.objects.create(po_no=po_no, total_amount=decimal.Decimal(total_amount),
+                                        purchase_request=purchase_request, request_for_quotation=rfq,
+                                        abstract_of_quotation=aoq, supplier=supplier)
+
+
+class StatusCounterTests(APITestCase):
+
+    def counters(self):
+        return {
+            (kind, status, office): (count, total_amount)
+            for kind, status, office, count, total_amount in
+            StatusCounter.objects.values_list('kind', 'status', 'office', 'count', 'total_amount')
+            if count or total_amount
+        }
+
+    def assertCountersMatchTables(self):
+        live = self.counters()
+        rebuild_status_counters()
+        self.assertEqual(live, self.counters())
+        return live
+
+    def test_counters_follow_every_change(self):
+        pending, approved = list(PurchaseRequest.STATUS_DESCRIPTIONS)[:2]
+        first = create_purchase_request('PR-0001', status=pending, office='Registrar',
+                                        total_amount=decimal.Decimal('100'))
+        second = create_purchase_request('PR-0002', status=pending, office='Library',
+                                         total_amount=decimal.Decimal('50'))
+        order = create_purchase_order(first, 'PO-0001', '30')
+        counters = self.assertCountersMatchTables()
+        self.assertEqual(counters[('purchase_request', pending, '')], (2, decimal.Decimal('150')))
+        self.assertEqual(counters[('purchase_order', 'In Progress', 'Registrar')], (1, decimal.Decimal('30')))
+
+        first.status = approved
+        first.save()
+        self.assertCountersMatchTables()
+
+        first.office = 'Library'
+        first.save()
+        counters = self.assertCountersMatchTables()
+        self.assertNotIn(('purchase_order', 'In Progress', 'Registrar'), counters)
+        self.assertEqual(counters[('purchase_order', 'In Progress', 'Library')], (1, decimal.Decimal('30')))
+
+        second.total_amount = decimal.Decimal('75.25')
+        second.save()
+        self.assertCountersMatchTables()
+
+        order.status = 'Completed'
+        order.save()
+        self.assertCountersMatchTables()
+
+        first.delete()  # takes its purchase order along
+        counters = self.assertCountersMatchTables()
+        self.assertEqual(counters, {
+            ('purchase_request', pending, ''): (1, decimal.Decimal('75.25')),
+            ('purchase_request', pending, 'Library'): (1, decimal.Decimal('75.25')),
+        })
+
+    def test_board_and_badges_read_the_counters(self):
+        self.login(create_user())
+        pending = list(PurchaseRequest.STATUS_DESCRIPTIONS)[0]
+        create_purchase_request('PR-0001', status=pending, office='Registrar', total_amount=decimal.Decimal('100'))
+        create_purchase_request('PR-0002', status=pending, office='Library', total_amount=decimal.Decimal('50'))
+
+        token_blacklist.sync(force=True)
+        with self.assertNumQueries(1):
+            board = self.client.get('/api/status-board/').json()['purchase_request']
+        self.assertEqual(board['statuses'][0], {'status': pending, 'count': 2, 'total_amount': '150.00'})
+        self.assertEqual([office['office'] for office in board['offices']], ['Library', 'Registrar'])
+
+        badges = self.client.get('/api/status-board/badges/').json()
+        self.assertEqual(badges['purchase_request'][pending], 2)
+        self.assertEqual(badges['purchase_order'], {'In Progress': 0})
+
+
+def get_activity_inserts(queries):
+    return [query for query in queries if query['sql'].startswith(f'INSERT INTO "{RecentActivity._meta.db_table}"')]
+
+
+class ActivityBufferTests(TestCase):
+
+    def setUp(self):
+        self.user = create_user()
+        self.purchase_request = create_purchase_request()
+        self.item = create_item(self.purchase_request, 'IT-1')
+
+    def test_repeated_saves_are_written_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            with buffer_activities():
+                with self.captureOnCommitCallbacks(execute=True):
+                    record_activity(self.user, 'Added', self.purchase_request)
+                    record_activity(self.user, 'Updated', self.purchase_request)
+                    record_activity(self.user, 'Updated', self.item)
+                    record_activity(self.user, 'Updated', self.item)
+                self.assertFalse(RecentActivity.objects.exists())
+
+        self.assertEqual(len(get_activity_inserts(queries)), 1)
+        self.assertEqual(
+            sorted(RecentActivity.objects.values_list('object_id', 'activity_type', 'user_role', 'object_label')),
+            [('IT-1', 'Updated', 'Supply Officer', 'Item IT-1 — Item IT-1'),
+             ('PR-0001', 'Added', 'Supply Officer', 'PR PR-0001 — Registrar')],
+        )
+
+    def test_a_delete_is_kept_apart_from_the_saves(self):
+        with buffer_activities():
+            with self.captureOnCommitCallbacks(execute=True):
+                record_activity(self.user, 'Updated', self.item)
+                record_activity(self.user, 'Deleted', self.item)
+
+        self.assertEqual(sorted(RecentActivity.objects.values_list('activity_type', flat=True)),
+                         ['Deleted', 'Updated'])
+
+    def test_rolled_back_changes_are_not_recorded(self):
+        with buffer_activities():
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(RuntimeError):
+                    with transaction.atomic():
+                        record_activity(self.user, 'Updated', self.purchase_request)
+                        raise RuntimeError
+                record_activity(self.user, 'Updated', self.item)
+
+        self.assertEqual(list(RecentActivity.objects.values_list('object_id', flat=True)), ['IT-1'])
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ActivityRequestTests(TransactionTestCase):
+
+    def test_a_request_writes_its_activities_with_one_insert(self):
+        user = create_user()
+        create_purchase_request()
+        client = APIClient()
+        client.cookies['access_token'] = str(CustomRefreshToken.for_user(user).access_token)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post('/api/item/', {
+                'purchase_request': 'PR-0001', 'item_no': 'IT-9', 'stock_property_no': 'SP-1', 'unit': 'box',
+                'item_description': 'Bond paper', 'quantity': 2, 'unit_cost': '10.25', 'total_cost': '20.50',
+            }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(get_activity_inserts(queries)), 1)
+        activity = RecentActivity.objects.get()
+        self.assertEqual((activity.user, activity.activity_type, activity.object_label),
+                         (user, 'Added', 'Item IT-9 — Bond paper'))
+
+
+class ActivityRetentionMixin:
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user()
+        archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_dir.cleanup)
+        self.archive_dir = archive_dir.name
+
+    def month(self, months_ago):
+        return add_months(get_current_month(), -months_ago)
+
+    def add_activities(self, months_ago, count):
+        activities = RecentActivity.objects.bulk_create([
+            RecentActivity(user=self.user, user_role='Supply Officer', activity_type='Updated', object_id=str(number),
+                           content_type=ContentType.objects.get_for_model(PurchaseRequest))
+            for number in range(count)
+        ])
+        RecentActivity.objects.filter(pk__in=[activity.pk for activity in activities]).update(
+            timestamp=to_datetime(self.month(months_ago)) + datetime.timedelta(days=1)
+        )
+
+    def read_archive(self, months_ago):
+        with gzip.open(get_archive_path(self.archive_dir, self.month(months_ago)), 'rt', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+
+class ActivityRetentionTests(ActivityRetentionMixin, TestCase):
+
+    def test_old_rows_are_archived_and_deleted_in_batches(self):
+        self.add_activities(months_ago=3, count=5)
+        self.add_activities(months_ago=0, count=1)
+
+        self.assertEqual(prune_activity(retention_months=1, archive_dir=self.archive_dir, batch_size=2), 5)
+
+        self.assertEqual(RecentActivity.objects.count(), 1)
+        archived = self.read_archive(months_ago=3)
+        self.assertEqual(sorted(row['object_id'] for row in archived), ['0', '1', '2', '3', '4'])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Partitions need PostgreSQL')
+class ActivityPartitionTests(ActivityRetentionMixin, TransactionTestCase):
+
+    def test_old_partitions_are_archived_and_dropped(self):
+        self.assertTrue(is_partitioned())  # by migration 0010
+        with connection.cursor() as cursor:
+            for months_ago in (3, 2):
+                create_partition(cursor, self.month(months_ago))
+        self.add_activities(months_ago=5, count=1)  # older than every partition, so in the default one
+        self.add_activities(months_ago=3, count=2)
+        self.add_activities(months_ago=2, count=1)
+        self.add_activities(months_ago=0, count=1)
+
+        self.assertEqual(prune_activity(retention_months=1, archive_dir=self.archive_dir), 4)
+
+        self.assertEqual(min(get_partitions()), self.month(0))
+        self.assertEqual(get_detached_partitions(), {})
+        self.assertEqual(RecentActivity.objects.count(), 1)
+        self.assertEqual([len(self.read_archive(months_ago)) for months_ago in (5, 3, 2)], [1, 2, 1])
+
+    def count_rows(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+            return cursor.fetchone()[0]
+
+    def test_rows_in_the_default_partition_are_moved_into_a_new_partition(self):
+        # A month past the partitions created ahead, as when the job has not run for a while.
+        months_ahead = settings.ACTIVITY_PARTITIONS_AHEAD + 1
+        month, name = self.month(-months_ahead), get_partition_name(self.month(-months_ahead))
+        self.addCleanup(lambda: connection.cursor().execute(f'DROP TABLE IF EXISTS {connection.ops.quote_name(name)}'))
+        self.add_activities(months_ago=-months_ahead, count=2)
+        self.add_activities(months_ago=0, count=1)
+        self.assertNotIn(month, get_partitions())
+        self.assertEqual(self.count_rows(get_default_partition()), 2)
+
+        self.assertEqual(ensure_partitions(months_ahead), months_ahead + 1)
+
+        self.assertEqual(get_partitions()[month], name)
+        self.assertEqual((self.count_rows(name), self.count_rows(get_default_partition())), (2, 0))
+        self.assertEqual(RecentActivity.objects.count(), 3)
+        # The new table got its copy of the keyset index, attached like on any other partition.
+        self.assertTrue(any(index.startswith(name) for index in get_plan_names(RecentActivity, 'activity_keyset_idx')))
+        self.assertEqual(prune_activity(retention_months=1, archive_dir=self.archive_dir), 0)
+
+
+class ActivityFeedTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.login(create_user())
+        token_blacklist.sync(force=True)
+
+    def add_activity(self, instance, object_label=''):
+        return RecentActivity.objects.create(
+            user=self.user, user_role='Supply Officer', activity_type='Updated', object_label=object_label,
+            content_type=ContentType.objects.get_for_model(instance), object_id=str(instance.pk),
+        )
+
+    def get_labels(self):
+        with CaptureQueriesContext(connection) as queries:
+            rows = self.client.get('/api/recent-activities/').json()
+        return {row['object_id']: row['object_label'] for row in rows}, len(queries)
+
+    def test_stored_labels_are_returned_as_is(self):
+        self.add_activity(create_purchase_request('PR-0001'), object_label='PR PR-0001 — Library')
+
+        labels, queries = self.get_labels()
+
+        self.assertEqual(labels, {'PR-0001': 'PR PR-0001 — Library'})
+        self.assertEqual(queries, 1)
+
+    def test_unlabelled_rows_load_their_objects_once_per_type(self):
+        deleted = create_purchase_request('PR-0009')
+        self.add_activity(deleted)
+        deleted.delete()
+        counts = []
+        for number in range(4):
+            purchase_request = create_purchase_request(f'PR-000{number}')
+            self.add_activity(purchase_request)
+            self.add_activity(create_item(purchase_request, f'IT-{number}'))
+            if number in (0, 3):
+                labels, queries = self.get_labels()
+                counts.append(queries)
+
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(labels['PR-0003'], 'PR PR-0003 — Registrar')
+        self.assertEqual(labels['IT-3'], 'Item IT-3 — Item IT-3')
+        self.assertIsNone(labels['PR-0009'])
+        self.assertEqual(len(labels), 9)
+
+
+class RequestContextTests(APITestCase):
+
+    def test_blocks_set_and_restore_the_user(self):
+        officer, admin = create_user(), create_user('admin@example.com', role='Admin')
+
+        with request_context(user=officer) as context:
+            with request_context(user=admin):
+                self.assertEqual(get_current_user(), admin)
+            self.assertEqual(get_current_user(), officer)
+            self.assertEqual(context.roles, ['Supply Officer'])
+        self.assertIsNone(get_current_user())
+
+    def test_context_follows_async_calls_but_not_new_threads(self):
+        user = create_user()
+        seen_in_thread = []
+
+        with request_context(user=user):
+            self.assertEqual(async_to_sync(sync_to_async(get_current_user))(), user)
+            thread = threading.Thread(target=lambda: seen_in_thread.append(get_current_user()))
+            thread.start()
+            thread.join()
+
+        self.assertEqual(seen_in_thread, [None])
+
+    def test_saves_are_recorded_for_the_context_user(self):
+        user = create_user()
+
+        with request_context(user=user), self.captureOnCommitCallbacks(execute=True):
+            create_purchase_request()
+
+        self.assertEqual(RecentActivity.objects.get().user, user)
+
+    def test_requests_get_an_id_and_leave_no_context_behind(self):
+        self.login(create_user())
+
+        response = self.client.get('/api/users/', HTTP_X_REQUEST_ID='frontend-42')
+        self.assertEqual(response['X-Request-ID'], 'frontend-42')
+        response = self.client.get('/api/users/', HTTP_X_REQUEST_ID='not valid!')
+        self.assertRegex(response['X-Request-ID'], r'^[0-9a-f]{32}$')
+        self.assertIsNone(get_request_context())
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def test_connections_are_reused(self):
+        pool = db_pool.ConnectionPool()
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+
+        self.assertIs(pool.acquire(FakeConnection), connection)
+        self.assertEqual(pool.stats()['connections_created'], 1)
+
+    def test_requests_wait_for_a_free_connection_then_time_out(self):
+        pool = db_pool.ConnectionPool(max_size=1, timeout=0.5)
+        connection = pool.acquire(FakeConnection)
+        threading.Timer(0.05, pool.release, [connection]).start()
+
+        self.assertIs(pool.acquire(FakeConnection), connection)
+        pool.timeout = 0.01
+        with self.assertRaises(db_pool.PoolTimeout):
+            pool.acquire(FakeConnection)
+        stats = pool.stats()
+        self.assertEqual((stats['in_use'], stats['waits'], stats['timeouts']), (1, 1, 1))
+
+    def test_broken_and_old_connections_are_replaced(self):
+        pool = db_pool.ConnectionPool(check=lambda connection: False, check_idle=0)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        self.assertIsNot(pool.acquire(FakeConnection), connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()['health_check_failures'], 1)
+
+        pool = db_pool.ConnectionPool(max_lifetime=0)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        self.assertTrue(connection.closed)
+
+        pool = db_pool.ConnectionPool(reset=lambda connection: False)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()['idle'], 0)
+
+    def test_a_failed_connect_frees_its_slot(self):
+        pool = db_pool.ConnectionPool(max_size=1, timeout=0.01)
+
+        def connect():
+            raise OSError('connection refused')
+
+        with self.assertRaises(OSError):
+            pool.acquire(connect)
+        pool.acquire(FakeConnection)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'The pooled backend wraps the PostgreSQL one')
+class PooledBackendTests(TestCase):
+
+    def test_django_connections_come_from_the_pool(self):
+        alias = 'pool_test'
+        self.addCleanup(db_pool._pools.pop, alias, None)
+        database = PooledDatabaseWrapper(
+            {**connection.settings_dict, 'CONN_MAX_AGE': 0, 'POOL': {'MAX_SIZE': 2}}, alias=alias
+        )
+
+        with database.cursor() as cursor:
+            cursor.execute('BEGIN')  # left open, the pool rolls it back
+        raw_connection = database.connection
+        database.close()
+        with database.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
+
+        self.assertIs(database.connection, raw_connection)
+        database.close()
+        stats = db_pool.get_pool_stats()[alias]
+        self.assertEqual((stats['connections_created'], stats['in_use'], stats['idle']), (1, 0, 1))
+        db_pool.get_pool(alias).close_idle()
+        self.assertTrue(raw_connection.closed)
+
+
+class NumericColumnTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.login(create_user())
+
+    def test_legacy_text_values_are_cleaned_before_the_cast(self):
+        parse_number = importlib.import_module('api.migrations.0002_normalize_numeric_fields').parse_number
+
+        for value, decimal_places, expected in [
+            ('₱1,250.5', 2, '1250.50'), ('PHP 3,000', 2, '3000.00'), (' 0.125 ', 2, '0.13'), ('', 2, None),
+            ('12', None, '12'), ('1,000', None, '1000'),
+        ]:
+            with self.subTest(value=value):
+                self.assertEqual(parse_number(value, decimal_places), expected)
+        for value, decimal_places in [('abc', 2), ('NaN', 2), ('1.5', None), ('-2', None), ('1' * 15, 2)]:
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_number(value, decimal_places)
+
+    def test_item_totals_are_summed_exactly_by_the_database(self):
+        purchase_request = create_purchase_request('PR-0001')
+        for number in range(3):
+            create_item(purchase_request, f'IT-{number}', quantity=1, unit_cost='0.10')
+        create_purchase_request('PR-0002')
+
+        rows = {row['pr_no']: row for row in self.client.get('/api/purchase-request/totals/').json()}
+
+        self.assertEqual((rows['PR-0001']['items_total'], rows['PR-0001']['item_count']), ('0.30', 3))
+        self.assertEqual((rows['PR-0002']['items_total'], rows['PR-0002']['item_count']), ('0.00', 0))
+
+    def test_spending_by_office(self):
+        registrar = create_purchase_request('PR-0001', office='Registrar', total_amount=decimal.Decimal('100.10'))
+        create_purchase_request('PR-0002', office='Registrar', total_amount=decimal.Decimal('50.05'))
+        create_purchase_request('PR-0003', office='Library', total_amount=decimal.Decimal('500'))
+        create_purchase_order(registrar, 'PO-0001', '90.00')
+
+        rows = self.client.get('/api/report/spending-by-office/').json()
+
+        self.assertEqual([(row['office'], row['total_requested'], row['total_purchase_request'], row['total_ordered'],
+                           row['total_purchase_order']) for row in rows],
+                         [('Library', '500.00', 1, '0.00', 0), ('Registrar', '150.15', 2, '90.00', 1)])
+        self.assertEqual(rows[1]['average_request'], '75.08')
+        self.assertEqual(self.client.get('/api/report/spending-by-office/', {'days': 'x'}).status_code, 400)
@@ -2,18 +2,17 @@ import jwt
 from django.conf import settings
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from .auth import get_user_role
+
 
 class CustomRefreshToken(RefreshToken):
 
     @classmethod
     def for_user(cls, user):
         token = super().for_user(user)
-        role = user.groups.first()
+        roles = get_user_role(user)
         # include the role in the token payload so that the front end can access it
-        if (role):
-            token['role'] = role.name
-        else:
-            token['role'] = None
+        token['role'] = roles[0] if roles else None
         token['email'] = user.email  # Add the email to the token payload
         return token
 
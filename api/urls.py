@@ -1,5 +1,6 @@
 from django.urls import path
 
+from .async_views import AsyncListView, AsyncReadView
 from .views import *
 
 urlpatterns = [
@@ -23,6 +24,7 @@ urlpatterns = [
     path('purchase-request/item/filter/', ItemsFilterListView.as_view()),
 
     path('purchase-request/', PurchaseRequestList.as_view()),
+    path('purchase-request/totals/', PurchaseRequestTotalsList.as_view()),
     path('purchase-request/<str:pk>', PurchaseRequestDetail.as_view()),
     path('purchase-request/<str:pk>/edit/', PurchaseRequestUpdateView.as_view()),
     path('purchase-request/<str:pk>/mop-update/', PurchaseRequestMOPUpdateView.as_view()),
@@ -68,8 +70,24 @@ urlpatterns = [
 
     path('daily-report/bac', BACDailyReportView.as_view()),
     path('daily-report/supply', SupplyDailyReportView.as_view()),
+    path('report/spending-by-office/', SpendingByOfficeView.as_view()),
+    path('status-board/', StatusBoardView.as_view()),
+    path('status-board/badges/', StatusBadgesView.as_view()),
+    path('metrics/db-pool/', DatabasePoolMetricsView.as_view()),
     path('recent-activities/', RecentActivityList.as_view(), name='recent-activities'),
     path('send-file/', SendFileView.as_view(), name='send-file'),
-    path('track-purchase-request/filter/', TrackStatusListView.as_view(), name='track-purchase-request')
-
+    path('send-file/suppliers/', SendFileToSuppliersView.as_view(), name='send-file-suppliers'),
+    path('send-file/status/', OutboundEmailStatusView.as_view(), name='send-file-status'),
+    path('track-purchase-request/filter/', TrackStatusListView.as_view(), name='track-purchase-request'),
+
+    # Async versions of the read endpoints, for the ASGI server profile (see instruction.md).
+    path('async/purchase-request/', AsyncListView.as_view(view_class=PurchaseRequestList)),
+    path('async/purchase-order/', AsyncListView.as_view(view_class=PurchaseOrderList)),
+    path('async/item/', AsyncListView.as_view(view_class=ItemList)),
+    path('async/track-purchase-request/filter/', AsyncListView.as_view(view_class=TrackStatusListView)),
+    path('async/recent-activities/', AsyncListView.as_view(view_class=RecentActivityList)),
+    path('async/daily-report/bac', AsyncReadView.as_view(view_class=BACDailyReportView)),
+    path('async/daily-report/supply', AsyncReadView.as_view(view_class=SupplyDailyReportView)),
+    path('async/status-board/', AsyncReadView.as_view(view_class=StatusBoardView)),
+    path('async/status-board/badges/', AsyncReadView.as_view(view_class=StatusBadgesView)),
 ]
@@ -0,0 +1,119 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+
+User = get_user_model()
+
+CACHE_KEY_PREFIX = 'api:user:'
+
+
+class LocalUserCache:
+    """
+    Per-process LRU cache of (user, role names) keyed by user id, with a TTL per entry.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user, roles = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user, roles
+
+    def set(self, user_id, user, roles):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, user, roles)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+class SharedUserCache:
+    """
+    User cache stored in a Django cache backend so every gunicorn worker sees the same entries.
+    """
+
+    def __init__(self, alias, ttl):
+        self.alias = alias
+        self.ttl = ttl
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get(self, user_id):
+        return self.cache.get(f'{CACHE_KEY_PREFIX}{user_id}')
+
+    def set(self, user_id, user, roles):
+        self.cache.set(f'{CACHE_KEY_PREFIX}{user_id}', (user, roles), self.ttl)
+
+    def delete(self, user_id):
+        self.cache.delete(f'{CACHE_KEY_PREFIX}{user_id}')
+
+
+def _build_cache():
+    if settings.USER_CACHE_BACKEND == 'shared':
+        return SharedUserCache(settings.USER_CACHE_ALIAS, settings.USER_CACHE_TTL)
+    return LocalUserCache(settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL)
+
+
+user_cache = _build_cache()
+
+
+def load_user(user_id):
+    """
+    Return a private copy of the user with the given id and its role names preloaded.
+
+    Raises User.DoesNotExist when no such user exists.
+    """
+    entry = user_cache.get(user_id)
+    if entry is None:
+        user = User.objects.get(pk=user_id)
+        roles = list(user.groups.order_by('pk').values_list('name', flat=True))
+        user_cache.set(user_id, user, roles)
+    else:
+        user, roles = entry
+
+    # Hand out a copy so per-request mutations never leak into the shared entry.
+    user = copy.copy(user)
+    user._role_names = list(roles)
+    return user
+
+
+def get_cached_roles(user_id):
+    """Return the cached role names for the user id, or None on a cache miss."""
+    entry = user_cache.get(user_id)
+    return None if entry is None else list(entry[1])
+
+
+def invalidate_users(*user_ids):
+    """
+    Drop the cached users now and again when the current transaction commits, so a concurrent
+    request cannot re-cache the row as it was before the commit.
+    """
+    def delete():
+        for user_id in user_ids:
+            user_cache.delete(user_id)
+
+    delete()
+    transaction.on_commit(delete)
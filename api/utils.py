@@ -1,9 +1,89 @@
-import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .auth import get_user_role
+
+_request_context = ContextVar('request_context', default=None)
+
+
+class RequestContext:
+    """
+    The user, roles, request id and start time of the request (or management command) being handled.
+
+    Kept in a ContextVar, so it follows the request through sync and async code, including
+    sync_to_async and async_to_sync calls, and never leaks into the next request on the same thread.
+    `roles` can be a list or a callable that returns one the first time it is read.
+    `read_from_replica`, `replica` and `wrote` are the database routing state, see api.db_router.
+    """
+
+    def __init__(self, user=None, roles=None, request_id=None):
+        self.user = user
+        self._roles = roles
+        self.request_id = request_id or uuid.uuid4().hex
+        self.started_at = time.perf_counter()
+        self.read_from_replica = False
+        self.replica = None
+        self.wrote = False
+
+    @property
+    def roles(self):
+        if callable(self._roles):
+            self._roles = self._roles()
+        if self._roles is None:
+            self._roles = get_user_role(self.user)
+        return self._roles
+
+    @roles.setter
+    def roles(self, roles):
+        self._roles = roles
+
+    @property
+    def elapsed(self):
+        """Seconds since the request started."""
+        return time.perf_counter() - self.started_at
+
+
+def get_request_context():
+    return _request_context.get()
+
+
+def set_request_context(context):
+    """Make `context` current and return the token reset_request_context needs to restore the previous one."""
+    return _request_context.set(context)
+
+
+def reset_request_context(token):
+    _request_context.reset(token)
+
+
+@contextmanager
+def request_context(user=None, roles=None, request_id=None):
+    """
+    Act as `user` inside the block, e.g. in a management command or a test:
+
+        with request_context(user=admin):
+            purchase_request.save()  # recorded as an activity of admin
+    """
+    context = RequestContext(user, roles, request_id)
+    token = set_request_context(context)
+    try:
+        yield context
+    finally:
+        reset_request_context(token)
 
-_thread_locals = threading.local()
 
 def set_current_user(user):
-    _thread_locals.user = user
+    """Set the user of the current context, starting a context when there is none (scripts, shell)."""
+    context = get_request_context()
+    if context is None:
+        set_request_context(RequestContext(user))
+    else:
+        context.user = user
+        context.roles = None
+
 
 def get_current_user():
-    return getattr(_thread_locals, 'user', None)
+    context = get_request_context()
+    return context.user if context is not None else None
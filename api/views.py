@@ -1,15 +1,19 @@
 from django.contrib.auth.models import User
+from django.conf import settings
 from django.contrib.sites.shortcuts import get_current_site
-from django.db import IntegrityError
+from django.core.exceptions import ValidationError
+from django.core.validators import EmailValidator
+from django.db import IntegrityError, transaction
 from django.http import Http404
 from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
 from rest_framework import generics, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.views import TokenRefreshView
-from .auth import CookieJWTAuthentication
+from .auth import CookieJWTAuthentication, CookieJWTClaimsAuthentication, get_user_role
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.views import TokenObtainPairView
@@ -17,15 +21,26 @@ from django.contrib.auth import authenticate
 from django.utils import timezone
 from django.contrib.auth import logout
 from datetime import timedelta
+from decimal import Decimal
 from django.utils.timezone import now
-from django.db.models.functions import TruncDate
-from django.db.models import Count
+from django.db.models import Avg, Count, DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce, Round
 
 from rest_framework.generics import ListAPIView
 from django_filters.rest_framework import DjangoFilterBackend
 from .filters import *
 from .models import *
-from .resend import send_mail_resend, send_file
+from .permissions import HasRoleClaim, IsAdminRole
+from .columnar import ColumnarListMixin
+from .db_pool import get_pool_stats
+from .query_plan import QueryPlanMixin, optimize_queryset
+from .rollups import (
+    aget_daily_counts, aget_status_board, get_daily_counts, get_status_board, get_window, parse_window_days,
+)
+from .representation import RepresentationViewMixin
+from .streaming import StreamingListMixin
+from .outbox import enqueue_email, enqueue_emails
+from .resend import AttachmentTooLarge, encode_attachment, send_file
 from .serializers import *
 from .serializers import *
 from .tokens import get_tokens_for_user, token_decoder
@@ -79,7 +94,7 @@ class RegisterUserAPIView(generics.CreateAPIView):
 
                 # Send activation email
                 if(is_production):
-                    send_mail_resend(user.email, subject, message_html)
+                    enqueue_email(user.email, subject, message_html)
                 else:
                     print(f"[{user.email}] Account Created Successfully - Pending Activation")
 
@@ -133,12 +148,13 @@ class EditUserView(APIView):
         serializer = CustomUserUpdateSerializer(user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            roles = get_user_role(user)
             user_data = {
                 "id": user.id,
                 "email": user.email,
                 "first_name": user.first_name,
                 "last_name": user.last_name,
-                "role": user.groups.first().name if user.groups.exists() else "User",
+                "role": roles[0] if roles else "User",
             }
             return Response({
                         'message': 'Updated Successfully',
@@ -161,14 +177,13 @@ class LoginTokenObtainPairView(TokenObtainPairView):
             serializer.is_valid(raise_exception=True)
             user = serializer.user
 
-            # generate OTP
-            user.generate_otp()
-
             subject = 'Your OTP Code'
-            message_html = f'<p>Your OTP code is <strong>{user.otp_code}</strong>. It is valid for 5 minutes.</p>'
 
-            # send_OTP_mail(user.email, subject, message_html )
-            send_mail_resend(user.email, subject, message_html)
+            # generate OTP and queue the email in one transaction, the outbox worker sends it
+            with transaction.atomic():
+                user.generate_otp()
+                message_html = f'<p>Your OTP code is <strong>{user.otp_code}</strong>. It is valid for 5 minutes.</p>'
+                enqueue_email(user.email, subject, message_html)
 
             return Response({'message': f"We've sent a verification code to {user.email}. Please check your inbox and verify your account.", 'email': user.email}, status=status.HTTP_200_OK)
         except Exception as e:
@@ -181,12 +196,13 @@ class CheckAuthView(APIView):
     def get(self, request, *args, **kwargs):
         try:
             user = request.user
+            roles = get_user_role(user)
             return Response({
                 "id": user.id,
                 "email": user.email,
                 "first_name": user.first_name,
                 "last_name": user.last_name,
-                "role": user.groups.first().name if user.groups.exists() else "User",
+                "role": roles[0] if roles else "User",
             })
         except Exception as e:
             raise AuthenticationFailed("Invalid token or user not authenticated")
@@ -216,15 +232,16 @@ class OTPVerificationView(APIView):
                     user.save()
 
                     # Add custom claims to the token (email and role)
-                    role = user.groups.first()
-                    refresh['role'] = role.name if role else None
+                    roles = get_user_role(user)
+                    role = roles[0] if roles else None
+                    refresh['role'] = role
                     refresh['email'] = user.email
                     refresh['fullname'] = f'{user.first_name} {user.last_name}'
                     
                     user = {
                         'id': user.id,
                         'email': user.email,
-                        'role': role.name if role else None,
+                        'role': role,
                         'first_name': user.first_name,
                         'last_name': user.last_name
                     }
@@ -278,14 +295,14 @@ class ResendOTPView(APIView):
             try:
                 user = CustomUser.objects.get(email=email)
 
-                # generate new OTP
-                user.generate_otp()
-
                 subject = 'Your OTP Code'
-                message_html = f'<p>Your new OTP code is <strong>{user.otp_code}</strong>. It is valid for 5 minutes.</p>'
 
-                # send_OTP_mail(user.email, subject, message_html )
-                send_mail_resend(user.email, subject, message_html)
+                # generate new OTP and queue the email in one transaction
+                with transaction.atomic():
+                    user.generate_otp()
+                    message_html = (f'<p>Your new OTP code is <strong>{user.otp_code}</strong>. '
+                                    'It is valid for 5 minutes.</p>')
+                    enqueue_email(user.email, subject, message_html)
 
                 return Response({
                     'message': 'OTP has been resent to your email address.'
@@ -412,33 +429,22 @@ class ChangePasswordView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
 
-class RecentActivityList(generics.ListAPIView):
+class RecentActivityList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, generics.ListAPIView):
     """
     List recent activities created within the last 7 days.
     """
     serializer_class = RecentActivitySerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    cursor_field = 'timestamp'
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
     def get_queryset(self):
-        seven_days_ago = now() - timedelta(days=7)
-        queryset = RecentActivity.objects.filter(timestamp__gte=seven_days_ago).select_related('user', 'content_type')
+        queryset = RecentActivity.objects.recent(days=7).select_related('user', 'content_type')
         return queryset 
     
     
 
-class SendFileView(APIView):
-    """
-    Send File View
-    """
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]  
-    
-    def post(self, request, *args, **kwargs):
-        email = request.data.get("email")
-        file = request.FILES.get("file")
-        
-        message_html = f"""
+RFQ_MESSAGE_HTML = """
         <div>
         <div>
             <h1>Request for Quotation</h1>
@@ -458,7 +464,19 @@ class SendFileView(APIView):
         </div>
         """
 
-        response = send_file(file, email, message_html)
+
+class SendFileView(APIView):
+    """
+    Send File View
+    """
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]  
+    
+    def post(self, request, *args, **kwargs):
+        email = request.data.get("email")
+        file = request.FILES.get("file")
+
+        response = send_file(file, email, RFQ_MESSAGE_HTML)
 
         if "error" in response:
             return Response(
@@ -470,9 +488,69 @@ class SendFileView(APIView):
             {"message": f"Email sent successfully to {email} with the attached file!"},
             status=status.HTTP_200_OK,
         )
-        
-        
-class TrackStatusListView(ListAPIView):
+
+
+class SendFileToSuppliersView(APIView):
+    """
+    Queue one RFQ file for many supplier emails. The file is encoded once and stored with the
+    outbox, which sends one email per supplier; answers 202 without waiting for the sends, with
+    the id and status of each email and the URL to follow them at (OutboundEmailStatusView).
+    """
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
+
+    def post(self, request, *args, **kwargs):
+        file = request.FILES.get("file")
+        emails = request.data.getlist("emails") if hasattr(request.data, "getlist") else request.data.get("emails", [])
+        # accept repeated fields as well as one comma separated value
+        emails = [email.strip() for value in emails for email in value.split(",") if email.strip()]
+
+        if not emails or not file:
+            return Response({"message": "Failed to send email: Both email and file are required."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        validator = EmailValidator()
+        invalid = []
+        for email in emails:
+            try:
+                validator(email)
+            except ValidationError:
+                invalid.append(email)
+        if invalid:
+            return Response({"emails": [f"Enter a valid email address: {email}" for email in invalid]},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            content = encode_attachment(file, settings.EMAIL_ATTACHMENT_MAX_SIZE)
+        except AttachmentTooLarge as e:
+            return Response({"message": f"Failed to send email: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            queued = enqueue_emails(emails, "Your File Attachment", RFQ_MESSAGE_HTML, attachment=(file.name, content))
+
+        status_url = request.build_absolute_uri(reverse("send-file-status"))
+        return Response(
+            {"message": f"Email queued for {len(queued)} suppliers.",
+             "emails": OutboundEmailStatusSerializer(queued, many=True).data,
+             "status_url": f"{status_url}?ids={','.join(str(message.pk) for message in queued)}"},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class OutboundEmailStatusView(ListAPIView):
+    """
+    Delivery status of queued emails, e.g. the ones SendFileToSuppliersView answered with.
+    ?ids=1,2,3 is required; filter further with ?status=PENDING, SENDING, SENT or FAILED.
+    """
+    queryset = OutboundEmail.objects.all()
+    serializer_class = OutboundEmailStatusSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = OutboundEmailFilter
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
+
+
+class TrackStatusListView(StreamingListMixin, ColumnarListMixin, QueryPlanMixin, RepresentationViewMixin, ListAPIView):
     """
     Views for filtering status in Purchase Request
     """
@@ -481,82 +559,84 @@ class TrackStatusListView(ListAPIView):
     serializer_class = TrackStatusSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = TrackStatusFilter
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    cursor_field = 'updated_at'
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
 
-class UserList(generics.ListCreateAPIView):
+class UserList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, generics.ListCreateAPIView):
     """
     List all Users or Create new User
     """
     queryset = CustomUser.objects.all()
     serializer_class = UserListSerializer
+    cursor_field = 'date_joined'
     authentication_classes = [CookieJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
 
-class RequisitionerList(generics.ListCreateAPIView):
+class RequisitionerList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, generics.ListCreateAPIView):
     """
     List all Requisitioner or Create new Requisitioner
     """
     queryset = Requesitioner.objects.all()
     serializer_class = RequesitionerSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class RequisitionerDetail(generics.RetrieveUpdateDestroyAPIView):
+class RequisitionerDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a Requisitioner
     """
     queryset = Requesitioner.objects.all()
     serializer_class = RequesitionerSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class CampusDirectorList(generics.ListCreateAPIView):
+class CampusDirectorList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, generics.ListCreateAPIView):
     """
     List all CampusDirector or Create new CampusDirector
     """
     queryset = CampusDirector.objects.all()
     serializer_class = CampusDirectorSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class CampusDirectorDetail(generics.RetrieveUpdateDestroyAPIView):
+class CampusDirectorDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a CampusDirector
     """
     queryset = CampusDirector.objects.all()
     serializer_class = CampusDirectorSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class BACMemberList(generics.ListCreateAPIView):
+class BACMemberList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, generics.ListCreateAPIView):
     """
     List all BACMember or Create new BACMember
     """
     queryset = BACMember.objects.all()
     serializer_class = BACMemberSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class BACMemberDetail(generics.RetrieveUpdateDestroyAPIView):
+class BACMemberDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a BACMember
     """
     queryset = BACMember.objects.all()
     serializer_class = BACMemberSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class UserDetail(generics.RetrieveUpdateDestroyAPIView):
+class UserDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a User
     """
@@ -588,37 +668,48 @@ class UserDetail(generics.RetrieveUpdateDestroyAPIView):
             Team SlapSoil<br>
             </p>'''
         if not is_active_before and user.is_active:
-            send_mail_resend(user.email, "Account Activation Successfull", message_html)
+            enqueue_email(user.email, "Account Activation Successfull", message_html)
 
         return response
 
 
-class ItemList(generics.ListCreateAPIView):
+class ItemList(StreamingListMixin, ColumnarListMixin, QueryPlanMixin, RepresentationViewMixin,
+               generics.ListCreateAPIView):
     """
-    List all Item, or create a new item
+    List all Item, or create a new item. A list body creates all of its items in one transaction.
     """
     queryset = Item.objects.all()
     serializer_class = ItemSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class ItemDetail(generics.RetrieveUpdateDestroyAPIView):
+class ItemDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a Item instance
     """
     queryset = Item.objects.all()
     serializer_class = ItemSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
 class ItemsDetail(APIView):
     """
     Retrieve Items in Purchase Request instance
     """
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
     def get(self, request, field_name, value, *args, **kwargs):
         # only the purchase_request is allowed to filter
@@ -630,9 +721,9 @@ class ItemsDetail(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         filter_kwargs = {field_name: value}
-        items = Item.objects.filter(**filter_kwargs)
+        items = list(optimize_queryset(Item.objects.filter(**filter_kwargs), ItemSerializer))
 
-        if not items.exists():
+        if not items:
             return Response({
                 'error': 'Error getting Items in Purchase Request'
             }, status=status.HTTP_404_NOT_FOUND)
@@ -642,28 +733,44 @@ class ItemsDetail(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class PurchaseRequestList(generics.ListCreateAPIView):
+class PurchaseRequestList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, generics.ListCreateAPIView):
     """
     List all Purchase request, or create a new Purchase request
     """
     queryset = PurchaseRequest.objects.select_related("requisitioner", "campus_director")
     serializer_class = PurchaseRequestSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class PurchaseRequestDetail(generics.RetrieveUpdateDestroyAPIView):
+class PurchaseRequestTotalsList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, ListAPIView):
+    """
+    Purchase requests with the sum and count of their items, computed by the database.
+    Filter with ?status= and ?office=.
+    """
+    queryset = PurchaseRequest.objects.annotate(
+        items_total=Coalesce(Sum('items__total_cost'), Value(0), output_field=DecimalField()),
+        item_count=Count('items'),
+    )
+    serializer_class = PurchaseRequestTotalsSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['status', 'office']
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
+
+
+class PurchaseRequestDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a Purchase request instance
     """
     queryset = PurchaseRequest.objects.select_related("requisitioner", "campus_director")
     serializer_class = PurchaseRequestSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 class PurchaseRequestUpdateView(APIView):
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
     def patch(self, request, pk):
         try:
@@ -680,8 +787,8 @@ class PurchaseRequestUpdateView(APIView):
 
 
 class PurchaseRequestMOPUpdateView(APIView):
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
     def patch(self, request, pk):
         try:
@@ -699,8 +806,8 @@ class PurchaseRequestMOPUpdateView(APIView):
 
 
 class PurchaseRequestStatusUpdateView(APIView):
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
     def patch(self, request, pk):
         try:
@@ -716,7 +823,7 @@ class PurchaseRequestStatusUpdateView(APIView):
             return Response({"error": "Purchase Order not found"}, status=status.HTTP_404_NOT_FOUND)
         
 
-class ItemsFilterListView(ListAPIView):
+class ItemsFilterListView(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, ListAPIView):
     """
     Views for filtering item in Purchase Request
     """
@@ -725,92 +832,92 @@ class ItemsFilterListView(ListAPIView):
     serializer_class = ItemSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = ItemsFilter
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class RequestForQoutationDetail(generics.RetrieveUpdateDestroyAPIView):
+class RequestForQoutationDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a Request For Qoutation instance
     """
     queryset = RequestForQoutation.objects.all()
     serializer_class = RequestForQoutationSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class RequestForQoutationList(generics.ListCreateAPIView):
+class RequestForQoutationList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, generics.ListCreateAPIView):
     """
     List all Request for Qoutation, or create a new Request For Qoutation
     """
     queryset = RequestForQoutation.objects.all()
     serializer_class = RequestForQoutationSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class ItemQuotationDetail(generics.RetrieveUpdateDestroyAPIView):
+class ItemQuotationDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a Item Qoutation instance
     """
     queryset = ItemQuotation.objects.all()
     serializer_class = ItemQuotationSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class ItemQuotationList(generics.ListCreateAPIView):
+class ItemQuotationList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, generics.ListCreateAPIView):
     """
     List all Item Quotaion or create a new Item Qoutation
     """
     queryset = ItemQuotation.objects.all()
     serializer_class = ItemQuotationSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class AbstractOfQoutationList(generics.ListCreateAPIView):
+class AbstractOfQoutationList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, generics.ListCreateAPIView):
     """
     List all Abstract for Quotation or create new Abstract for Quotation
     """
     queryset = AbstractOfQuotation.objects.all()
     serializer_class = AbstractOfQoutationSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class AbstractOfQoutationDetail(generics.RetrieveUpdateDestroyAPIView):
+class AbstractOfQoutationDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete Abstract of Quotation instance
     """
     queryset = AbstractOfQuotation.objects.all()
     serializer_class = AbstractOfQoutationSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class SupplierList(generics.ListCreateAPIView):
+class SupplierList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, generics.ListCreateAPIView):
     """
     List all Supplier, or create a new Supplier
     """
     queryset = Supplier.objects.all()
     serializer_class = SupplierSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class SupplierDetail(generics.RetrieveUpdateDestroyAPIView):
+class SupplierDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a Supplier instance
     """
     queryset = Supplier.objects.all()
     serializer_class = SupplierSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
     
 class SupplierUpdateIsAddedToTrueView(APIView):
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
     def patch(self, request, pk):
         try:
@@ -825,68 +932,70 @@ class SupplierUpdateIsAddedToTrueView(APIView):
 
 
 
-class SupplierItemList(generics.ListCreateAPIView):
+class SupplierItemList(StreamingListMixin, ColumnarListMixin, QueryPlanMixin, RepresentationViewMixin,
+                       generics.ListCreateAPIView):
     """
     List all Item, or create a new Item
     """
     queryset = SupplierItem.objects.all()
     serializer_class = SupplierItemSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class SupplierItemDetail(generics.RetrieveUpdateDestroyAPIView):
+class SupplierItemDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a Item instance
     """
     queryset = SupplierItem.objects.all()
     serializer_class = SupplierItemSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class BACMemberDetail(generics.RetrieveUpdateDestroyAPIView):
+class BACMemberDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a BACMember instance
     """
     queryset = BACMember.objects.all()
     serializer_class = BACMemberSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class BACMemberList(generics.ListCreateAPIView):
+class BACMemberList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, generics.ListCreateAPIView):
     """
     List all BACMember or create a new BACMember
     """
     queryset = BACMember.objects.all()
     serializer_class = BACMemberSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class PurchaseOrderList(generics.ListCreateAPIView):
+class PurchaseOrderList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, generics.ListCreateAPIView):
     """
     List all Purchase Order, or create a new Purchase Order
     """
     queryset = PurchaseOrder.objects.all()
     serializer_class = PurchaseOrderSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class PurchaseOrderDetail(generics.RetrieveUpdateDestroyAPIView):
+class PurchaseOrderDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a Purchase Order instance
     """
     queryset = PurchaseOrder.objects.all()
     serializer_class = PurchaseOrderSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 class PurchaseOrderStatusUpdateView(APIView):
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
+    permission_model = PurchaseOrder
 
     def patch(self, request, pk):
         try:
@@ -901,152 +1010,259 @@ class PurchaseOrderStatusUpdateView(APIView):
         except PurchaseOrder.DoesNotExist:
             return Response({"error": "Purchase Order not found"}, status=status.HTTP_404_NOT_FOUND)
 
-class PurchaseOrderItemList(generics.ListCreateAPIView):
+class PurchaseOrderItemList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, generics.ListCreateAPIView):
     """
     List all Purchase Order Item, or create a new Purchase Order Item
     """
     queryset = PurchaseOrderItem.objects.all()
     serializer_class = PurchaseOrderItemSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class PurchaseOrderItemDetail(generics.RetrieveUpdateDestroyAPIView):
+class PurchaseOrderItemDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a Purchase Order Item instance
     """
     queryset = PurchaseOrderItem.objects.all()
     serializer_class = PurchaseOrderItemSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class BACDailyReportView(APIView):
+def build_daily_report(days, counts, columns):
     """
-    BAC Daily Reports View for the past 7 days.
+    Daily report rows for a window of `days` days, newest day first. `columns` maps response
+    keys to counter metrics and `counts` holds the counters, see get_daily_counts.
     """
-    permission_classes = [IsAuthenticated]
-    authentication_classes = [CookieJWTAuthentication]
+    return [
+        {"day": day.strftime("%b %d"), **{key: counts[metric].get(day, 0) for key, metric in columns.items()}}
+        for day in get_window(days)
+    ]
 
-    def get(self, request, *args, **kwargs):   
-        seven_days_ago = now() - timedelta(days=7)
-        
-        # Approved Data
-        approved = (
-            PurchaseRequest.objects.filter(status="Forwarded to Procurement", created_at__gte=seven_days_ago)
-            .annotate(day=TruncDate("created_at"))
-            .values("day")
-            .annotate(total_approved=Count("pr_no"))
-        )
-        # Quotation Data
-        quotation = (
-            RequestForQoutation.objects.filter(created_at__gte=seven_days_ago)
-            .annotate(day=TruncDate("created_at"))
-            .values("day")
-            .annotate(total_quotation=Count("rfq_no"))
-        )
-        # Abstract Data
-        abstract = (
-            AbstractOfQuotation.objects.filter(created_at__gte=seven_days_ago)
-            .annotate(day=TruncDate("created_at"))
-            .values("day")
-            .annotate(total_abstract=Count("aoq_no"))
-        )
-        # Initialize Combined Data for the Last 7 Days
-        date_range = [(now() - timedelta(days=i)).date() for i in range(7)]
-        combined_data = {day.strftime("%b %d"): {"day": day.strftime("%b %d"), "total_approved": 0, "total_quotation": 0, "total_abstract": 0} for day in date_range}
-
-        # Combine Data
-        for data, key in zip([approved, quotation, abstract], ["total_approved", "total_quotation", "total_abstract"]):
-            for entry in data:
-                day_str = entry["day"].strftime("%b %d")
-                if day_str in combined_data:
-                    combined_data[day_str][key] = entry[key]
-
-        # Convert Combined Data to List
-        response_data = list(combined_data.values())
-        return Response(response_data, status=status.HTTP_200_OK)
 
+class DailyReportView(APIView):
+    """
+    Base of the daily reports, read from the DailyCounter rollup for the ?days= window
+    (7 to 90 days, default 7). `columns` maps response keys to counter metrics.
+    """
+    permission_classes = [HasRoleClaim]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    columns = {}
+
+    def get(self, request, *args, **kwargs):
+        try:
+            days = parse_window_days(request.query_params.get('days'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        counts = get_daily_counts(list(self.columns.values()), days)
+        return Response(build_daily_report(days, counts, self.columns), status=status.HTTP_200_OK)
+
+    async def aget(self, request, *args, **kwargs):
+        try:
+            days = parse_window_days(request.query_params.get('days'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        counts = await aget_daily_counts(list(self.columns.values()), days)
+        return Response(build_daily_report(days, counts, self.columns), status=status.HTTP_200_OK)
 
-class SupplyDailyReportView(APIView):
+
+class BACDailyReportView(DailyReportView):
     """
-    Supply Daily Reports View for the past 7 days.
+    BAC Daily Reports View for the past 7 days, or ?days= up to 90.
     """
-    permission_classes = [IsAuthenticated]
-    authentication_classes = [CookieJWTAuthentication]
+    columns = {
+        "total_approved": "purchase_requests_forwarded",
+        "total_quotation": "quotations",
+        "total_abstract": "abstracts",
+    }
+
+
+class SupplyDailyReportView(DailyReportView):
+    """
+    Supply Daily Reports View for the past 7 days, or ?days= up to 90.
+    """
+    columns = {
+        "total_purchase_request": "purchase_requests",
+        "total_purchase_order": "purchase_orders",
+    }
+
 
-    def get(self, request, *args, **kwargs):  
-        seven_days_ago = now() - timedelta(days=7)
-         
-        # All Purchase Request
-        purchase_request = (
-            PurchaseRequest.objects
-            .annotate(day=TruncDate("created_at"))  # Annotate with day of week
-            .values("day") 
-            .annotate(total_purchase_request=Count("pr_no"))  # Aggregate the count field
+class SpendingByOfficeView(APIView):
+    """
+    Requested and ordered amounts per office, summed by the database.
+    Limit to purchase requests created in the last ?days=N days.
+    """
+    permission_classes = [HasRoleClaim]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+
+    def get(self, request, *args, **kwargs):
+        purchase_requests = PurchaseRequest.objects.all()
+        days = request.query_params.get('days')
+        if days:
+            try:
+                days = int(days)
+            except ValueError:
+                return Response({'error': 'days must be a whole number.'}, status=status.HTTP_400_BAD_REQUEST)
+            purchase_requests = purchase_requests.filter(created_at__gte=now() - timedelta(days=days))
+
+        requested = (
+            purchase_requests
+            .values("office")
+            .annotate(
+                total_requested=Sum("total_amount"),
+                average_request=Round(Avg("total_amount"), 2),
+                total_purchase_request=Count("pr_no"),
+            )
         )
-        # All Purchase Order
-        purchase_order = (
-            PurchaseOrder.objects
-            .annotate(day=TruncDate("created_at"))
-            .values("day")
-            .annotate(total_purchase_order=Count("po_no"))
+        ordered = (
+            PurchaseOrder.objects.filter(purchase_request__in=purchase_requests)
+            .values(office=F("purchase_request__office"))
+            .annotate(total_ordered=Sum("total_amount"), total_purchase_order=Count("po_no"))
         )
-        # Initialize Combined Data for the last 7 days
-        date_range = [(now() - timedelta(days=i)).date() for i in range(7)]
-        combined_data = {day.strftime("%b %d"): {"day": day.strftime("%b %d"), "total_purchase_request": 0, "total_purchase_order": 0} for day in date_range}
-        # Process and Combine Data
-        for data, key in zip([purchase_request, purchase_order], ["total_purchase_request", "total_purchase_order"]):
-            for entry in data:
-                day_str = entry["day"].strftime("%b %d")
-                if day_str in combined_data:
-                    combined_data[day_str][key] = entry[key]
-        # Convert Combined Data to List
-        response_data = list(combined_data.values())
+
+        combined_data = {
+            entry["office"]: {**entry, "total_ordered": Decimal("0.00"), "total_purchase_order": 0}
+            for entry in requested
+        }
+        for entry in ordered:
+            combined_data[entry["office"]].update(entry)
+
+        response_data = sorted(combined_data.values(), key=lambda entry: entry["total_requested"], reverse=True)
         return Response(response_data, status=status.HTTP_200_OK)
 
 
-class InspectionAndAcceptanceList(generics.ListCreateAPIView):
+# Statuses listed on the board even when no row has them yet.
+BOARD_STATUSES = {
+    'purchase_request': list(PurchaseRequest.STATUS_DESCRIPTIONS),
+    'purchase_order': [PurchaseOrder._meta.get_field('status').default],
+}
+
+
+def build_status_board(board):
+    """Per kind, the count and total amount of every status overall and per office, see get_status_board."""
+    response_data = {}
+    for kind, rows in board.items():
+        totals = {status_name: {"status": status_name, "count": 0, "total_amount": Decimal("0.00")}
+                  for status_name in BOARD_STATUSES[kind]}
+        offices = {}
+        for status_name, office, count, total_amount in rows:
+            entry = {"status": status_name, "count": count, "total_amount": total_amount}
+            if office:
+                if count:
+                    offices.setdefault(office, []).append(entry)
+            else:
+                totals[status_name] = entry
+        response_data[kind] = {
+            "statuses": list(totals.values()),
+            "offices": [{"office": office, "statuses": offices[office]} for office in sorted(offices)],
+        }
+    return response_data
+
+
+def build_status_badges(board):
+    """Per kind, {status: count} from the all-offices rows."""
+    response_data = {}
+    for kind, rows in board.items():
+        counts = dict.fromkeys(BOARD_STATUSES[kind], 0)
+        counts.update((status_name, count) for status_name, _, count, _ in rows)
+        response_data[kind] = counts
+    return response_data
+
+
+class StatusBoardView(APIView):
+    """
+    Count and total amount of purchase requests and orders per status, overall and per office,
+    read from the StatusCounter rollup instead of the PR and PO tables.
+    """
+    permission_classes = [HasRoleClaim]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+
+    def get(self, request, *args, **kwargs):
+        return Response(build_status_board(get_status_board()), status=status.HTTP_200_OK)
+
+    async def aget(self, request, *args, **kwargs):
+        return Response(build_status_board(await aget_status_board()), status=status.HTTP_200_OK)
+
+
+class StatusBadgesView(APIView):
+    """
+    Count per status for the sidebar badges, one indexed read of the all-offices counter rows.
+    """
+    permission_classes = [HasRoleClaim]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+
+    def get(self, request, *args, **kwargs):
+        return Response(build_status_badges(get_status_board(office='')), status=status.HTTP_200_OK)
+
+    async def aget(self, request, *args, **kwargs):
+        return Response(build_status_badges(await aget_status_board(office='')), status=status.HTTP_200_OK)
+
+
+class DatabasePoolMetricsView(APIView):
+    """
+    Connection settings of each database and, when DB_POOL is on, the pool statistics (connections in
+    use and idle, waits and wait time) of the worker process that serves the request.
+    """
+    permission_classes = [IsAdminRole]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+
+    def get(self, request, *args, **kwargs):
+        pools = get_pool_stats()
+        databases = {
+            alias: {
+                'engine': database['ENGINE'],
+                'conn_max_age': database['CONN_MAX_AGE'],
+                'conn_health_checks': database['CONN_HEALTH_CHECKS'],
+                'pool': pools.get(alias),
+            }
+            for alias, database in settings.DATABASES.items()
+        }
+        return Response({'pid': os.getpid(), 'databases': databases}, status=status.HTTP_200_OK)
+
+
+class InspectionAndAcceptanceList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin,
+                                  generics.ListCreateAPIView):
     """
     List all  Inspection and acceptance , or create a new Inspection and Acceptance
     """
     queryset = InspectionAndAcceptance.objects.all()
     serializer_class = InspectionAndAcceptanceSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class InspectionAndAcceptanceDetail(generics.RetrieveUpdateDestroyAPIView):
+class InspectionAndAcceptanceDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a Inspection and Acceptance instance
     """
     queryset = InspectionAndAcceptance.objects.all()
     serializer_class = InspectionAndAcceptanceSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class DeliveredItemsList(generics.ListCreateAPIView):
+class DeliveredItemsList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, generics.ListCreateAPIView):
     """
     List all  Delivered Items , or create a new Delivered Items
     """
     queryset = DeliveredItems.objects.all()
     serializer_class = DeliveredItemsSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class DeliveredItemsDetail(generics.RetrieveUpdateDestroyAPIView):
+class DeliveredItemsDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a  Delivered Items instance
     """
     queryset = DeliveredItems.objects.all()
     serializer_class = DeliveredItemsSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
     
     
-class DeliveredItemsFilterListView(ListAPIView):
+class DeliveredItemsFilterListView(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, ListAPIView):
     """
     Views for filtering Items delivered by Purchase Request
     """
@@ -1055,34 +1271,34 @@ class DeliveredItemsFilterListView(ListAPIView):
     serializer_class = DeliveredItemsSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = DeliveredItemsFilter
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
 
-class StockItemsList(generics.ListCreateAPIView):
+class StockItemsList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin, generics.ListCreateAPIView):
     """
     List all  Stocks Items , or create a new Stock Items
     """
     queryset = StockItems.objects.all()
     serializer_class = StockItemsSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class StockItemsDetail(generics.RetrieveUpdateDestroyAPIView):
+class StockItemsDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a  Stocks Items instance
     """
     queryset = StockItems.objects.all()
     serializer_class = StockItemsSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
 class DeliveredItemsUpdateView(APIView):
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
     def patch(self, request, pk):
         try:
@@ -1098,21 +1314,22 @@ class DeliveredItemsUpdateView(APIView):
 
 
 
-class RequisitionIssueSlipList(generics.ListCreateAPIView):
+class RequisitionIssueSlipList(StreamingListMixin, QueryPlanMixin, RepresentationViewMixin,
+                               generics.ListCreateAPIView):
     """
     List all  Requisition Slip , or create a new  Requisition Slip
     """
     queryset = RequisitionIssueSlip.objects.select_related('item').all()
     serializer_class = RequisitionIssueSlipSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
 
 
-class RequisitionIssueSlipDetail(generics.RetrieveUpdateDestroyAPIView):
+class RequisitionIssueSlipDetail(QueryPlanMixin, RepresentationViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, Update or Delete a Requisition Slip instance
     """
     queryset = RequisitionIssueSlip.objects.all()
     serializer_class = RequisitionIssueSlipSerializer
-    authentication_classes = [CookieJWTAuthentication]
-    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTClaimsAuthentication]
+    permission_classes = [HasRoleClaim]
@@ -1,11 +1,11 @@
 #!/bin/bash
 
-echo "Creating Migrations..."
-python manage.py makemigrations
-
 echo "Starting Migrations..."
 python manage.py migrate
 
+echo "Creating Recent Activity Partitions..."
+python manage.py partition_recent_activity
+
 echo "Collecting Static Files..."
 python manage.py collectstatic --noinput
 